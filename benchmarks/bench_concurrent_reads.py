@@ -0,0 +1,125 @@
+""" Read latency while an import is writing to runs_data.db.
+
+    A writer process keeps inserting synthetic 1-hour runs through BulkRunWriter while the main process runs
+    the View Runs page query and a single run samples query in a loop. It is measured twice, once with the old
+    connection setup (rollback journal, default pragmas) and once with the writer/reader profiles of connect_db.
+
+    python -m benchmarks.bench_concurrent_reads --seconds 10
+"""
+import argparse
+import multiprocessing as mp
+from pathlib import Path
+import sqlite3
+import statistics
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from stryder_core.db_schema import READER, WRITER, connect_db, init_db
+from stryder_core.pipeline import BulkRunWriter
+from stryder_core.queries import fetch_views_page, views_query
+
+SAMPLES_PER_RUN = 3600
+
+
+def _legacy_connect(db_path):
+    """ connect_db before the connection profiles """
+    conn = sqlite3.connect(str(db_path))
+    conn.execute("PRAGMA foreign_keys = ON")
+    return conn
+
+
+def _connect(mode, db_path, profile):
+    return _legacy_connect(db_path) if mode == "legacy" else connect_db(db_path, profile)
+
+
+def _synthetic_run(i: int) -> pd.DataFrame:
+    start = pd.Timestamp("2020-01-01 06:00:00", tz="Europe/Athens") + pd.Timedelta(days=i)
+    rng = np.random.default_rng(i)
+    return pd.DataFrame({
+        "ts_local": pd.date_range(start, periods=SAMPLES_PER_RUN, freq="s"),
+        "power_sec": rng.random(SAMPLES_PER_RUN) * 4,
+        "str_dist_m": np.cumsum(rng.random(SAMPLES_PER_RUN) * 3),
+        "ground": rng.integers(200, 300, SAMPLES_PER_RUN).astype(float),
+        "stiffness": rng.random(SAMPLES_PER_RUN) * 12,
+        "cadence": rng.integers(150, 190, SAMPLES_PER_RUN).astype(float),
+        "vo": rng.random(SAMPLES_PER_RUN) * 10,
+    })
+
+
+def _writer(mode, db_path, first_run, stop, commit_every):
+    conn = _connect(mode, db_path, WRITER)
+    i = first_run
+    try:
+        with BulkRunWriter(conn, commit_every=commit_every) as writer:
+            while not stop.is_set():
+                writer.add_run(_synthetic_run(i), f"Easy Run {i}", notes="", avg_power=250,
+                               avg_hr=140, total_m=10_000)
+                i += 1
+    finally:
+        conn.close()
+
+
+def _read_once(conn, run_id):
+    fetch_views_page(conn, views_query(), page=1)
+    conn.execute("SELECT datetime, power FROM metrics WHERE run_id = ?", (run_id,)).fetchall()
+
+
+def measure(mode, seconds, seed_runs, commit_every) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "runs_data.db"
+        conn = _connect(mode, db_path, WRITER)
+        init_db(conn)
+        with BulkRunWriter(conn, commit_every=seed_runs) as writer:
+            for i in range(seed_runs):
+                writer.add_run(_synthetic_run(i), f"Easy Run {i}", notes="", avg_power=250, avg_hr=140, total_m=10_000)
+        conn.close()
+
+        ctx = mp.get_context("spawn")
+        stop = ctx.Event()
+        proc = ctx.Process(target=_writer, args=(mode, db_path, seed_runs, stop, commit_every))
+        proc.start()
+        time.sleep(1)       # let the writer get going
+
+        latencies, errors = [], 0
+        reader = _connect(mode, db_path, READER)
+        deadline = time.perf_counter() + seconds
+        while time.perf_counter() < deadline:
+            t0 = time.perf_counter()
+            try:
+                _read_once(reader, 1 + len(latencies) % seed_runs)
+                latencies.append(time.perf_counter() - t0)
+            except sqlite3.OperationalError:
+                errors += 1
+        reader.close()
+
+        stop.set()
+        proc.join()
+
+    latencies.sort()
+    return {
+        "reads": len(latencies),
+        "errors": errors,
+        "p50_ms": statistics.median(latencies) * 1000 if latencies else float("nan"),
+        "p95_ms": latencies[int(len(latencies) * 0.95)] * 1000 if latencies else float("nan"),
+        "max_ms": latencies[-1] * 1000 if latencies else float("nan"),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--seed-runs", type=int, default=20)
+    parser.add_argument("--commit-every", type=int, default=50)
+    args = parser.parse_args()
+
+    print(f"{'mode':<10}{'reads':>8}{'errors':>8}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}")
+    for mode in ("legacy", "profiles"):
+        r = measure(mode, args.seconds, args.seed_runs, args.commit_every)
+        print(f"{mode:<10}{r['reads']:>8}{r['errors']:>8}{r['p50_ms']:>10.2f}{r['p95_ms']:>10.2f}{r['max_ms']:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
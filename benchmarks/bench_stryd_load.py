@@ -0,0 +1,71 @@
+""" Peak memory and time of parsing one very long Stryd recording.
+
+    A demo Stryd csv is repeated (timestamps shifted) into a multi-hour file, then run through
+    process_csv_pipeline three times: untyped full read (loadcsv_2df), typed/pruned read (load_stryd_csv)
+    and the chunked typed read. Time is taken on a plain run, peak (Python heap, tracemalloc) on a second one
+    since tracing slows the allocation-heavy parser paths down.
+
+    python -m benchmarks.bench_stryd_load --hours 24
+"""
+import argparse
+from pathlib import Path
+import tempfile
+import time
+import tracemalloc
+
+import pandas as pd
+
+from stryder_core.file_parsing import load_stryd_csv
+from stryder_core.import_runs import STRYD_CHUNK_ROWS
+from stryder_core.pipeline import process_csv_pipeline
+from stryder_core.utils import loadcsv_2df
+
+DEMO_FILE = Path(__file__).resolve().parent.parent / "assets" / "demo_run_files" / "stryd" / "5121693342662656.csv"
+
+
+def _long_recording(path: Path, hours: float) -> None:
+    samples = pd.read_csv(DEMO_FILE)
+    span = int(samples["Timestamp"].max() - samples["Timestamp"].min()) + 1
+    repeats = max(1, int(hours * 3600 // span))
+    parts = []
+    for i in range(repeats):
+        part = samples.copy()
+        part["Timestamp"] += i * span
+        parts.append(part)
+    pd.concat(parts, ignore_index=True).to_csv(path, index=False)
+
+
+def _parse(load, path) -> pd.DataFrame:
+    return process_csv_pipeline(load(path), pd.DataFrame({"Date": [], "Title": []}), "Europe/Athens")[0]
+
+
+def measure(label, load, path) -> None:
+    t0 = time.perf_counter()
+    stryd_df = _parse(load, path)
+    elapsed = time.perf_counter() - t0
+    del stryd_df
+
+    tracemalloc.start()
+    stryd_df = _parse(load, path)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<10}{len(stryd_df):>10}{peak / 2**20:>12.1f}{elapsed:>10.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--hours", type=float, default=24)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "stryd.csv"
+        _long_recording(path, args.hours)
+        print(f"{path.stat().st_size / 2**20:.1f} MiB csv")
+        print(f"{'mode':<10}{'rows':>10}{'peak MiB':>12}{'sec':>10}")
+        measure("untyped", loadcsv_2df, path)
+        measure("typed", load_stryd_csv, path)
+        measure("chunked", lambda p: load_stryd_csv(p, chunksize=STRYD_CHUNK_ROWS), path)
+
+
+if __name__ == "__main__":
+    main()
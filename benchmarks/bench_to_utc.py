@@ -0,0 +1,61 @@
+""" Scalar to_utc per value vs to_utc_series in one pass, over the same timestamps.
+
+    Inputs are shaped like the hot spots: naive local strings (Garmin activities.csv dates),
+    aware strings (runs.datetime), unix seconds and parsed naive datetimes (GarminIndex).
+    Both paths are checked to agree before they are timed.
+
+    python -m benchmarks.bench_to_utc --rows 100000
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from stryder_core.date_utilities import resolve_tz, to_utc, to_utc_series
+
+TZ = "Europe/Athens"
+
+
+def _inputs(rows: int) -> dict[str, pd.Series]:
+    rng = np.random.default_rng(0)
+    secs = 1_600_000_000 + np.sort(rng.integers(0, 6 * 365 * 86400, rows))
+    naive = pd.Series(pd.to_datetime(secs, unit="s"))
+    return {
+        "naive str": naive.dt.strftime("%Y-%m-%d %H:%M:%S"),
+        "aware str": naive.dt.tz_localize("UTC").astype(str),
+        "unix sec": pd.Series(secs),
+        "naive dt64": naive,
+    }
+
+
+def _best(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    tz = resolve_tz(TZ)
+    print(f"{args.rows} timestamps, {TZ}")
+    print(f"{'input':<12}{'scalar s':>10}{'series s':>10}{'speedup':>9}")
+    for label, values in _inputs(args.rows).items():
+        scalar = lambda: pd.to_datetime(values.apply(lambda v: to_utc(v, in_tz=tz)), utc=True)
+        series = lambda: to_utc_series(values, in_tz=tz)
+        pd.testing.assert_series_equal(scalar(), series(), check_dtype=False, check_names=False)
+
+        t_scalar = _best(scalar, args.repeat)
+        t_series = _best(series, args.repeat)
+        print(f"{label:<12}{t_scalar:>10.3f}{t_series:>10.3f}{t_scalar / t_series:>8.0f}x")
+
+
+if __name__ == "__main__":
+    main()
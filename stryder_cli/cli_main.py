@@ -2,14 +2,17 @@ from pathlib import Path
 import logging
 import sys
 from stryder_core.bootstrap import core_resolve_timezone, validate_path
-from stryder_core.import_runs import single_process_stryd_file, batch_process_stryd_folder
+from stryder_core.import_runs import single_process_stryd_file, batch_process_stryd_folder, default_import_workers
 from stryder_cli.cli_unparsed import find_unparsed_cli
 from stryder_core.pipeline import insert_full_run
-from stryder_core.runtime_context import set_context
+from stryder_core.row_counts import refresh_listed_runs
+from stryder_core.run_rollups import refresh_rollups
+from stryder_core.run_summaries import refresh_run_summaries
+from stryder_core.runtime_context import get_tz_str, set_context
 from stryder_core.utils import configure_connection
 from stryder_core.version import get_git_version
 from stryder_core.config import DB_PATH
-from stryder_core.db_schema import connect_db, init_db
+from stryder_core.db_schema import WRITER, connect_db, init_db
 from stryder_cli.reset_db import reset_db
 from stryder_core.profile_memory import REQUIRED_PATHS, CONFIG_PATH, save_json, load_json
 from stryder_cli.prompts import prompt_valid_path, prompt_for_timezone, ensure_default_timezone
@@ -117,11 +120,11 @@ def add_import_menu(conn, mode: str | None = None, single_filename: str | None =
 
     # ---- BATCH MODE BELOW ----
     if mode == "batch":
-        result = batch_process_stryd_folder(stryd_path, garmin_file, conn, tz)
+        result = batch_process_stryd_folder(stryd_path, garmin_file, conn, tz, workers=default_import_workers())
         print("\n📊 Batch import complete.")
         print(f"   Total files: {result['files_total']}")
         print(f"   ✅ Parsed:   {result['parsed']}")
-        print(f"   ⏭️ Skipped:  {result['skipped']}")
+        print(f"   ⏭️ Skipped:  {result['skipped']} ({result['unchanged']} unchanged since the last import)")
         return True
 
     # ---- SINGLE MODE BELOW ----
@@ -213,11 +216,14 @@ def main():
 
     metrics = build_metrics("local")            # Build metrics dict
 
-    conn = connect_db(DB_PATH)                  # Open db + configure row access by name
+    conn = connect_db(DB_PATH, WRITER)          # Open db + configure row access by name
     configure_connection(conn)
 
     try:
         init_db(conn)
+        refresh_rollups(conn, get_tz_str())    # so read-only viewers can answer from the rollups too
+        refresh_listed_runs(conn)
+        refresh_run_summaries(conn, on_progress=print)
         launcher_menu(conn, metrics)            # Pass the connection and METRICS along the menus
 
     finally:
@@ -1,38 +1,39 @@
 from typing import Literal
 
 from stryder_cli.cli_utils import MenuItem, menu_guard, prompt_menu, print_list_table
-from stryder_core.queries import fetch_page, views_query, for_report_query
+from stryder_core.queries import date_cursor, fetch_keyset_page, fetch_page, views_query, for_report_query
 from stryder_cli.prompts import input_date, prompt_yes_no
 from stryder_core.table_formatters import format_view_columns
+from stryder_core.workout_search import keyword_filter
 
 
 def paginate_runs(conn, base_query, mode, metrics, base_params=(), page_size: int = 20):
     """ The main function for pagination
-    a) stores cursors for going back
-    b) take columns, rows and cursor sends them to be formatted
+    a) fetches the keyset page after/before a cursor (first page without one)
+    b) take columns, rows and cursors sends them to be formatted
     c) prints the table
-    d) adds the appropriate UI to navigate through the pages """
-    stack = []             # cursors for going back
-    cursor = None          # current cursor (None means first page)
+    d) adds the appropriate UI to navigate through the pages or jump to a date """
+    after, before = None, None      # no cursor means first page
     while True:
-        rows, columns, cursor_next = fetch_page(
-            conn, base_query, base_params=base_params,
-            last_cursor=cursor, page_size=page_size)
+        rows, columns, cursor_prev, cursor_next = fetch_keyset_page(
+            conn, base_query, base_params,
+            after=after, before=before, page_size=page_size)
 
-        if not rows and not stack and cursor is None:
+        if not rows and after is None and before is None:
             print(" ⚠️ No results."); return "no_results"
 
         headers, formatted_rows = format_view_columns(rows,mode, metrics)
         print_list_table(formatted_rows, headers)
 
         # Determine navigation availability
-        at_start = (len(stack) == 0)
+        at_start = (cursor_prev is None)
         at_end = (cursor_next is None)
 
         # Build dynamic prompt
         options = []
         if not at_end: options.append("[n]ext")
         if not at_start: options.append("[p]rev")
+        options.append("[d]ate")
         options.append("[q]uit")
         prompt = " ".join(options) + ": "
 
@@ -48,12 +49,14 @@ def paginate_runs(conn, base_query, mode, metrics, base_params=(), page_size: in
                         else: continue
                     else:
                         print("Already at the last page."); continue
-                stack.append(cursor)
-                cursor = cursor_next; break
+                after, before = cursor_next, None; break
             elif cmd == "p":
                 if at_start:
                     print("Already at first page"); continue
-                cursor = stack.pop(); break
+                after, before = None, cursor_prev; break
+            elif cmd == "d":
+                day = input_date("Jump to date (YYYY-MM-DD): ")
+                after, before = date_cursor(day), None; break
             else:
                 print(" ⚠️ Not a valid input."); continue
 
@@ -76,16 +79,15 @@ def get_workouts_by_date(date1, date2, conn, metrics, mode):
 
 def get_workouts_by_keyword(keyword, conn, metrics, mode):
     """ Return workouts filtered by keyword """
-    like_term = f"%{keyword}%"
     if mode == "for_views":
-        base_query = views_query() + " WHERE (w.workout_name LIKE ? OR wt.name LIKE ?)"
-        base_params = (like_term, like_term)
+        keyword_condition, base_params = keyword_filter(conn, keyword)
+        base_query = views_query() + f" WHERE {keyword_condition}"
         paginate_runs(conn, base_query, mode, metrics, base_params=base_params)
         return fetch_page(conn, base_query, base_params, page_size=0)
 
     elif mode == "for_report":
-        base_query = for_report_query() + " WHERE w.workout_name LIKE ?"
-        base_params = (like_term,)
+        keyword_condition, base_params = keyword_filter(conn, keyword, include_type=False)
+        base_query = for_report_query() + f" WHERE {keyword_condition}"
         paginate_runs(conn, base_query, mode, metrics, base_params=base_params)
         return fetch_page(conn, base_query, base_params, page_size=0)
 
@@ -1,12 +1,13 @@
 import logging
-import sqlite3
 from pathlib import Path
 from stryder_cli.prompts import prompt_for_timezone
 from stryder_core.config import DB_PATH
+from stryder_core.db_schema import WRITER, connect_db
 from stryder_core.find_unparsed_runs import find_unparsed_files
 from stryder_cli.cli_utils import get_paths_with_prompt, MenuItem, prompt_menu
 from stryder_core.pipeline import insert_full_run
-from stryder_core.import_runs import prepare_run_insert
+from stryder_core.import_runs import load_garmin_index, prepare_run_insert, record_import_result
+from stryder_core import import_ledger
 
 
 def find_unparsed_cli():
@@ -16,7 +17,7 @@ def find_unparsed_cli():
 
     stryd_folder, garmin_file = get_paths_with_prompt()
 
-    conn = sqlite3.connect(DB_PATH)
+    conn = connect_db(DB_PATH, WRITER)
     result = find_unparsed_files(stryd_folder, conn)
 
     total_files = result["total_files"]
@@ -34,9 +35,10 @@ def find_unparsed_cli():
     # Run interactive step:
     parsed_count = 0
     skipped_count = 0
+    garmin_index = load_garmin_index(garmin_file, timezone_str)        # indexed once for every file
 
     for file in unparsed_files:
-        result = interactive_run_insert_cli(str(file), garmin_file, conn, timezone_str)
+        result = interactive_run_insert_cli(str(file), garmin_file, conn, timezone_str, garmin_index)
         if result:
             parsed_count += 1
         elif result is False:
@@ -58,7 +60,7 @@ def find_unparsed_cli():
     conn.close()
 
 
-def interactive_run_insert_cli(stryd_file, garmin_file, conn, timezone_str=None) -> bool | None:
+def interactive_run_insert_cli(stryd_file, garmin_file, conn, timezone_str=None, garmin_index=None) -> bool | None:
     """ Prompts for timezone, gets info about the run and handles cases if it matches
         a) if it matches Garmin, b) if not but get parsed anyway, c) if it's already in db
         d) if it's skipped by the user, or e) there is input error """
@@ -76,7 +78,7 @@ def interactive_run_insert_cli(stryd_file, garmin_file, conn, timezone_str=None)
             timezone_str = tz_input
 
         # Call core to do the work
-        result = prepare_run_insert(stryd_file, garmin_file, file_name, conn, timezone_str)
+        result = prepare_run_insert(stryd_file, garmin_file, file_name, conn, timezone_str, garmin_index)
 
         # Garmin not matched → show menu
         if result["status"] == "no_garmin":
@@ -89,7 +91,8 @@ def interactive_run_insert_cli(stryd_file, garmin_file, conn, timezone_str=None)
             choice = prompt_menu("What would you like to do", items, allow_back=False)
 
             if choice == "1":
-                insert_full_run(result["stryd_df"], result["workout_name"], notes="",avg_power=result["avg_power"], avg_hr=None,total_m=result["total_m"], conn=conn)
+                _, run_id = insert_full_run(result["stryd_df"], result["workout_name"], notes="",avg_power=result["avg_power"], avg_hr=None,total_m=result["total_m"], conn=conn)
+                record_import_result(conn, stryd_file, result, status=import_ledger.IMPORTED, run_id=run_id)
                 logging.info(f"✅ Inserted without Garmin match: {stryd_file}")
                 return True
 
@@ -112,9 +115,10 @@ def interactive_run_insert_cli(stryd_file, garmin_file, conn, timezone_str=None)
                 continue
 
         elif result["status"] == "ok":
-            insert_full_run(result["stryd_df"], result["workout_name"], notes="",
-                            avg_power=result["avg_power"], avg_hr=result["avg_hr"],
-                            total_m=result["total_m"], conn=conn)
+            _, run_id = insert_full_run(result["stryd_df"], result["workout_name"], notes="",
+                                        avg_power=result["avg_power"], avg_hr=result["avg_hr"],
+                                        total_m=result["total_m"], conn=conn)
+            record_import_result(conn, stryd_file, result, run_id=run_id)
             return True
 
         elif result["status"] == "skipped":
@@ -125,10 +129,12 @@ def interactive_run_insert_cli(stryd_file, garmin_file, conn, timezone_str=None)
 
         elif result["status"] == "already_exists":
             print(f"⚠️ Run already exists in DB: {file_name}")
+            record_import_result(conn, stryd_file, result)
             return False
 
         elif result["status"] == "zero_data":
             print(f"⚠️ Stryd data is incomplete (zero distance/speed). Run skipped.")
+            record_import_result(conn, stryd_file, result)
             return False
 
         else:
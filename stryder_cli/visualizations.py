@@ -241,9 +241,9 @@ def display_menu(label, df_raw, df_type, metrics):
         exit(0)
 
 
-def render_single_run_report(df:pd.DataFrame) -> pd.DataFrame:
-    """ Takes a df, changes the field names to pretty name for displaying """
-    table = compute_single_run_summary(df)
+def render_single_run_report(df:pd.DataFrame, summary: dict | None = None) -> pd.DataFrame:
+    """ Takes a df (or its stored run summary), changes the field names to pretty name for displaying """
+    table = summary if summary is not None else compute_single_run_summary(df)
     # Building the report df
     row = {
         "Run ID": table["run_id"],
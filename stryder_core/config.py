@@ -1,7 +1,8 @@
+import os
 from pathlib import Path
 
 BASE_DIR = Path(__file__).resolve().parent.parent  # goes from stryder_core/ up to project root
-DB_PATH = BASE_DIR / "runs_data.db"
+DB_PATH = Path(os.environ.get("STRYDER_DB_PATH", BASE_DIR / "runs_data.db"))
 
 COMMON_TIMEZONES = [
     "UTC",
@@ -2,6 +2,8 @@ import logging
 from datetime import datetime, timezone, date, tzinfo
 from typing import Any, Optional, Literal
 from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+import numpy as np
+import pandas as pd
 import tzlocal
 from stryder_core.runtime_context import get_tz_str, get_tzinfo
 
@@ -65,8 +67,7 @@ def to_utc(target: Any, *, in_tz=None) -> datetime:
             else:
                 raise ValueError(f"❌ Invalid date string: {target!r}")
 
-    else:
-        import pandas as pd         # Pandas timestamp to UTC
+    else:                           # Pandas timestamp to UTC
         if isinstance(target, pd.Timestamp):
             try:
                 dt = target.to_pydatetime()
@@ -82,6 +83,86 @@ def to_utc(target: Any, *, in_tz=None) -> datetime:
     return dt.astimezone(timezone.utc)                   # normalize
 
 
+# plain unix seconds/milliseconds ('1700000000', '1700000000.5') and the offset ending an aware ISO string
+_UNIX_TEXT = r"[\d.]+"
+_OFFSET_TEXT = r"(?:Z|[+-]\d{2}:?\d{2})$"
+
+
+def to_utc_series(values, *, in_tz=None) -> pd.Series:
+    """Vectorized to_utc for a Series / array / list, returns a datetime64[ns, UTC] Series (same index).
+
+    Accepts the same inputs as to_utc: aware/naive datetimes and Timestamps, unix s/ms numbers or strings,
+    ISO8601 strings (incl. 'Z'). Naive values are local times of in_tz (default UTC), attached like to_utc does:
+    an ambiguous time (DST end) takes its first, DST offset, a time inside the DST gap keeps the offset before
+    the gap. Missing or unparseable values become NaT instead of raising. """
+    s = values if isinstance(values, pd.Series) else pd.Series(values, dtype=None if len(values) else object)
+    tz = in_tz or timezone.utc
+
+    if isinstance(s.dtype, pd.DatetimeTZDtype):
+        return s.dt.tz_convert("UTC")
+    if pd.api.types.is_datetime64_dtype(s.dtype):
+        return _localize_naive(s, tz)
+    if pd.api.types.is_numeric_dtype(s.dtype) and not pd.api.types.is_bool_dtype(s.dtype):
+        return _unix_to_utc(s)
+
+    index, s = s.index, s.reset_index(drop=True)      # fill by position, the index may repeat labels
+    out = np.full(len(s), np.datetime64("NaT"), dtype="datetime64[ns]")     # naive UTC
+    is_text = s.map(type).eq(str).to_numpy()
+    if is_text.any():
+        text = s[is_text]
+        is_unix = text.str.fullmatch(_UNIX_TEXT).to_numpy()
+        is_aware = ~is_unix & (text.str.len() > 10).to_numpy() & text.str.contains(_OFFSET_TEXT).to_numpy()
+        is_naive = ~is_unix & ~is_aware
+        out[text.index[is_unix]] = _naive_utc(_unix_to_utc(pd.to_numeric(text[is_unix], errors="coerce")))
+
+        # ISO strings parse in one call each: aware ones by their offset, naive ones localized to tz
+        aware = pd.to_datetime(text[is_aware], format="ISO8601", utc=True, errors="coerce")
+        out[text.index[is_aware]] = _naive_utc(aware)
+        try:
+            naive = pd.to_datetime(text[is_naive], format="ISO8601", errors="coerce")
+        except ValueError:      # an offset the check missed, the scalar path below sorts those out
+            naive = None
+        if naive is not None and pd.api.types.is_datetime64_dtype(naive.dtype):
+            out[text.index[is_naive]] = _naive_utc(_localize_naive(naive, tz))
+
+    # Anything left (datetime objects, mixed or non-ISO strings) goes through to_utc itself
+    rest = np.isnat(out) & s.notna().to_numpy()
+    if rest.any():
+        out[rest] = _naive_utc(pd.Series(pd.to_datetime([_to_utc_or_nat(v, tz) for v in s[rest]], utc=True)))
+    return pd.Series(out, index=index).dt.tz_localize("UTC")
+
+
+def _naive_utc(utc: pd.Series) -> np.ndarray:
+    """ datetime64[ns] values of an UTC series, without going through Timestamp objects """
+    return utc.dt.tz_localize(None).to_numpy(dtype="datetime64[ns]")
+
+
+def _unix_to_utc(secs: pd.Series) -> pd.Series:
+    """ Unix seconds (or milliseconds, same heuristic as to_utc) to UTC, microsecond precision """
+    secs = secs.astype("float64")
+    secs = secs.where(secs <= 1e12, secs / 1000.0)
+    return pd.to_datetime(secs, unit="s", utc=True).dt.round("us")
+
+
+def _localize_naive(naive: pd.Series, tz) -> pd.Series:
+    """ Attaches tz to naive datetimes without a clock shift, like datetime.replace(tzinfo=tz) in to_utc """
+    # ambiguous times take the first (DST) offset explicitly, DST-gap times come back NaT and go through to_utc
+    zone = getattr(tz, "key", tz)   # pandas localizes by zone name much faster than through a ZoneInfo
+    localized = naive.dt.tz_localize(zone, ambiguous=np.ones(len(naive), dtype=bool), nonexistent="NaT")
+    utc = localized.dt.tz_convert("UTC").copy()
+    gap = (utc.isna() & naive.notna()).to_numpy()
+    if gap.any():
+        utc[gap] = pd.to_datetime([to_utc(dt.to_pydatetime(), in_tz=tz) for dt in naive[gap]], utc=True)
+    return utc
+
+
+def _to_utc_or_nat(value, tz):
+    try:
+        return to_utc(value, in_tz=tz)
+    except (TypeError, ValueError):
+        return pd.NaT
+
+
 OutFmt = Literal["iso", "ymd_hmsz", "ymd_hms" ,"ymd"]
 
 def as_aware(dt: datetime, tz=None) -> datetime:
@@ -1,14 +1,57 @@
 import logging
 import sqlite3
+from pathlib import Path
 import pandas as pd
 from stryder_core.date_utilities import to_utc
+from stryder_core.migrations import upgrade_schema, upgrade_schema_if_needed
+from stryder_core.packed_metrics import PACKED, insert_packed_metrics, metrics_storage
+from stryder_core.row_counts import reset_listed_runs
+from stryder_core.run_rollups import clear_rollups
 
 
-def connect_db(db_path) -> sqlite3.Connection:
-    """ Gets the connection with the database and returns it """
-    logging.info(f"[DB] Connecting to: {db_path}")
-    conn = sqlite3.connect(str(db_path))
-    conn.execute("PRAGMA foreign_keys = ON")
+# Per-connection pragmas. The writer (imports, reset, CLI menus) runs in WAL so Django/TUI readers
+# keep reading the last committed snapshot while an import is in progress. Readers open the file
+# read-only and can never take the write lock.
+WRITER = "writer"
+READER = "reader"
+BUSY_TIMEOUT_MS = 30_000
+CACHE_SIZE_KIB = 65_536
+
+CONNECTION_PRAGMAS = {
+    WRITER: (
+        "PRAGMA foreign_keys = ON",
+        "PRAGMA journal_mode = WAL",
+        "PRAGMA synchronous = NORMAL",
+        f"PRAGMA cache_size = -{CACHE_SIZE_KIB}",
+        "PRAGMA temp_store = MEMORY",
+        f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}",
+    ),
+    READER: (
+        "PRAGMA query_only = ON",
+        f"PRAGMA cache_size = -{CACHE_SIZE_KIB}",
+        f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}",
+    ),
+}
+
+
+def connect_db(db_path, profile: str = WRITER) -> sqlite3.Connection:
+    """ Gets the connection with the database and returns it, configured for the writer or reader profile """
+    if profile not in CONNECTION_PRAGMAS:
+        raise ValueError(f"Unknown connection profile: {profile}")
+
+    logging.info(f"[DB] Connecting to: {db_path} ({profile})")
+    timeout = BUSY_TIMEOUT_MS / 1000
+    if profile == READER and str(db_path) != ":memory:":
+        uri = Path(db_path).resolve().as_uri() + "?mode=ro"
+        conn = sqlite3.connect(uri, uri=True, timeout=timeout)
+    else:
+        conn = sqlite3.connect(str(db_path), timeout=timeout)
+
+    for pragma in CONNECTION_PRAGMAS[profile]:
+        conn.execute(pragma)
+
+    if profile == WRITER:
+        upgrade_schema_if_needed(conn)
     return conn
 
 def init_db(conn):
@@ -61,18 +104,20 @@ def init_db(conn):
     """)
 
     conn.commit()
+    upgrade_schema(conn)
     logging.info("✅ Database initialized.")
 
 
-def insert_workout(workout_name, notes, workout_type_id, conn):
+def insert_workout(workout_name, notes, workout_type_id, conn, *, commit=True):
     """ Inserts the workout name and returns its ID """
     cur = conn.cursor()
     cur.execute('''INSERT INTO workouts (workout_name, notes, workout_type_id) VALUES (?, ?, ?)''',(workout_name, notes, workout_type_id))
-    conn.commit()
+    if commit:
+        conn.commit()
     return cur.lastrowid    # return new workout's ID
 
 
-def get_or_create_workout_type(workout_type_name, conn):
+def get_or_create_workout_type(workout_type_name, conn, *, commit=True):
     """ Looks for workout type and returns its ID, if there is none it creates it """
     cur = conn.cursor()
     cur.execute("SELECT id FROM workout_types WHERE name = ?", (workout_type_name,))
@@ -82,12 +127,18 @@ def get_or_create_workout_type(workout_type_name, conn):
         return result[0]
     else:
         cur.execute("INSERT INTO workout_types (name) VALUES (?)", (workout_type_name,))
-        conn.commit()
+        if commit:
+            conn.commit()
         return cur.lastrowid
 
 
 def run_exists(conn, start_time, *, in_tz=None):
     """ Return True if a run with the given start_time exists in the DB """
+    return get_run_id(conn, start_time, in_tz=in_tz) is not None
+
+
+def get_run_id(conn, start_time, *, in_tz=None) -> int | None:
+    """ Return the id of the run with the given start_time, None if there is none """
     # Naive inputs are interpreted in `in_tz` (default UTC) and normalized to UTC
     dt_utc = to_utc(start_time, in_tz=in_tz).replace(microsecond=0)
     # Matches DB format: 'YYYY-MM-DD HH:MM:SS' (UTC, second precision)
@@ -98,10 +149,11 @@ def run_exists(conn, start_time, *, in_tz=None):
         "SELECT id FROM runs WHERE datetime = ? LIMIT 1",
         (start_time_str,)
     ).fetchone()
-    return row is not None
+    return row[0] if row else None
 
 
-def insert_run(workout_id, start_time, avg_power, duration_sec, avg_hr, distance_m, conn, *, in_tz=None):
+def insert_run(workout_id, start_time, avg_power, duration_sec, avg_hr, distance_m, conn, *, in_tz=None,
+               commit=True):
         """ Checks if start_time is in UTC, inserts row, returns row id """
         # Ensure start_time is stored in UTC, kills microseconds if any
         dt_utc = to_utc(start_time, in_tz=in_tz).replace(microsecond=0)
@@ -115,7 +167,8 @@ def insert_run(workout_id, start_time, avg_power, duration_sec, avg_hr, distance
                     VALUES (?, ?, ?, ?, ?, ?)''',
                     (workout_id, start_time_str, avg_power, duration_sec, avg_hr, distance_m)
             )
-            conn.commit()
+            if commit:
+                conn.commit()
             return cur.lastrowid
         except sqlite3.IntegrityError:
             # Duplicate timestamp → fetch existing id
@@ -123,28 +176,63 @@ def insert_run(workout_id, start_time, avg_power, duration_sec, avg_hr, distance
             return row[0] if row else None
 
 
-def insert_metrics(run_id, df, conn):
-    """ Takes dt column from df, checks if its dt or string, appends metrics row """
+# Stryd df column → metrics table column, in INSERT order
+METRICS_DF_COLUMNS = {
+    "power_sec": "power",
+    "str_dist_m": "stryd_distance",
+    "ground": "ground_time",
+    "stiffness": "stiffness",
+    "cadence": "cadence",
+    "vo": "vertical_oscillation",
+}
+
+
+def format_db_datetimes(ts: pd.Series) -> pd.Series:
+    """ Vectorized ts.isoformat(sep=' ', timespec='seconds') for a datetime Series, NaT stays NaN """
+    text = ts.dt.strftime("%Y-%m-%d %H:%M:%S")
+    if ts.dt.tz is None:
+        return text
+
+    # UTC offset per sample as '+HH:MM' (can change mid-run on DST days)
+    offset_min = ((ts.dt.tz_localize(None) - ts.dt.tz_convert("UTC").dt.tz_localize(None))
+                  // pd.Timedelta(minutes=1))
+    suffixes = {}
+    for minutes in offset_min.dropna().unique():
+        h, m = divmod(abs(int(minutes)), 60)
+        suffixes[minutes] = f"{'-' if minutes < 0 else '+'}{h:02d}:{m:02d}"
+    return text + offset_min.map(suffixes)
+
+
+def insert_metrics(run_id, df, conn, *, commit=True):
+    """ Takes dt column from df, formats it for the DB, appends metrics rows column-wise.
+        Rows without a valid timestamp are dropped, NaN values are stored as NULL.
+        With STRYDER_METRICS_STORAGE=packed the same rows go into one metrics_packed row.
+        Returns the stored samples (datetime text + metrics columns) """
     cur = conn.cursor()
-    rows = []
+
+    ts = df["ts_local"] if "ts_local" in df.columns else pd.Series(pd.NaT, index=df.index)
 
     # Check the input if its datetime object or string
-    for i, row in df.iterrows():
-        ts = row.get('ts_local')
-
-        if pd.isna(ts) or not hasattr(ts, 'isoformat'):
-            continue
-
-        rows.append((
-            run_id,
-            ts.isoformat(sep=' ', timespec='seconds'),
-            row.get('power_sec'),
-            row.get('str_dist_m'),
-            row.get('ground'),
-            row.get('stiffness'),
-            row.get('cadence'),
-            row.get('vo')
-        ))
+    if pd.api.types.is_datetime64_any_dtype(ts):
+        valid = ts.notna()
+        dt_text = format_db_datetimes(ts[valid])
+    else:
+        valid = ts.map(lambda v: not pd.isna(v) and hasattr(v, "isoformat")).astype(bool)
+        dt_text = ts[valid].map(lambda v: v.isoformat(sep=' ', timespec='seconds'))
+
+    rows = pd.DataFrame({"run_id": run_id, "datetime": dt_text}, index=dt_text.index)
+    for src in METRICS_DF_COLUMNS:
+        if src in df.columns:
+            col = df.loc[valid, src].astype(object)
+            rows[src] = col.where(col.notna(), None)
+        else:
+            rows[src] = None
+
+    samples = rows.drop(columns="run_id").rename(columns=METRICS_DF_COLUMNS)
+    if metrics_storage() == PACKED and insert_packed_metrics(conn, run_id, samples):
+        if commit:
+            conn.commit()
+        return samples
 
     cur.executemany('''
         INSERT INTO metrics (
@@ -152,16 +240,23 @@ def insert_metrics(run_id, df, conn):
             ground_time, stiffness, cadence, vertical_oscillation
         )
         VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-    ''', rows)
+    ''', rows.itertuples(index=False, name=None))
 
-    conn.commit()
+    if commit:
+        conn.commit()
+    return samples
 
 def wipe_all_data(conn):
     """ Deletes all rows from DB tables. """
     cur = conn.cursor()
     cur.execute("DELETE FROM metrics")
+    cur.execute("DELETE FROM metrics_packed")
+    cur.execute("DELETE FROM run_summaries")
+    clear_rollups(conn)
     cur.execute("DELETE FROM runs")
     cur.execute("DELETE FROM workouts")
     cur.execute("DELETE FROM workout_types")
+    cur.execute("DELETE FROM import_ledger")
     cur.execute("DELETE FROM sqlite_sequence")
+    reset_listed_runs(conn)         # 0, also when a workout change had left it unknown
     conn.commit()
\ No newline at end of file
@@ -0,0 +1,67 @@
+""" Downsampling of per-second run series for plotting with Largest-Triangle-Three-Buckets, which keeps
+    interval spikes and drops that taking every n-th sample would skip. """
+
+import numpy as np
+import pandas as pd
+
+
+def lttb_indices(x, y, max_points: int) -> np.ndarray:
+    """ Positions of the samples LTTB keeps from (x, y) (same length, finite, x ascending),
+        every position when there are at most max_points samples """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n = len(x)
+    if max_points >= n or max_points < 3:
+        return np.arange(n)
+
+    # max_points - 2 buckets over the samples between the first and the last one
+    edges = np.floor(np.linspace(1, n - 1, max_points - 1)).astype(np.int64)
+    edges = np.append(edges, n)
+
+    # mean point of every bucket (the one after the last bucket is the last sample)
+    sizes = np.diff(edges)
+    mean_x = np.add.reduceat(x, edges[:-1]) / sizes
+    mean_y = np.add.reduceat(y, edges[:-1]) / sizes
+
+    kept = np.empty(max_points, dtype=np.int64)
+    kept[0] = 0
+    a = 0
+    for i in range(max_points - 2):
+        start, end = edges[i], edges[i + 1]
+        # doubled triangle area of (kept point, candidate, next bucket mean), for every candidate of the bucket
+        area = np.abs((x[a] - mean_x[i + 1]) * (y[start:end] - y[a])
+                      - (x[a] - x[start:end]) * (mean_y[i + 1] - y[a]))
+        a = start + int(np.argmax(area))
+        kept[i + 1] = a
+    kept[-1] = n - 1
+    return kept
+
+
+def downsample_series(x: pd.Series, y: pd.Series, max_points: int | None) -> tuple[pd.Series, pd.Series]:
+    """ Drops the pairs with a missing/non-finite value and reduces the rest to max_points with LTTB
+        (no reduction for max_points None). Datetime x is compared as seconds """
+    if pd.api.types.is_datetime64_any_dtype(x):
+        x_num = (x - x.min()).dt.total_seconds()
+    else:
+        x_num = pd.to_numeric(x, errors="coerce")
+    x_num = x_num.to_numpy(dtype=np.float64, na_value=np.nan)
+    y_num = pd.to_numeric(y, errors="coerce")
+    mask = np.isfinite(x_num) & np.isfinite(y_num.to_numpy(dtype=np.float64, na_value=np.nan))
+    x, y = x[mask], y_num[mask]
+    if max_points is None:
+        return x, y
+
+    keep = lttb_indices(x_num[mask], y.to_numpy(dtype=np.float64), max_points)
+    return x.iloc[keep], y.iloc[keep]
+
+
+def lttb_union_indices(x, ys, max_points: int) -> np.ndarray:
+    """ Sorted positions LTTB keeps for any of the ys against the shared x (non-finite pairs skipped per y),
+        so one set of rows plots every y with at most max_points samples each """
+    x = np.asarray(x, dtype=np.float64)
+    kept = [np.empty(0, dtype=np.int64)]
+    for y in ys:
+        y = np.asarray(y, dtype=np.float64)
+        positions = np.flatnonzero(np.isfinite(x) & np.isfinite(y))
+        kept.append(positions[lttb_indices(x[positions], y[positions], max_points)])
+    return np.unique(np.concatenate(kept))
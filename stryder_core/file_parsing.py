@@ -1,7 +1,10 @@
+import csv
 import logging
+from itertools import islice
+import numpy as np
 import pandas as pd
 from datetime import timedelta
-from stryder_core.date_utilities import resolve_tz, to_utc
+from stryder_core.date_utilities import resolve_tz, to_utc, to_utc_series
 from stryder_core.metrics import align_df_to_metric_keys, STRYD_PARSE_SPEC, GARMIN_PARSE_SPEC
 
 PARSE_STRYD_CSV_KEYS = {"timestamp_s", "str_dist_m", "str_speed", "power_sec", "ground",
@@ -9,6 +12,19 @@ PARSE_STRYD_CSV_KEYS = {"timestamp_s", "str_dist_m", "str_speed", "power_sec", "
 
 PARSE_GARMIN_CSV_KEYS = {"date", "wt_name", "avg_hr"}
 
+STRYD_TIMESTAMP_COLUMNS = {"timestamp_s", *STRYD_PARSE_SPEC["timestamp_s"]["aliases"]}
+
+NO_MATCH = -1       # Garmin row position meaning "no activity within tolerance"
+
+# csv header → dtype for every Stryd column the importer uses (canonical key or alias)
+STRYD_LOAD_DTYPES = {name: spec["dtype"] for key, spec in STRYD_PARSE_SPEC.items() if "dtype" in spec
+                     for name in (key, *spec["aliases"])}
+# nullable integer columns go through the C float parser and are cast after, pandas parses them via strings
+_STRYD_READ_DTYPES = {name: "float64" if dtype[0] == "I" else dtype for name, dtype in STRYD_LOAD_DTYPES.items()}
+
+PROBE_LINES = 16            # data lines read by the first timestamp probe
+SCAN_CHUNK_ROWS = 100_000   # rows per chunk when the probe has to scan the whole Timestamp column
+
 class ZeroStrydDataError(Exception):
     """Raised when Stryd CSV has zero speed/distance for the entire file."""
     pass
@@ -29,8 +45,57 @@ def is_stryd_all_zero(df: pd.DataFrame) -> bool:
     return False
 
 
-def edit_stryd_csv(df, timezone_str: str | None = None):
-    """ Takes stryd.csv columns,normalizes them, turns time to local, gets distance from speed, returns df """
+def load_stryd_csv(file, chunksize: int | None = None):
+    """ Reads only the Stryd columns the importer uses, typed as set in STRYD_PARSE_SPEC.
+        With chunksize an iterator of frames is returned, process_csv_pipeline takes both """
+    usecols = lambda col: col in STRYD_LOAD_DTYPES
+    if chunksize:
+        return _load_stryd_chunks(file, usecols, chunksize)
+    try:
+        return _cast_stryd_columns(pd.read_csv(file, usecols=usecols, dtype=_STRYD_READ_DTYPES))
+    except ValueError:
+        # text where numbers are expected, let pandas infer the types for this file
+        return pd.read_csv(file, usecols=usecols)
+
+
+def _load_stryd_chunks(file, usecols, chunksize):
+    """ Typed chunks of load_stryd_csv, from the first chunk with text where numbers are expected
+        the rest of the file is read with inferred types """
+    loaded = 0
+    try:
+        with pd.read_csv(file, usecols=usecols, dtype=_STRYD_READ_DTYPES, chunksize=chunksize) as chunks:
+            for chunk in chunks:
+                loaded += len(chunk)
+                yield _cast_stryd_columns(chunk)
+    except ValueError:
+        with pd.read_csv(file, usecols=usecols, chunksize=chunksize, skiprows=range(1, loaded + 1)) as chunks:
+            yield from chunks
+
+
+def _cast_stryd_columns(df):
+    """ Casts the float-read integer columns to their STRYD_PARSE_SPEC dtype, a column holding fractions stays float """
+    casts = {}
+    for col in df.columns:
+        if STRYD_LOAD_DTYPES[col][0] == "I":
+            values = df[col].to_numpy()
+            if np.array_equal(np.round(values), values, equal_nan=True):
+                casts[col] = STRYD_LOAD_DTYPES[col]
+    return df.astype(casts)
+
+
+def edit_stryd_chunks(chunks, timezone_str: str | None = None) -> pd.DataFrame:
+    """ edit_stryd_csv over a chunked read, time deltas and cumulative distance carry across chunk boundaries.
+        Stryd writes samples in time order, each chunk is only sorted within itself """
+    carry = {}
+    parts = [edit_stryd_csv(chunk, timezone_str=timezone_str, carry=carry) for chunk in chunks]
+    if not parts:
+        raise ValueError("Stryd csv has no samples")
+    return pd.concat(parts, ignore_index=True)
+
+
+def edit_stryd_csv(df, timezone_str: str | None = None, carry: dict | None = None):
+    """ Takes stryd.csv columns,normalizes them, turns time to local, gets distance from speed, returns df.
+        carry holds the last timestamp/distance of the previous chunk (see edit_stryd_chunks) and is updated """
 
     # Normalize stryd.csv headers → canonical keys
     df = align_df_to_metric_keys(df, STRYD_PARSE_SPEC, keys=PARSE_STRYD_CSV_KEYS)
@@ -46,7 +111,10 @@ def edit_stryd_csv(df, timezone_str: str | None = None):
 
      # Sort by time & compute time delta (sec)
     df = df.sort_values('ts_local').reset_index(drop=True)
-    df['delta_s'] = df['ts_local'].diff().dt.total_seconds().fillna(0)
+    df['delta_s'] = df['ts_local'].diff().dt.total_seconds()
+    if carry and len(df):
+        df.loc[0, 'delta_s'] = (df['ts_local'].iloc[0] - carry["ts_local"]).total_seconds()
+    df['delta_s'] = df['delta_s'].fillna(0)
     df["delta_s"] = df["delta_s"].clip(lower=0)  # avoid negatives
 
     # Distance from Stryd speed, if present
@@ -56,8 +124,9 @@ def edit_stryd_csv(df, timezone_str: str | None = None):
         # per-row distance (m) = speed(m/s) * delta(s)
         df["dist_delta"] = spd * df["delta_s"]
 
-        # cumulative Stryd distance (m)
-        df["str_dist_m"] = df["dist_delta"].cumsum()
+        # cumulative Stryd distance (m), continuing from the previous chunk
+        start_m = carry["str_dist_m"] if carry else 0.0
+        df["str_dist_m"] = np.cumsum(np.r_[start_m, df["dist_delta"].to_numpy()])[1:]
 
         # sanity check for all-zero speed
         if (spd.abs() < 1e-12).all():
@@ -66,6 +135,12 @@ def edit_stryd_csv(df, timezone_str: str | None = None):
         # keep columns consistent even if speed missing
         df["dist_delta"] = 0.0
         df["str_dist_m"] = 0.0
+
+    if carry is not None and len(df):
+        last_ts = df["ts_local"].dropna()
+        if len(last_ts):
+            carry["ts_local"] = last_ts.iloc[-1]
+        carry["str_dist_m"] = float(df["str_dist_m"].iloc[-1])
     return df
 
 
@@ -89,38 +164,190 @@ def normalize_workout_type(raw_name):
         return "Other"
 
 
-def get_matched_garmin_row(stryd_df, garmin_df, timezone_str: str | None = None, tolerance_sec: int = 60):
-    """ Checks if stryd_df and garmin_df match in datetime, if yes return the row of the matched date """
+class GarminIndex:
+    """ Garmin activities normalized once: canonical columns, start times in UTC and a sorted int64 (ns) array
+        of them, so every Stryd file is matched with a binary search instead of scanning the whole csv.
+        Naive Garmin dates are local times, the index is bound to the timezone it was built with. """
+
+    def __init__(self, garmin_df: pd.DataFrame, timezone_str: str | None = None):
+        self.timezone_str = timezone_str
+        tz = resolve_tz(timezone_str)
+
+        # Normalize garmin.csv headers with canonical names
+        g = garmin_df.copy()
+        g.columns = g.columns.str.strip()
+        g = align_df_to_metric_keys(g, GARMIN_PARSE_SPEC, keys=PARSE_GARMIN_CSV_KEYS)
+
+        # Convert Garmin 'date' to datetime, then to UTC
+        g["date"] = pd.to_datetime(g["date"], errors="coerce")
+        g["date_utc"] = to_utc_series(g["date"], in_tz=tz)
+        self.df = g
+
+        # Sorted UTC instants + their row positions, NaT rows can never match
+        utc = g["date_utc"]
+        valid = utc.notna().to_numpy()
+        utc_ns = utc[valid].to_numpy(dtype="datetime64[ns]").astype(np.int64)
+        positions = np.flatnonzero(valid)
+        order = np.argsort(utc_ns, kind="stable")
+        utc_ns, positions = utc_ns[order], positions[order]
+
+        # One entry per distinct instant, duplicates resolve to their earliest csv row
+        self._utc_ns, first = np.unique(utc_ns, return_index=True)
+        self._positions = np.minimum.reduceat(positions, first) if len(first) else positions
+        self._by_tz = {timezone_str: self}
+
+    def with_timezone(self, timezone_str: str | None) -> "GarminIndex":
+        """ Returns the index for another timezone, rebuilt once and reused afterward """
+        index = self._by_tz.get(timezone_str)
+        if index is None:
+            index = GarminIndex(self.df.drop(columns="date_utc"), timezone_str)
+            index._by_tz = self._by_tz
+            self._by_tz[timezone_str] = index
+        return index
+
+    def match_many(self, starts_utc, tolerance_sec: int = 60) -> np.ndarray:
+        """ Nearest Garmin row for every start (UTC) in one vectorized pass, like a merge_asof with
+            direction="nearest". Returns csv row positions, NO_MATCH when nothing is within ±tolerance_sec.
+            Equal distances resolve to the earliest row of the csv """
+        t = pd.to_datetime(pd.Series(starts_utc, dtype=object), utc=True)
+        missing = t.isna().to_numpy()
+        t = t.to_numpy(dtype="datetime64[ns]").astype(np.int64)
+
+        n = len(self._utc_ns)
+        if n == 0:
+            return np.full(len(t), NO_MATCH)
+
+        # The nearest instant is either the last one before t or the first one at/after it
+        after = np.searchsorted(self._utc_ns, t, side="left")
+        before = np.clip(after - 1, 0, n - 1)
+        after = np.clip(after, 0, n - 1)
+        d_before = np.abs(self._utc_ns[before] - t)
+        d_after = np.abs(self._utc_ns[after] - t)
+        pos_before = self._positions[before]
+        pos_after = self._positions[after]
+
+        pick_after = (d_after < d_before) | ((d_after == d_before) & (pos_after < pos_before))
+        best_d = np.where(pick_after, d_after, d_before)
+        best_pos = np.where(pick_after, pos_after, pos_before)
+
+        tol = int(tolerance_sec * 1_000_000_000)
+        return np.where((best_d <= tol) & ~missing, best_pos, NO_MATCH)
+
+    def match(self, start_utc, tolerance_sec: int = 60) -> pd.Series | None:
+        """ Returns the Garmin row closest to start_utc within ±tolerance_sec, or None """
+        return self.row(self.match_many([start_utc], tolerance_sec)[0])
+
+    def row(self, position: int) -> pd.Series | None:
+        """ Garmin row at a csv position returned by match_many """
+        if position == NO_MATCH:
+            return None
+        return self.df.iloc[position]
+
+
+def get_matched_garmin_row(stryd_df, garmin, timezone_str: str | None = None, tolerance_sec: int = 60,
+                           planned_row: int | None = None):
+    """ Checks if stryd_df and the Garmin activities match in datetime, if yes return the row of the matched date.
+        garmin is either the raw Garmin df or a prepared GarminIndex (reused across files),
+        planned_row is the position build_match_plan already found for this file (skips the lookup) """
+    if planned_row is not None and isinstance(garmin, GarminIndex):
+        return garmin.row(planned_row)
+
     tz = resolve_tz(timezone_str)
 
     # Stryd start time → UTC
     stryd_start_utc = to_utc(stryd_df.loc[0, "ts_local"], in_tz=tz)
     logging.debug(f"STRYD start UTC: {stryd_start_utc!r}")
 
-    # Normalize garmin.csv headers with canonical names
-    g = garmin_df.copy()
-    g.columns = g.columns.str.strip()
-    g = align_df_to_metric_keys(g, GARMIN_PARSE_SPEC, keys=PARSE_GARMIN_CSV_KEYS)
-
-    # Convert Garmin 'date' to datetime
-    g["date"] = pd.to_datetime(g["date"], errors="coerce")
-    g["date_utc"] = g["date"].apply(lambda dt: to_utc(dt, in_tz=tz))
-    logging.debug("Sample Garmin dates (local & utc):")
-    logging.debug(g[["date", "date_utc"]].head().to_string())
-
-    # Find the closest Garmin row within tolerance
-    tol = timedelta(seconds=tolerance_sec)
-    diffs = (g["date_utc"] - stryd_start_utc).abs() # type: ignore
-    mask = diffs <= tol
-
-    logging.debug(f"Min diff: {diffs.min()}")
-    logging.debug(f"Any within tolerance ({tolerance_sec}s)? {mask.any()}")
-
-    if not mask.any():
+    if isinstance(garmin, GarminIndex):
+        index = garmin.with_timezone(timezone_str)
+    else:
+        index = GarminIndex(garmin, timezone_str)
+
+    matched = index.match(stryd_start_utc, tolerance_sec)
+    logging.debug(f"Any within tolerance ({tolerance_sec}s)? {matched is not None}")
+    return matched
+
+
+def read_first_timestamp(file) -> pd.Timestamp:
+    """ Earliest sample of a Stryd csv as an aware UTC timestamp.
+        Stryd writes samples in time order, so the header and the first few lines are enough when those lines
+        are ordered. Anything else (unordered or blank values, unknown header) scans the Timestamp column in chunks """
+    first = _probe_first_timestamp(file)
+    if first is not None:
+        return first
+    return _scan_first_timestamp(file)
+
+
+def _probe_first_timestamp(file, lines: int = PROBE_LINES) -> pd.Timestamp | None:
+    """ Reads the header + first lines only, returns None when they can't be trusted """
+    try:
+        with open(file, newline="", encoding="utf-8-sig") as f:
+            reader = csv.reader(f)
+            header = next(reader, None)
+            if header is None:
+                return None
+            col = next((i for i, name in enumerate(header) if name in STRYD_TIMESTAMP_COLUMNS), None)
+            if col is None:
+                return None
+            values = [float(row[col]) for row in islice(reader, lines)]
+    except (OSError, UnicodeDecodeError, csv.Error, ValueError, IndexError):
         return None
 
-    idx = diffs[mask].idxmin()
-    return g.loc[idx]
+    if not values or any(later < earlier for earlier, later in zip(values, values[1:])):
+        return None
+    return pd.to_datetime(values[0], unit="s", utc=True)
+
+
+def _scan_first_timestamp(file) -> pd.Timestamp:
+    """ Minimum of the whole Timestamp column, parsed chunk by chunk with only that column loaded """
+    earliest = None
+    found = False
+    for chunk in pd.read_csv(file, usecols=lambda col: col in STRYD_TIMESTAMP_COLUMNS, chunksize=SCAN_CHUNK_ROWS):
+        chunk = align_df_to_metric_keys(chunk, STRYD_PARSE_SPEC, keys={"timestamp_s"})
+        if "timestamp_s" not in chunk.columns:
+            break
+        found = found or not chunk.empty
+        ts = pd.to_datetime(chunk["timestamp_s"], unit="s", utc=True).min()
+        if pd.notna(ts) and (earliest is None or ts < earliest):
+            earliest = ts
+
+    if not found:
+        raise ValueError("Missing or empty 'timestamp_s' column")
+    return earliest if earliest is not None else pd.NaT
+
+
+def build_match_plan(stryd_files, garmin_index: GarminIndex, timezone_str: str | None = None,
+                     tolerance_sec: int = 60) -> pd.DataFrame:
+    """ Matches a whole folder against Garmin before any file is parsed: probes the first timestamp of every
+        Stryd csv and looks all of them up in one pass. One row per file with
+        file, start_utc, garmin_row (NO_MATCH if none), wt_name, avg_hr, error (probe failure) """
+    index = garmin_index.with_timezone(timezone_str)
+
+    starts, errors = [], []
+    for file in stryd_files:
+        try:
+            starts.append(read_first_timestamp(file))
+            errors.append(None)
+        except Exception as e:
+            starts.append(pd.NaT)
+            errors.append(str(e))
+
+    rows = index.match_many(starts, tolerance_sec)
+    matched = rows != NO_MATCH
+    garmin = index.df.iloc[rows[matched]]
+
+    plan = pd.DataFrame({
+        "file": list(stryd_files),
+        "start_utc": pd.to_datetime(pd.Series(starts, dtype=object), utc=True),
+        "garmin_row": rows,
+        "wt_name": None,
+        "avg_hr": None,
+        "error": errors,
+    })
+    for col in ("wt_name", "avg_hr"):
+        if col in garmin.columns:
+            plan.loc[matched, col] = garmin[col].to_numpy()
+    return plan
 
 
 def calculate_duration(stryd_df):
@@ -1,9 +1,9 @@
 import logging
 from typing import Callable
 
-import pandas as pd
 from pathlib import Path
-from stryder_core.metrics import align_df_to_metric_keys, STRYD_PARSE_SPEC
+from stryder_core.file_parsing import read_first_timestamp
+from stryder_core import import_ledger
 
 
 def get_existing_datetimes(conn):
@@ -14,14 +14,9 @@ def get_existing_datetimes(conn):
 
 
 def convert_first_timestamp_to_str(file_path):
-    """ Creates a dataframe from file takes the earliest sample """
-    df = pd.read_csv(file_path)
-    df = align_df_to_metric_keys(df, STRYD_PARSE_SPEC, keys={"timestamp_s"})
-    if 'timestamp_s' not in df.columns or df['timestamp_s'].empty:
-        raise ValueError("Missing or empty 'timestamp_s' column")
-
+    """ Probes the file for its earliest sample (header + first lines, not the whole csv) """
     # Parse as UTC (tz-aware) and pick the earliest sample
-    ts = pd.to_datetime(df['timestamp_s'], unit='s', utc=True).min()
+    ts = read_first_timestamp(file_path)
 
     # Store/compare in UTC to match how runs.datetime is saved in the DB
     return ts.isoformat(sep=' ', timespec='seconds')
@@ -30,18 +25,31 @@ def convert_first_timestamp_to_str(file_path):
 def find_unparsed_files(stryd_folder: Path, conn,
                         on_progress: Callable[[str], None] | None = None,
                         should_cancel: Callable[[], bool] | None = None,) -> dict:
-    """Return a dict of Stryd CSV files that are not in the DB yet."""
+    """Return a dict of Stryd CSV files that are not in the DB yet.
+    Files the import ledger settled and that are unchanged are not opened, zero data files are left out."""
     existing = get_existing_datetimes(conn) # set of strings
     unparsed = []
     total_files = 0
+    zero_data = 0
 
     canceled = False
 
-    for file in stryd_folder.glob("*.csv"):
+    stryd_files = list(stryd_folder.glob("*.csv"))
+    settled = import_ledger.settled_files(conn, stryd_files)
+
+    for file in stryd_files:
         if should_cancel and should_cancel():
             canceled = True
             break
         total_files += 1
+
+        status = settled.get(file)
+        if status == import_ledger.ZERO_DATA:
+            zero_data += 1
+            continue
+        if status == import_ledger.IMPORTED:
+            continue
+
         logging.info(f"\n🔄 Processing {file.name}")
         if on_progress:
             on_progress(f"-- Processing {file.name}")
@@ -63,6 +71,7 @@ def find_unparsed_files(stryd_folder: Path, conn,
         "mode": "find_unparsed",
         "total_files": total_files,
         "unparsed_files": unparsed,
-        "parsed_files": total_files - len(unparsed),
+        "parsed_files": total_files - len(unparsed) - zero_data,
+        "zero_data_files": zero_data,
         "canceled": canceled
     }
\ No newline at end of file
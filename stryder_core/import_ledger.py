@@ -0,0 +1,77 @@
+""" Import ledger: the outcome of every Stryd csv the importer has seen, keyed by path and fingerprinted by
+    size, mtime and content hash, so unchanged settled files are never opened again. """
+
+import hashlib
+import os
+from pathlib import Path
+
+IMPORTED = "imported"
+ZERO_DATA = "zero_data"
+NO_GARMIN = "no_garmin"
+ERROR = "error"
+
+# Files in these states don't need another look while they stay unchanged
+SETTLED_STATUSES = (IMPORTED, ZERO_DATA)
+
+
+def ledger_key(file) -> str:
+    """ Absolute path used as the ledger key """
+    return str(Path(file).resolve())
+
+
+def file_stat(file) -> tuple[int, int]:
+    """ Returns size and mtime (ns) of a file """
+    st = os.stat(file)
+    return st.st_size, st.st_mtime_ns
+
+
+def content_hash(file) -> str:
+    """ sha1 of the file content """
+    with open(file, "rb") as f:
+        return hashlib.file_digest(f, "sha1").hexdigest()
+
+
+def settled_files(conn, files, *, refresh: bool = False) -> dict:
+    """ Stat sweep over files, returns {file: status} for the ones the ledger already settled.
+        A file whose size/mtime changed is hashed: same content still counts as settled
+        (and with refresh=True its new size/mtime is stored), anything else is left out """
+    placeholders = ",".join("?" * len(SETTLED_STATUSES))
+    ledger = {row[0]: row[1:] for row in conn.execute(
+        f"SELECT path, size, mtime_ns, content_hash, status FROM import_ledger WHERE status IN ({placeholders})",
+        SETTLED_STATUSES)}
+    if not ledger:
+        return {}
+
+    settled = {}
+    for file in files:
+        entry = ledger.get(ledger_key(file))
+        if entry is None:
+            continue
+        size, mtime_ns, digest, status = entry
+        try:
+            stat = file_stat(file)
+            if stat != (size, mtime_ns):
+                if stat[0] != size or content_hash(file) != digest:
+                    continue
+                if refresh:
+                    conn.execute("UPDATE import_ledger SET size = ?, mtime_ns = ? WHERE path = ?",
+                                 (*stat, ledger_key(file)))
+        except OSError:
+            continue
+        settled[file] = status
+    return settled
+
+
+def record_file(conn, file, status: str, *, first_ts: str | None = None, run_id: int | None = None,
+                commit: bool = True) -> None:
+    """ Stores the outcome of a file together with its current fingerprint """
+    size, mtime_ns = file_stat(file)
+    conn.execute("""
+        INSERT INTO import_ledger (path, size, mtime_ns, content_hash, first_ts, run_id, status)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(path) DO UPDATE SET
+            size = excluded.size, mtime_ns = excluded.mtime_ns, content_hash = excluded.content_hash,
+            first_ts = excluded.first_ts, run_id = excluded.run_id, status = excluded.status
+    """, (ledger_key(file), size, mtime_ns, content_hash(file), first_ts, run_id, status))
+    if commit:
+        conn.commit()
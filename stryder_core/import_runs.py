@@ -1,23 +1,43 @@
 import logging
+import multiprocessing
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
 from pathlib import Path
 from typing import Callable
 
 import pandas as pd
-from stryder_core.pipeline import insert_full_run, process_csv_pipeline
-from stryder_core.file_parsing import ZeroStrydDataError
-from stryder_core.db_schema import run_exists
+from stryder_core.pipeline import BulkRunWriter, process_csv_pipeline
+from stryder_core.file_parsing import GarminIndex, NO_MATCH, ZeroStrydDataError, build_match_plan, load_stryd_csv
+from stryder_core.db_schema import get_run_id, run_exists
+from stryder_core.date_utilities import to_utc
+from stryder_core import import_ledger
 from stryder_core.utils import loadcsv_2df
 
 
+def default_import_workers() -> int:
+    """ Number of parser processes for batch imports, leaves one core for the writer/UI """
+    return max(1, (os.cpu_count() or 2) - 1)
+
+
 def batch_process_stryd_folder(
         stryd_folder, garmin_csv_path, conn,
         timezone_str: str | None = None,
         on_progress: Callable[[str], None] | None = None,
         should_cancel: Callable[[], bool] | None = None,
+        workers: int = 1,
+        commit_every: int = 50,
+        confirm_plan: Callable[[pd.DataFrame], bool] | None = None,
     ):
     """Creates raw df's from Stryd/Garmin files, normalizes them via pipeline,
     checks if run already exists -> skip parsing, if not inserts the run.
-    Logs per-file details and returns a summary dict.
+    Files the import ledger already settled (imported / zero data) and that are unchanged are skipped
+    after a stat() only, the outcome of every other file is recorded in the ledger.
+    All files are matched against Garmin up front (match plan, reported through on_progress), nothing is
+    parsed when confirm_plan(plan) returns False. With workers > 1 the files are parsed in a process pool while this process
+    stays the single DB writer. Runs are written through BulkRunWriter,
+    committing every `commit_every` runs. Logs per-file details and returns a summary dict.
     """
     stryd_files = list(Path(stryd_folder).glob("*.csv"))
     logging.info(f"📦 Found {len(stryd_files)} Stryd CSVs to process.")
@@ -26,44 +46,74 @@ def batch_process_stryd_folder(
 
     parsed = skipped = 0
 
-    garmin_raw_df = loadcsv_2df(garmin_csv_path)
+    settled = import_ledger.settled_files(conn, stryd_files, refresh=True)
+    conn.commit()
+    if settled:
+        skipped += len(settled)
+        logging.info(f"⏭ {len(settled)} files unchanged since the last import")
+        if on_progress:
+            on_progress(f"⏭ {len(settled)} files unchanged since the last import")
+    new_files = [file for file in stryd_files if file not in settled]
 
+    garmin = load_garmin_index(garmin_csv_path, timezone_str)
+    planned_rows = {}
     canceled = False
-
-    for file in stryd_files:
-        # Check if user canceled parsing before finishing all the files
-        if should_cancel and should_cancel():
+    if isinstance(garmin, GarminIndex) and new_files:
+        plan = build_match_plan(new_files, garmin, timezone_str)
+        report_match_plan(plan, on_progress)
+        if confirm_plan and not confirm_plan(plan):
+            logging.info("⏹ Match plan declined, no files parsed")
+            if on_progress:
+                on_progress("⏹ Match plan declined, no files parsed")
             canceled = True
-            break
+            new_files = []
+        # Files whose probe failed are left to the normal per-file lookup
+        planned_rows = {row.file: int(row.garmin_row) for row in plan.itertuples() if row.error is None}
 
-        logging.info(f"\n🔄 Processing {file.name}")
-        if on_progress:
-            on_progress(f"-- Processing {file.name}")
-
-        stryd_raw_df = loadcsv_2df(file)
-
-        run_result = evaluate_run_from_dfs(
-            stryd_raw_df,
-            garmin_raw_df,
-            file.name,
-            conn,
-            timezone_str,
-            on_progress=on_progress
-        )
-        if run_result["status"] == "ok":
-            insert_full_run(
-                run_result["stryd_df"],
-                run_result["workout_name"],
-                notes="",
-                avg_power=run_result["avg_power"],
-                avg_hr=run_result["avg_hr"],
-                total_m=run_result["total_m"],
-                conn=conn,
-            )
-            parsed += 1
+    if workers > 1 and len(new_files) > 1:
+        parsed_runs = _parse_files_in_pool(new_files, garmin, timezone_str, workers, planned_rows)
+    else:
+        parsed_runs = _parse_files_in_process(new_files, garmin, timezone_str, planned_rows)
 
-        else:
-            skipped += 1
+    try:
+        with BulkRunWriter(conn, commit_every=commit_every) as writer:
+            for file, run_result in parsed_runs:
+                # Check if user canceled parsing before finishing all the files
+                if should_cancel and should_cancel():
+                    canceled = True
+                    break
+
+                logging.info(f"\n🔄 Processing {file.name}")
+                if on_progress:
+                    on_progress(f"-- Processing {file.name}")
+
+                run_result = finalize_run_result(run_result, file.name, conn, on_progress=on_progress)
+                if run_result["status"] != "ok":
+                    record_import_result(conn, file, run_result, commit=False)
+                    skipped += 1
+                    continue
+
+                try:
+                    _, run_id = writer.add_run(
+                        run_result["stryd_df"],
+                        run_result["workout_name"],
+                        notes="",
+                        avg_power=run_result["avg_power"],
+                        avg_hr=run_result["avg_hr"],
+                        total_m=run_result["total_m"],
+                    )
+                except Exception as e:
+                    # Only this run was rolled back, keep going with the rest of the batch
+                    logging.error(f"❌ Failed to save {file.name}: {e}")
+                    if on_progress:
+                        on_progress(f"❌ Failed to save {file.name}: {e}")
+                    record_import_result(conn, file, run_result, status=import_ledger.ERROR, commit=False)
+                    skipped += 1
+                    continue
+                record_import_result(conn, file, run_result, run_id=run_id, commit=False)
+                parsed += 1
+    finally:
+        parsed_runs.close()     # stops the pool (if any) when the loop is left early
 
     logging.info(
         "Batch completed: %d parsed, %d skipped (total %d files)",
@@ -78,10 +128,138 @@ def batch_process_stryd_folder(
         "parsed": parsed,
         "skipped": skipped,
         "files_total": len(stryd_files),
+        "unchanged": len(settled),
         "canceled" : canceled
     }
 
 
+# Run result status → import ledger status
+_LEDGER_STATUS = {
+    "ok": import_ledger.IMPORTED,
+    "already_exists": import_ledger.IMPORTED,
+    "zero_data": import_ledger.ZERO_DATA,
+    "no_garmin": import_ledger.NO_GARMIN,
+    "error": import_ledger.ERROR,
+}
+
+
+def record_import_result(conn, file, run_result: dict, *, status: str | None = None, run_id: int | None = None,
+                         commit: bool = True) -> None:
+    """ Stores a file's outcome (a prepare_run_insert / batch run result) in the import ledger """
+    status = status or _LEDGER_STATUS.get(run_result["status"], import_ledger.ERROR)
+    first_ts = None
+    if run_result["start_time"] is not None:
+        first_ts = to_utc(run_result["start_time"]).isoformat(sep=' ', timespec='seconds')
+        if run_id is None and status == import_ledger.IMPORTED:
+            run_id = get_run_id(conn, first_ts)
+    try:
+        import_ledger.record_file(conn, file, status, first_ts=first_ts, run_id=run_id, commit=commit)
+    except OSError as e:        # file vanished since it was parsed, nothing to remember
+        logging.warning(f"⚠️ Could not record {Path(file).name} in the import ledger: {e}")
+
+
+def load_garmin_index(garmin_csv_path, timezone_str):
+    """ Loads the Garmin csv and prepares it for matching, done once per batch (or pool worker).
+        A malformed export falls back to the raw df so every file reports the error as before """
+    garmin_raw_df = loadcsv_2df(garmin_csv_path)
+    try:
+        return GarminIndex(garmin_raw_df, timezone_str)
+    except Exception as e:
+        logging.error(f"❌ Could not index Garmin csv {garmin_csv_path}: {e}")
+        return garmin_raw_df
+
+
+def report_match_plan(plan: pd.DataFrame, on_progress: Callable[[str], None] | None = None) -> None:
+    """ Logs the match plan (file → Garmin workout) so it can be reviewed before the files are parsed """
+    matched = int((plan["garmin_row"] != NO_MATCH).sum())
+    logging.info(f"🗺 Match plan: {matched} of {len(plan)} files matched with Garmin")
+    if on_progress:
+        on_progress(f"🗺 Match plan: {matched} of {len(plan)} files matched with Garmin")
+
+    for row in plan.itertuples():
+        if row.error is not None:
+            line = f"   {row.file.name} → could not read start time: {row.error}"
+        elif row.garmin_row == NO_MATCH:
+            line = f"   {row.file.name} → no Garmin match"
+        else:
+            line = f"   {row.file.name} → {row.wt_name}"
+        logging.debug(line)
+        if on_progress:
+            on_progress(line)
+
+
+# Stryd files above this size are read in chunks of STRYD_CHUNK_ROWS samples
+LARGE_STRYD_FILE_BYTES = 64 * 1024 * 1024
+STRYD_CHUNK_ROWS = 100_000
+
+
+def load_stryd_file(file):
+    """ Typed, column-pruned Stryd load, very long recordings come back as a chunk iterator """
+    if os.path.getsize(file) > LARGE_STRYD_FILE_BYTES:
+        return load_stryd_csv(file, chunksize=STRYD_CHUNK_ROWS)
+    return load_stryd_csv(file)
+
+
+def _parse_files_in_process(stryd_files, garmin, timezone_str, planned_rows):
+    """ Sequential parser, yields (file, parsed run result) in file order """
+    for file in stryd_files:
+        try:
+            stryd_raw_df = load_stryd_file(file)
+        except Exception as e:      # unreadable csv, same outcome as in the pool
+            yield file, _error_result(e)
+            continue
+        yield file, parse_run_from_dfs(stryd_raw_df, garmin, file.name, timezone_str, planned_rows.get(file))
+
+
+# Garmin index of a pool worker process, set once by _init_import_worker
+_worker_garmin: GarminIndex | pd.DataFrame | None = None
+
+
+def _init_import_worker(garmin) -> None:
+    """ Pool initializer, receives the Garmin index once per worker process """
+    global _worker_garmin
+    _worker_garmin = garmin
+
+
+def _parse_file_in_worker(file, timezone_str, planned_row):
+    """ Runs inside a pool worker: loads one Stryd csv and runs the pipeline, no DB access """
+    stryd_raw_df = load_stryd_file(file)
+    return parse_run_from_dfs(stryd_raw_df, _worker_garmin, file.name, timezone_str, planned_row)
+
+
+def _parse_files_in_pool(stryd_files, garmin, timezone_str, workers, planned_rows):
+    """ Parallel parser, yields (file, parsed run result) in file order.
+        Only a bounded number of files is in flight so cancel stays responsive and memory stays flat. """
+    # spawn instead of fork: the TUI calls this from a worker thread
+    ctx = multiprocessing.get_context("spawn")
+    max_in_flight = workers * 2
+    pending = deque()
+    files = iter(stryd_files)
+
+    executor = ProcessPoolExecutor(max_workers=workers, mp_context=ctx,
+                                   initializer=_init_import_worker, initargs=(garmin,))
+
+    def submit(file):
+        return executor.submit(_parse_file_in_worker, file, timezone_str, planned_rows.get(file))
+
+    try:
+        for file in islice(files, max_in_flight):
+            pending.append((file, submit(file)))
+
+        while pending:
+            file, future = pending.popleft()
+            next_file = next(files, None)
+            if next_file is not None:
+                pending.append((next_file, submit(next_file)))
+            try:
+                run_result = future.result()
+            except Exception as e:      # worker crashed or result could not be pickled
+                run_result = _error_result(e)
+            yield file, run_result
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
 def single_process_stryd_file(stryd_csv_path, garmin_csv_path, conn, timezone_str: str | None = None):
     """
     Core engine for importing a single Stryd file.
@@ -113,14 +291,15 @@ def single_process_stryd_file(stryd_csv_path, garmin_csv_path, conn, timezone_st
 
 
 
-def prepare_run_insert(stryd_file, garmin_file, file_name, conn, timezone_str):
+def prepare_run_insert(stryd_file, garmin_file, file_name, conn, timezone_str,
+                       garmin_index: GarminIndex | pd.DataFrame | None = None):
     """ Checks the run if it can be parsed or not and return a dict with info about it. Works in two steps
-        a) Creates the dataframes of Stryd and Garmin files
+        a) Creates the dataframes of Stryd and Garmin files (a prepared garmin_index skips the Garmin csv)
         b) calls evaluate_run_from_dfs to evaluate and return a dictionary for output in the UI """
     # Transform Stryd and Garmin csv's to dataframes
-    stryd_raw_df = loadcsv_2df(stryd_file)
-    garmin_raw_df = loadcsv_2df(garmin_file)
-    return evaluate_run_from_dfs(stryd_raw_df, garmin_raw_df, file_name, conn, timezone_str)
+    stryd_raw_df = load_stryd_file(stryd_file)
+    garmin = garmin_index if garmin_index is not None else loadcsv_2df(garmin_file)
+    return evaluate_run_from_dfs(stryd_raw_df, garmin, file_name, conn, timezone_str)
 
 
 def evaluate_run_from_dfs(stryd_raw_df, garmin_raw_df, file_name, conn, timezone_str,
@@ -130,9 +309,13 @@ def evaluate_run_from_dfs(stryd_raw_df, garmin_raw_df, file_name, conn, timezone
     runs the pipeline, checks DB, and returns the result dict.
     No CSV loading at all.
     """
+    result = parse_run_from_dfs(stryd_raw_df, garmin_raw_df, file_name, timezone_str)
+    return finalize_run_result(result, file_name, conn, on_progress=on_progress)
 
 
-    result = {
+def _blank_result() -> dict:
+    """ Result dict with every field empty, status defaults to error """
+    return {
         "status": "error",  # default value
         "workout_name": None,
         "start_time": None,
@@ -142,33 +325,69 @@ def evaluate_run_from_dfs(stryd_raw_df, garmin_raw_df, file_name, conn, timezone
         "stryd_df": None,
         "error": None,
     }
+
+
+def _error_result(e: Exception) -> dict:
+    """ Result dict for a run that failed to parse """
+    result = _blank_result()
+    result["error"] = str(e)
+    return result
+
+
+def parse_run_from_dfs(stryd_raw_df, garmin_raw_df, file_name, timezone_str, planned_row: int | None = None) -> dict:
+    """
+    DB-free half of evaluate_run_from_dfs, safe to run in a worker process.
+    garmin_raw_df may also be a GarminIndex shared by many files, planned_row its precomputed match.
+    Runs the pipeline and returns the result dict with status ok, no_garmin, zero_data or error.
+    No logging of the outcome, finalize_run_result does that in the writer process.
+    """
+    result = _blank_result()
     try:
         stryd_df, _, avg_power, _, avg_hr, total_m = process_csv_pipeline(stryd_raw_df, garmin_raw_df, timezone_str,
-                                                                          file_name)
+                                                                          file_name, planned_row)
+
         result["avg_power"] = avg_power
         result["avg_hr"] = avg_hr
         result["total_m"] = total_m
         result["stryd_df"] = stryd_df
         # ✅ Use LOCAL timestamp string to match DB, no UTC conversion here
         start_time = stryd_df["ts_local"].iloc[0]
-        start_time_str = start_time.isoformat(sep=' ', timespec='seconds')
-        result["start_time"] = start_time_str
-
-        # Check the DB to avoid re-inserts
-        if run_exists(conn, start_time_str):
-            logging.info(f"⚠️  Run already exists in DB: {file_name} ({start_time_str})")
-            if on_progress:
-                on_progress(f"! Run already exists in DB: {file_name} ({start_time_str})")
-            result["status"] = "already_exists"
-            return result
+        result["start_time"] = start_time.isoformat(sep=' ', timespec='seconds')
 
+        workout_name = stryd_df.get("wt_name", pd.Series(["Unknown"])).iloc[0]
+        result["workout_name"] = workout_name
+        result["status"] = "ok" if workout_name != "Unknown" else "no_garmin"
+        return result
     except ZeroStrydDataError as e:
-        logging.info(f"⏭️ Run skipped due to zero Stryd speed/distance: {file_name} — {e}")
-        if on_progress:
-            on_progress(f">> Run skipped due to zero Stryd speed/distance: {file_name} — {e}")
         result["status"] = "zero_data"
+        result["error"] = str(e)
         return result
+    except Exception as e:
+        return _error_result(e)
+
 
+def finalize_run_result(result: dict, file_name, conn,
+                        on_progress: Callable[[str], None] | None = None) -> dict:
+    """
+    DB half of evaluate_run_from_dfs: checks the DB to avoid re-inserts,
+    logs the outcome and reports it through on_progress.
+    """
+    if result["status"] == "zero_data":
+        logging.info(f"⏭️ Run skipped due to zero Stryd speed/distance: {file_name} — {result['error']}")
+        if on_progress:
+            on_progress(f">> Run skipped due to zero Stryd speed/distance: {file_name} — {result['error']}")
+        return result
+
+    if result["status"] == "error":
+        logging.error(f"❌ Failed to process {file_name}: {result['error']}")
+        if on_progress:
+            on_progress(f"❌ Failed to process {file_name}: {result['error']}")
+        return result
+
+    # Check the DB to avoid re-inserts
+    start_time_str = result["start_time"]
+    try:
+        exists = run_exists(conn, start_time_str)
     except Exception as e:
         logging.error(f"❌ Failed to process {file_name}: {e}")
         if on_progress:
@@ -177,20 +396,23 @@ def evaluate_run_from_dfs(stryd_raw_df, garmin_raw_df, file_name, conn, timezone
         result["status"] = "error"
         return result
 
-    workout_name = stryd_df.get("wt_name", pd.Series(["Unknown"])).iloc[0]
+    if exists:
+        logging.info(f"⚠️  Run already exists in DB: {file_name} ({start_time_str})")
+        if on_progress:
+            on_progress(f"! Run already exists in DB: {file_name} ({start_time_str})")
+        result["status"] = "already_exists"
+        return result
 
+    total_m = result["total_m"]
     # Garmin matched
-    result["workout_name"] = workout_name
-    if workout_name != "Unknown":
+    if result["status"] == "ok":
         logging.info(f"✅ Garmin match found: {file_name} - {total_m / 1000:.2f} km")
         if on_progress:
             on_progress(f"✔ Garmin match found: {file_name} - {total_m / 1000:.2f} km")
-        result["status"] = "ok"
         return result
 
     else:
         logging.info(f"❌ No Garmin match found: {file_name}")
         if on_progress:
             on_progress(f"❌ No Garmin match found: {file_name}")
-        result["status"] = "no_garmin"
-        return result
\ No newline at end of file
+        return result
@@ -32,21 +32,22 @@ METRICS_SPEC : dict[str ,MetricInfo] = {
 }
 
 # Canonical stream keys that will be used in file parsing #
+# Keys with a dtype are the ones load_stryd_csv reads, the rest of the csv is never loaded.
 STRYD_PARSE_SPEC = {
-    "timestamp_s":        {"aliases": ["Timestamp"]},
+    "timestamp_s":        {"aliases": ["Timestamp"],                    "dtype": "float64"},
     "str_dist_m":         {"aliases": ["Stryd Distance (meters)"]},
     "watch_dist_m":       {"aliases": ["Watch Distance (meters)"]},
-    "str_speed":          {"aliases": ["Stryd Speed (m/s)"]},
+    "str_speed":          {"aliases": ["Stryd Speed (m/s)"],            "dtype": "float64"},
     "watch_speed":        {"aliases": ["Watch Speed (m/s)"]},
-    "power_sec":          {"aliases": ["Power (w/kg)"]},
+    "power_sec":          {"aliases": ["Power (w/kg)"],                 "dtype": "float64"},
     "form_power":         {"aliases": ["Form Power (w/kg)"]},
     "air_power":          {"aliases": ["Air Power (w/kg)"]},
-    "ground":             {"aliases": ["Ground Time (ms)"]},
-    "cadence":            {"aliases": ["Cadence (spm)"]},
-    "vo":                 {"aliases": ["Vertical Oscillation (cm)"]},
+    "ground":             {"aliases": ["Ground Time (ms)"],             "dtype": "Int16"},
+    "cadence":            {"aliases": ["Cadence (spm)"],                "dtype": "Int16"},
+    "vo":                 {"aliases": ["Vertical Oscillation (cm)"],    "dtype": "float64"},
     "watch_elev":         {"aliases": ["Watch Elevation (m)"]},
     "stryd_elev":         {"aliases": ["Stryd Elevation (m)"]},
-    "stiffness":          {"aliases": ["Stiffness"]},
+    "stiffness":          {"aliases": ["Stiffness"],                    "dtype": "float64"},
     "stiffness_kg":       {"aliases": ["Stiffness/kg"]},
     "ts_local":           {"aliases": ["Local Timestamp"]},             # produced in edit_stryd_csv
     "delta_s":            {"aliases": ["Time Delta"]},                  # produced in edit_stryd_csv
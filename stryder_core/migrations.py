@@ -0,0 +1,315 @@
+""" Forward-only schema migrations for runs_data.db: numbered @schema_migration steps after the init_db
+    base tables, PRAGMA user_version stores the last applied one. """
+
+import logging
+import sqlite3
+from typing import Callable
+
+Migration = tuple[int, Callable[[sqlite3.Connection], None]]
+
+MIGRATIONS: list[Migration] = []
+
+
+class SchemaVersionError(Exception):
+    """Raised when the DB was written by a newer Stryder than the running one."""
+    pass
+
+
+def schema_migration(version: int):
+    """ Registers the decorated function as the schema step for `version`, versions must be added in order """
+    def register(step: Callable[[sqlite3.Connection], None]):
+        if MIGRATIONS and version <= MIGRATIONS[-1][0]:
+            raise ValueError(f"Migration v{version} registered after v{MIGRATIONS[-1][0]}")
+        MIGRATIONS.append((version, step))
+        return step
+    return register
+
+
+def get_schema_version(conn) -> int:
+    """ Returns the last migration applied to the DB """
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def latest_schema_version(migrations: list[Migration] | None = None) -> int:
+    """ Returns the version the code expects """
+    migrations = MIGRATIONS if migrations is None else migrations
+    return migrations[-1][0] if migrations else 0
+
+
+def has_base_schema(conn) -> bool:
+    """ True if init_db already created the core tables """
+    row = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'runs'").fetchone()
+    return row is not None
+
+
+def upgrade_schema(conn, migrations: list[Migration] | None = None) -> int:
+    """ Applies every pending migration in order, each one in its own IMMEDIATE transaction together with
+        its user_version bump, so a failing step leaves the DB at the previous version. Returns the new version. """
+    migrations = MIGRATIONS if migrations is None else migrations
+    latest = latest_schema_version(migrations)
+    current = get_schema_version(conn)
+
+    if current > latest:
+        raise SchemaVersionError(f"Database schema v{current} is newer than this Stryder (v{latest}).")
+
+    if conn.in_transaction:
+        conn.commit()
+
+    for version, step in migrations:
+        if version <= current:
+            continue
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            # Another process may have migrated while we waited for the write lock
+            current = get_schema_version(conn)
+            if version <= current:
+                conn.rollback()
+                continue
+            logging.info(f"[DB] Migrating schema v{current} → v{version}: {step.__name__}")
+            step(conn)
+            conn.execute(f"PRAGMA user_version = {int(version)}")
+            conn.commit()
+            current = version
+        except Exception:
+            conn.rollback()
+            logging.error(f"❌ [DB] Migration to v{version} failed, schema left at v{current}")
+            raise
+
+    return current
+
+
+def upgrade_schema_if_needed(conn) -> None:
+    """ Cheap check for connect_db: only touches the DB when it is initialized and behind """
+    if get_schema_version(conn) >= latest_schema_version():
+        return
+    if not has_base_schema(conn):
+        return      # fresh file, init_db creates the tables and then migrates
+    upgrade_schema(conn)
+
+
+# ------------------ MIGRATIONS ---------------------------- #
+# A step is frozen once released: it only runs the SQL written here, never application code that may change later
+
+def _dedupe_runs_by_datetime(conn):
+    """ Keeps the oldest run per start datetime, deletes the newer copies with their metrics and workouts """
+    dup_ids = [row[0] for row in conn.execute("""
+        SELECT id FROM runs
+        WHERE id NOT IN (SELECT MIN(id) FROM runs GROUP BY datetime)
+    """)]
+    if not dup_ids:
+        return
+
+    logging.warning(f"⚠️ Removing {len(dup_ids)} duplicate runs before adding the unique index")
+    placeholders = ",".join("?" * len(dup_ids))
+    workout_ids = [row[0] for row in conn.execute(
+        f"SELECT workout_id FROM runs WHERE id IN ({placeholders})", dup_ids)]
+    conn.execute(f"DELETE FROM metrics WHERE run_id IN ({placeholders})", dup_ids)
+    conn.execute(f"DELETE FROM runs WHERE id IN ({placeholders})", dup_ids)
+    conn.executemany("""
+        DELETE FROM workouts
+        WHERE id = ? AND NOT EXISTS (SELECT 1 FROM runs WHERE workout_id = workouts.id)
+    """, [(w,) for w in workout_ids])
+
+
+@schema_migration(1)
+def _add_lookup_indexes(conn):
+    """ Indexes for run_exists, single run samples and the type joins, one run per start datetime """
+    _dedupe_runs_by_datetime(conn)
+    conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_runs_datetime ON runs(datetime)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_metrics_run_datetime ON metrics(run_id, datetime)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_workouts_workout_type_id ON workouts(workout_type_id)")
+
+
+@schema_migration(2)
+def _add_import_ledger(conn):
+    """ One row per Stryd csv seen by the importer, see import_ledger.py """
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS import_ledger (
+            path TEXT PRIMARY KEY,
+            size INTEGER NOT NULL,
+            mtime_ns INTEGER NOT NULL,
+            content_hash TEXT NOT NULL,
+            first_ts TEXT,
+            run_id INTEGER,
+            status TEXT NOT NULL
+        )
+    """)
+
+
+@schema_migration(3)
+def _add_packed_metrics(conn):
+    """ Packed per-run samples (see packed_metrics.py), stored runs are moved with python -m stryder_core.packed_metrics """
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS metrics_packed (
+            run_id INTEGER PRIMARY KEY,
+            samples INTEGER NOT NULL,
+            start_epoch INTEGER NOT NULL,
+            elapsed BLOB NOT NULL,
+            utc_offset BLOB NOT NULL,
+            power BLOB,
+            stryd_distance BLOB,
+            ground_time BLOB,
+            stiffness BLOB,
+            cadence BLOB,
+            vertical_oscillation BLOB,
+            FOREIGN KEY (run_id) REFERENCES runs(id)
+        )
+    """)
+
+
+@schema_migration(4)
+def _add_run_summaries(conn):
+    """ Per-run summary row (see run_summaries.py), the writers fill it for the stored runs at startup """
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS run_summaries (
+            run_id INTEGER PRIMARY KEY,
+            start_dt TEXT NOT NULL,
+            duration_sec INTEGER NOT NULL,
+            distance_km REAL,
+            avg_power REAL,
+            ground_time REAL,
+            stiffness REAL,
+            cadence REAL,
+            vertical_oscillation REAL,
+            FOREIGN KEY (run_id) REFERENCES runs(id)
+        )
+    """)
+
+
+@schema_migration(5)
+def _add_run_rollups(conn):
+    """ Daily and weekly rollups per timezone (see run_rollups.py), built per timezone on first use """
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS rollup_zones (
+            tz TEXT PRIMARY KEY,
+            runs INTEGER NOT NULL,
+            last_run_id INTEGER NOT NULL
+        )
+    """)
+    for table, key in (("daily_rollups", "day"), ("weekly_rollups", "week_start")):
+        conn.execute(f"""
+            CREATE TABLE IF NOT EXISTS {table} (
+                tz TEXT NOT NULL,
+                {key} TEXT NOT NULL,
+                runs INTEGER NOT NULL,
+                distance_km REAL NOT NULL,
+                duration_sec INTEGER NOT NULL,
+                power_sum REAL NOT NULL,
+                power_runs INTEGER NOT NULL,
+                hr_sum REAL NOT NULL,
+                hr_runs INTEGER NOT NULL,
+                PRIMARY KEY (tz, {key})
+            ) WITHOUT ROWID
+        """)
+
+
+# SQL for the listed_runs change of a run with workout `{workout_id}` (1 when views_query lists it)
+_LISTED = """(SELECT COUNT(*) FROM workouts w JOIN workout_types wt ON w.workout_type_id = wt.id
+              WHERE w.id = {workout_id})"""
+_BUMP_VERSION = "UPDATE row_counts SET value = value + 1 WHERE name = 'data_version';"
+_UNKNOWN_LISTED = "UPDATE row_counts SET value = NULL WHERE name = 'listed_runs'"
+
+# trigger name → (event, body), kept by every writer (see row_counts.py)
+_ROW_COUNT_TRIGGERS = {
+    "runs_count_insert": ("AFTER INSERT ON runs", f"""
+        {_BUMP_VERSION}
+        UPDATE row_counts SET value = value + {_LISTED.format(workout_id="NEW.workout_id")} WHERE name = 'listed_runs';
+    """),
+    "runs_count_delete": ("AFTER DELETE ON runs", f"""
+        {_BUMP_VERSION}
+        UPDATE row_counts SET value = value - {_LISTED.format(workout_id="OLD.workout_id")} WHERE name = 'listed_runs';
+    """),
+    "runs_count_update": ("AFTER UPDATE ON runs", f"""
+        {_BUMP_VERSION}
+        {_UNKNOWN_LISTED} AND NEW.workout_id IS NOT OLD.workout_id;
+    """),
+    "workouts_count_insert": ("AFTER INSERT ON workouts", _BUMP_VERSION),
+    "workouts_count_delete": ("AFTER DELETE ON workouts", f"""
+        {_BUMP_VERSION}
+        {_UNKNOWN_LISTED} AND EXISTS (SELECT 1 FROM runs WHERE workout_id = OLD.id);
+    """),
+    "workouts_count_update": ("AFTER UPDATE ON workouts", f"""
+        {_BUMP_VERSION}
+        {_UNKNOWN_LISTED} AND (NEW.id IS NOT OLD.id OR NEW.workout_type_id IS NOT OLD.workout_type_id);
+    """),
+    "workout_types_count_insert": ("AFTER INSERT ON workout_types", _BUMP_VERSION),
+    "workout_types_count_delete": ("AFTER DELETE ON workout_types", f"""
+        {_BUMP_VERSION}
+        {_UNKNOWN_LISTED} AND EXISTS (SELECT 1 FROM workouts WHERE workout_type_id = OLD.id);
+    """),
+    "workout_types_count_update": ("AFTER UPDATE ON workout_types", f"""
+        {_BUMP_VERSION}
+        {_UNKNOWN_LISTED} AND NEW.id IS NOT OLD.id;
+    """),
+}
+
+
+@schema_migration(6)
+def _add_row_counts(conn):
+    """ Data version and listed run count kept by triggers (see row_counts.py), counted once for the stored runs """
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS row_counts (
+            name TEXT PRIMARY KEY,
+            value INTEGER
+        ) WITHOUT ROWID
+    """)
+    conn.execute("""
+        INSERT OR IGNORE INTO row_counts (name, value)
+        VALUES ('instance', abs(random())), ('data_version', 0), ('listed_runs', 0)
+    """)
+    for name, (event, body) in _ROW_COUNT_TRIGGERS.items():
+        conn.execute(f"CREATE TRIGGER IF NOT EXISTS {name} {event} BEGIN {body} END")
+    conn.execute("""
+        UPDATE row_counts SET value = (
+            SELECT COUNT(*) FROM runs r
+            JOIN workouts w ON r.workout_id = w.id
+            JOIN workout_types wt ON w.workout_type_id = wt.id
+        ) WHERE name = 'listed_runs'
+    """)
+    listed = conn.execute("SELECT value FROM row_counts WHERE name = 'listed_runs'").fetchone()[0]
+    logging.info(f"[DB] Counted {listed} listed runs")
+
+
+# SQL for the workouts_fts row of workout `{workout}`
+_FTS_ROW = """INSERT INTO workouts_fts (rowid, workout_name, workout_type)
+              VALUES ({workout}.id, {workout}.workout_name,
+                      (SELECT name FROM workout_types WHERE id = {workout}.workout_type_id));"""
+
+# trigger name → (event, body), keep workouts_fts in sync with workouts (see workout_search.py)
+_WORKOUT_SEARCH_TRIGGERS = {
+    "workouts_fts_insert": ("AFTER INSERT ON workouts", _FTS_ROW.format(workout="NEW")),
+    "workouts_fts_delete": ("AFTER DELETE ON workouts", "DELETE FROM workouts_fts WHERE rowid = OLD.id;"),
+    "workouts_fts_update": ("AFTER UPDATE ON workouts", f"""
+        DELETE FROM workouts_fts WHERE rowid = OLD.id;
+        {_FTS_ROW.format(workout="NEW")}
+    """),
+    "workout_types_fts_update": ("AFTER UPDATE OF name ON workout_types", """
+        UPDATE workouts_fts SET workout_type = NEW.name
+        WHERE rowid IN (SELECT id FROM workouts WHERE workout_type_id = OLD.id);
+    """),
+    "workout_types_fts_delete": ("AFTER DELETE ON workout_types", """
+        UPDATE workouts_fts SET workout_type = NULL
+        WHERE rowid IN (SELECT id FROM workouts WHERE workout_type_id = OLD.id);
+    """),
+}
+
+
+@schema_migration(7)
+def _add_workout_search(conn):
+    """ FTS5 index of workout names and types (see workout_search.py), filled from the stored workouts.
+        Skipped when SQLite has no FTS5, the keyword filters then keep using LIKE """
+    try:
+        conn.execute("CREATE VIRTUAL TABLE IF NOT EXISTS workouts_fts USING fts5(workout_name, workout_type)")
+    except sqlite3.OperationalError as e:
+        logging.warning(f"⚠️ Workout search index not created ({e}), keyword search uses LIKE")
+        return
+    for name, (event, body) in _WORKOUT_SEARCH_TRIGGERS.items():
+        conn.execute(f"CREATE TRIGGER IF NOT EXISTS {name} {event} BEGIN {body} END")
+    conn.execute("DELETE FROM workouts_fts")
+    indexed = conn.execute("""
+        INSERT INTO workouts_fts (rowid, workout_name, workout_type)
+        SELECT w.id, w.workout_name, wt.name
+        FROM workouts w
+        LEFT JOIN workout_types wt ON w.workout_type_id = wt.id
+    """).rowcount
+    logging.info(f"[DB] Indexed {indexed} workouts for search")
@@ -0,0 +1,225 @@
+""" Compact metrics storage (STRYDER_METRICS_STORAGE=packed): one metrics_packed row per run instead of one
+    metrics row per sample, each channel in the narrowest dtype that unpacks to the stored values. """
+
+import argparse
+import logging
+import os
+import sqlite3
+import zlib
+from datetime import timedelta, timezone
+
+import numpy as np
+import pandas as pd
+
+STORAGE_ENV = "STRYDER_METRICS_STORAGE"
+ROWS = "rows"
+PACKED = "packed"
+
+# metrics sample columns, same names in metrics_packed
+CHANNELS = ("power", "stryd_distance", "ground_time", "stiffness", "cadence", "vertical_oscillation")
+
+# Candidate dtypes narrowest first, float32 only when rounding it to _F4_DECIMALS gives the stored double back
+_PACK_DTYPES = ("<i2", "<i4", "<f4", "<f8")
+_F4_DECIMALS = 4
+_COMPRESSED = b"z"
+_RAW = b"r"
+
+# 'YYYY-MM-DD HH:MM:SS+HH:MM' as written by format_db_datetimes
+_DB_DATETIME_RE = r"^\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}[+-]\d{2}:\d{2}$"
+
+
+def metrics_storage() -> str:
+    """ Storage mode new runs are written in, from STRYDER_METRICS_STORAGE """
+    storage = os.environ.get(STORAGE_ENV, ROWS).strip().lower() or ROWS
+    if storage not in (ROWS, PACKED):
+        raise ValueError(f"{STORAGE_ENV} must be '{ROWS}' or '{PACKED}', got '{storage}'")
+    return storage
+
+
+def _widen(arr: np.ndarray) -> np.ndarray:
+    """ Packed array back to float64, float32 is rounded to _F4_DECIMALS (0.7 → 0.7, not 0.699999988) """
+    if arr.dtype == np.float32:
+        return np.float64(arr).round(_F4_DECIMALS)
+    return arr.astype(np.float64)
+
+
+def pack_array(values, compress: bool = True) -> bytes:
+    """ Packs float64 values (NaN for NULL) as dtype tag + compression flag + array bytes """
+    values = np.asarray(values, dtype=np.float64)
+    finite = np.isfinite(values).all()
+    packed = values
+    for dtype in _PACK_DTYPES:
+        if dtype[1] == "i":
+            info = np.iinfo(dtype)
+            if not finite or (len(values) and (values.min() < info.min or values.max() > info.max)):
+                continue
+            if not np.array_equal(np.round(values), values):
+                continue
+        packed = values.astype(dtype)
+        if np.array_equal(_widen(packed), values, equal_nan=True):
+            break
+
+    payload = packed.tobytes()
+    if compress:
+        return packed.dtype.str.encode() + _COMPRESSED + zlib.compress(payload)
+    return packed.dtype.str.encode() + _RAW + payload
+
+
+def unpack_array(blob: bytes) -> np.ndarray:
+    """ Inverse of pack_array, always returns float64 """
+    dtype, flag, payload = blob[:3].decode(), blob[3:4], blob[4:]
+    if flag == _COMPRESSED:
+        payload = zlib.decompress(payload)
+    return _widen(np.frombuffer(payload, dtype=dtype))
+
+
+def pack_samples(samples: pd.DataFrame, compress: bool = True) -> dict | None:
+    """ Takes metrics rows (datetime text + CHANNELS, None for NULL), returns the metrics_packed columns.
+        None when a datetime is not in the DB format, those runs stay as rows """
+    dt_text = samples["datetime"].astype(str)
+    if not dt_text.str.match(_DB_DATETIME_RE).all():
+        return None
+
+    epoch = (pd.to_datetime(dt_text, utc=True, format="%Y-%m-%d %H:%M:%S%z")
+             .to_numpy(dtype="datetime64[s]").astype(np.int64))
+    sign = np.where(dt_text.str[-6] == "-", -1, 1)
+    offset_min = sign * (dt_text.str[-5:-3].astype(int) * 60 + dt_text.str[-2:].astype(int)).to_numpy()
+    start_epoch = int(epoch[0]) if len(epoch) else 0
+
+    packed = {
+        "samples": len(samples),
+        "start_epoch": start_epoch,
+        "elapsed": pack_array(epoch - start_epoch, compress),
+        "utc_offset": pack_array(offset_min, compress),
+    }
+    for channel in CHANNELS:
+        values = samples[channel].to_numpy(dtype=np.float64, na_value=np.nan) if channel in samples.columns else None
+        packed[channel] = None if values is None or np.isnan(values).all() else pack_array(values, compress)
+    return packed
+
+
+def insert_packed_metrics(conn, run_id, samples: pd.DataFrame) -> bool:
+    """ Stores a run's samples as one metrics_packed row, False if they have to stay as rows """
+    packed = pack_samples(samples)
+    if packed is None:
+        logging.debug(f"[DB] Run {run_id} has datetimes outside the DB format, stored as rows")
+        return False
+    columns = ("run_id", *packed)
+    conn.execute(f"INSERT INTO metrics_packed ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+                 (run_id, *packed.values()))
+    return True
+
+
+def _local_datetime_text(epoch: np.ndarray, offset_min: np.ndarray) -> pd.Series:
+    """ Rebuilds the 'YYYY-MM-DD HH:MM:SS+HH:MM' text of each sample """
+    local = pd.Series(pd.to_datetime(epoch + offset_min * 60, unit="s")).dt.strftime("%Y-%m-%d %H:%M:%S")
+    suffixes = {}
+    for minutes in np.unique(offset_min):
+        h, m = divmod(abs(int(minutes)), 60)
+        suffixes[minutes] = f"{'-' if minutes < 0 else '+'}{h:02d}:{m:02d}"
+    return local + pd.Series(offset_min).map(suffixes)
+
+
+def unpack_samples(row) -> pd.DataFrame:
+    """ metrics_packed row (samples, start_epoch, elapsed, utc_offset, *CHANNELS) → datetime text + CHANNELS
+        in insertion order, like SELECT ... FROM metrics ORDER BY id """
+    samples, start_epoch, elapsed, utc_offset, *channels = row
+    epoch = start_epoch + unpack_array(elapsed).astype(np.int64)
+    offset_min = unpack_array(utc_offset).astype(np.int64)
+    df = pd.DataFrame({"datetime": _local_datetime_text(epoch, offset_min)})
+    for name, blob in zip(CHANNELS, channels):
+        df[name] = unpack_array(blob) if blob is not None else np.full(samples, np.nan)
+    return df
+
+
+def load_packed_samples(conn, run_id: int) -> pd.DataFrame | None:
+    """ Samples of a packed run with the columns/order of the get_single_run_query SQL
+        (id is the sample number here), None if the run is stored as rows """
+    try:
+        row = conn.execute(f"""
+            SELECT p.samples, p.start_epoch, p.elapsed, p.utc_offset, {', '.join('p.' + c for c in CHANNELS)},
+                   w.workout_name
+            FROM metrics_packed p
+            JOIN runs r ON p.run_id = r.id
+            JOIN workouts w ON r.workout_id = w.id
+            WHERE p.run_id = ?
+        """, (run_id,)).fetchone()
+    except sqlite3.OperationalError:
+        return None     # read-only connection to a DB no writer has migrated yet
+    if row is None:
+        return None
+
+    samples, start_epoch, elapsed, utc_offset, *channels, wt_name = row
+    epoch = start_epoch + unpack_array(elapsed).astype(np.int64)
+    offset_min = unpack_array(utc_offset).astype(np.int64)
+
+    if len(np.unique(offset_min)) <= 1:
+        # one offset: text order is time order and the parse is a plain conversion
+        order = np.argsort(epoch, kind="stable")
+        # same fixed-offset tz pandas gives when parsing '+HH:MM' text
+        tz = timezone(timedelta(minutes=int(offset_min[0]) if samples else 0))
+        dt = pd.to_datetime(epoch[order], unit="s", utc=True).tz_convert(tz)
+    else:
+        # DST change mid-run: sort and parse the text exactly like the SQL path does
+        text = _local_datetime_text(epoch, offset_min)
+        order = np.argsort(text.to_numpy(dtype=str), kind="stable")
+        dt = pd.to_datetime(text.iloc[order].reset_index(drop=True), errors="coerce")
+
+    df = pd.DataFrame({"id": np.arange(1, samples + 1), "run_id": int(run_id), "dt": dt})
+    for name, blob in zip(CHANNELS, channels):
+        df[name] = unpack_array(blob)[order] if blob is not None else np.full(samples, np.nan)
+    df["wt_name"] = wt_name
+    return df
+
+
+def convert_metrics_storage(conn, storage: str) -> int:
+    """ Moves every run's samples to `storage` (ROWS or PACKED), returns the number of runs moved.
+        Runs whose datetimes can't be packed stay as rows. No commit, the caller owns the transaction """
+    moved = 0
+    if storage == PACKED:
+        run_ids = [r[0] for r in conn.execute("SELECT DISTINCT run_id FROM metrics WHERE run_id IS NOT NULL")]
+        for run_id in run_ids:
+            samples = pd.read_sql(f"SELECT datetime, {', '.join(CHANNELS)} FROM metrics WHERE run_id = ? ORDER BY id",
+                                  conn, params=(run_id,))
+            if insert_packed_metrics(conn, run_id, samples):
+                conn.execute("DELETE FROM metrics WHERE run_id = ?", (run_id,))
+                moved += 1
+    elif storage == ROWS:
+        rows = conn.execute(f"SELECT run_id, samples, start_epoch, elapsed, utc_offset, {', '.join(CHANNELS)} "
+                            f"FROM metrics_packed").fetchall()
+        for run_id, *packed in rows:
+            samples = unpack_samples(packed).astype(object)
+            samples = samples.where(samples.notna(), None)
+            conn.executemany(f"INSERT INTO metrics (run_id, datetime, {', '.join(CHANNELS)}) "
+                             f"VALUES (?, ?, {', '.join('?' * len(CHANNELS))})",
+                             ((run_id, *values) for values in samples.itertuples(index=False, name=None)))
+            conn.execute("DELETE FROM metrics_packed WHERE run_id = ?", (run_id,))
+            moved += 1
+    else:
+        raise ValueError(f"Unknown metrics storage: {storage}")
+    return moved
+
+
+def main():
+    """ python -m stryder_core.packed_metrics [--to rows|packed], moves the runs already stored """
+    from stryder_core.config import DB_PATH
+    from stryder_core.db_schema import WRITER, connect_db
+
+    parser = argparse.ArgumentParser(description="Move the stored samples of every run to the given metrics storage")
+    parser.add_argument("--db", default=DB_PATH, help="runs_data.db path")
+    parser.add_argument("--to", choices=(ROWS, PACKED), default=None,
+                        help=f"target storage, defaults to {STORAGE_ENV} (new runs are written there too)")
+    args = parser.parse_args()
+    storage = args.to or metrics_storage()
+
+    conn = connect_db(args.db, WRITER)
+    try:
+        with conn:
+            moved = convert_metrics_storage(conn, storage)
+    finally:
+        conn.close()
+    print(f"✅ Moved the samples of {moved} runs to {storage} storage")
+
+
+if __name__ == "__main__":
+    main()
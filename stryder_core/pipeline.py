@@ -1,50 +1,136 @@
 import logging
 import pandas as pd
-from stryder_core.db_schema import insert_workout, insert_run, insert_metrics, get_or_create_workout_type
-from stryder_core.file_parsing import (normalize_workout_type, edit_stryd_csv, calculate_duration,
+from stryder_core.db_schema import insert_workout, insert_run, insert_metrics, get_or_create_workout_type, run_exists
+from stryder_core.run_rollups import add_run_to_rollups
+from stryder_core.run_summaries import store_run_summary
+from stryder_core.file_parsing import (normalize_workout_type, edit_stryd_csv, edit_stryd_chunks, calculate_duration,
                                        get_matched_garmin_row, is_stryd_all_zero, ZeroStrydDataError)
 
 
-def insert_full_run(stryd_df, workout_name, notes, avg_power, avg_hr, total_m,  conn):
+def insert_full_run(stryd_df, workout_name, notes, avg_power, avg_hr, total_m,  conn, *, commit=True):
     """ Takes Stryd df creates workout type from workout name, calculates duration,
-        takes run_id and inserts all the metrics, returns workout_id and run_id"""
+        takes run_id and inserts all the metrics, returns workout_id and run_id.
+        With commit=True the whole run is committed once at the end (rolled back on error),
+        with commit=False nothing is committed, the caller owns the transaction (see BulkRunWriter) """
     if conn is None:
         raise ValueError("❌ Cannot insert run — connection is None")
+
+    # runs.datetime is unique, never leave a workout/metrics behind for a run that is already stored
+    start_time = stryd_df["ts_local"].iloc[0]
+    if run_exists(conn, start_time):
+        logging.warning(f"⚠️  Run already exists in DB ({start_time}), not inserting again")
+        return None, None
+
+    try:
+        workout_id, run_id = _insert_run_rows(stryd_df, workout_name, notes, avg_power, avg_hr, total_m, conn,
+                                              start_time)
+    except Exception:
+        if commit:
+            conn.rollback()
+        raise
+    if commit:
+        conn.commit()
+
+    logging.info(f"✅ Run saved: Workout ID {workout_id}, Run ID {run_id}")
+    return workout_id, run_id
+
+
+def _insert_run_rows(stryd_df, workout_name, notes, avg_power, avg_hr, total_m, conn, start_time):
+    """ Workout, run, samples, summary and rollup rows of one run, nothing committed """
     # 1. Insert the workout
     # Get the normalized workout type (e.g., "Easy Run", "VO2 Max")
     workout_type = normalize_workout_type(workout_name)
     # Insert or fetch the workout type ID
-    workout_type_id = get_or_create_workout_type(workout_type, conn)
+    workout_type_id = get_or_create_workout_type(workout_type, conn, commit=False)
     # Insert workout entry
-    workout_id = insert_workout(workout_name, notes, workout_type_id, conn)
+    workout_id = insert_workout(workout_name, notes, workout_type_id, conn, commit=False)
 
     # 2. Calculate duration
-    start_time = stryd_df["ts_local"].iloc[0]
     end_time = stryd_df["ts_local"].iloc[-1]
     duration_sec = int((end_time - start_time).total_seconds())
 
     # Insert run
-    run_id = insert_run(workout_id, start_time, avg_power, duration_sec, avg_hr, total_m, conn)
-
-    # 3. Insert all second-by-second metrics
-    insert_metrics(run_id, stryd_df, conn)
+    run_id = insert_run(workout_id, start_time, avg_power, duration_sec, avg_hr, total_m, conn, commit=False)
 
-    logging.info(f"✅ Run saved: Workout ID {workout_id}, Run ID {run_id}")
+    # 3. Insert all second-by-second metrics and the run's summary, add the run to the rollups
+    samples = insert_metrics(run_id, stryd_df, conn, commit=False)
+    add_run_to_rollups(conn, run_id)
+    store_run_summary(conn, run_id, samples, commit=False)
     return workout_id, run_id
 
 
-def process_csv_pipeline(stryd_df, garmin_df, timezone_str=None, stryd_label: str | None = None):
-    """ Takes Stryd and Garmin dataframes matches them, returns canonical Stryd df, plus duration, distance, average power and HR """
-    logging.debug(f"📄 [{stryd_label}] Loaded STRYD rows: {len(stryd_df)}")
-
+class BulkRunWriter:
+    """ Batched writer for insert_full_run.
+        Many runs share one transaction which is committed every `commit_every` runs (and on exit),
+        each run is wrapped in a savepoint so a failing run is rolled back alone.
+
+        with BulkRunWriter(conn, commit_every=50) as writer:
+            writer.add_run(stryd_df, workout_name, notes="", avg_power=..., avg_hr=..., total_m=...)
+    """
+
+    def __init__(self, conn, commit_every: int = 50):
+        if conn is None:
+            raise ValueError("❌ Cannot create writer — connection is None")
+        if commit_every < 1:
+            raise ValueError("commit_every must be >= 1")
+        self.conn = conn
+        self.commit_every = commit_every
+        self.pending = 0            # runs written since the last commit
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        # Every released savepoint is a complete run, keep them even if the caller stopped early
+        self.commit()
+        return False
+
+    def add_run(self, stryd_df, workout_name, notes, avg_power, avg_hr, total_m):
+        """ Inserts one run inside its own savepoint, returns workout_id and run_id.
+            On error only this run is rolled back and the exception is re-raised. """
+        if not self.conn.in_transaction:
+            self.conn.execute("BEGIN")
+        self.conn.execute("SAVEPOINT full_run")
+        try:
+            ids = insert_full_run(stryd_df, workout_name, notes, avg_power, avg_hr, total_m, self.conn, commit=False)
+        except Exception:
+            self.conn.execute("ROLLBACK TO SAVEPOINT full_run")
+            self.conn.execute("RELEASE SAVEPOINT full_run")
+            raise
+        self.conn.execute("RELEASE SAVEPOINT full_run")
+
+        self.pending += 1
+        if self.pending >= self.commit_every:
+            self.commit()
+        return ids
+
+    def commit(self) -> None:
+        """ Commits the runs written so far """
+        if self.conn.in_transaction:
+            self.conn.commit()
+            logging.debug(f"💾 Committed {self.pending} runs")
+        self.pending = 0
+
+
+def process_csv_pipeline(stryd_df, garmin_df, timezone_str=None, stryd_label: str | None = None,
+                         planned_row: int | None = None):
+    """ Takes Stryd and Garmin dataframes matches them, returns canonical Stryd df, plus duration, distance, average power and HR.
+        garmin_df can be a GarminIndex when many files are matched against the same activities,
+        planned_row is this file's match from build_match_plan.
+        stryd_df can also be the chunk iterator of load_stryd_csv(file, chunksize=...) """
     # Clean, convert, and calculate, stryd_df gets canonical column names
-    stryd_df = edit_stryd_csv(stryd_df, timezone_str=timezone_str)
+    if isinstance(stryd_df, pd.DataFrame):
+        stryd_df = edit_stryd_csv(stryd_df, timezone_str=timezone_str)
+    else:
+        stryd_df = edit_stryd_chunks(stryd_df, timezone_str=timezone_str)
+    logging.debug(f"📄 [{stryd_label}] Loaded STRYD rows: {len(stryd_df)}")
 
     if is_stryd_all_zero(stryd_df):
         raise ZeroStrydDataError("Stryd speed/distance is all zeros — skipping.")
 
     # Find matched Garmin row once
-    matched = get_matched_garmin_row(stryd_df, garmin_df, timezone_str=timezone_str, tolerance_sec=60)
+    matched = get_matched_garmin_row(stryd_df, garmin_df, timezone_str=timezone_str, tolerance_sec=60,
+                                     planned_row=planned_row)
 
     # Match workout name from Garmin and pass it to Stryd workout name
     if matched is not None and "wt_name" in matched.index:
@@ -2,11 +2,11 @@ import re
 from datetime import datetime
 from pathlib import Path
 from typing import Callable
-import numpy as np
 import pandas as pd
 from matplotlib import dates as mdates, pyplot as plt
 from matplotlib.axes import Axes
 from matplotlib.ticker import FuncFormatter, MultipleLocator, Locator
+from stryder_core.downsampling import downsample_series
 from stryder_core.utils_formatting import fmt_hm, fmt_pace_no_unit
 from stryder_core.utils import calc_df_to_pace
 
@@ -61,9 +61,10 @@ def plot_single_series(
     y_locator: Locator | None = None,
     ax=None,
     y_label=None,
-    x_label=None
+    x_label=None,
+    max_points: int | None = None,
 ):
-    """ Graph plotter for the single run report """
+    """ Graph plotter for the single run report, LTTB-downsampled to max_points when given """
     # ---- Backward-compatibility aliases ----
     x_alias = {"duration": "elapsed_sec", "distance": "distance_km", "distance_m": "distance_km"}
     x_col = x_alias.get(x_col, x_col)
@@ -114,8 +115,8 @@ def plot_single_series(
         fig, ax = plt.subplots()
 
     # ---- Plot ----
-    mask = np.isfinite(x) & np.isfinite(y)
-    ax.plot(x[mask], y[mask], label=(label or None))
+    x, y = downsample_series(x, y, max_points)
+    ax.plot(x, y, label=(label or None))
     ax.tick_params(axis="x", rotation=30 )if x_col == "elapsed_sec" else ax.tick_params(axis="x", rotation=rotation)    # tilt x_axis only if it's time, not in distance
     ax.grid(True, alpha=0.3)
 
@@ -1,6 +1,8 @@
 import sqlite3
 from datetime import datetime, timezone
 from typing import Tuple, List
+from stryder_core.row_counts import cached_count, listed_runs
+from stryder_core.workout_search import keyword_filter
 
 
 def views_query() -> str:
@@ -55,18 +57,23 @@ def _sqlite_dt(x):
     return x
 
 
-def build_window_query_and_params(start_utc, end_utc, keyword: str | None = None):
-    """ Helper for fetch_runs_for_window to match the params with the query """
+def build_window_query_and_params(start_utc, end_utc, keyword: str | None = None, conn=None):
+    """ Helper for fetch_runs_for_window to match the params with the query,
+     a keyword needs the connection to pick its filter (see workout_search.py) """
     params = [_sqlite_dt(start_utc), _sqlite_dt(end_utc)]
-
-    query = fetch_runs_for_window(include_keyword=bool(keyword))
+    keyword_condition = None
 
     if keyword:
-        params.append(f"%{keyword}%")
+        if conn is None:
+            raise ValueError("build_window_query_and_params needs the connection to filter by keyword")
+        keyword_condition, keyword_params = keyword_filter(conn, keyword, include_type=False)
+        params.extend(keyword_params)
+
+    query = fetch_runs_for_window(keyword_condition)
     return query, tuple(params)
 
 
-def fetch_runs_for_window(include_keyword: bool = False) -> str:
+def fetch_runs_for_window(keyword_condition: str | None = None) -> str:
     """ SQL query for custom window reports """
     base = """
     SELECT 
@@ -83,8 +90,8 @@ def fetch_runs_for_window(include_keyword: bool = False) -> str:
     LEFT JOIN workout_types wt ON w.workout_type_id = wt.id
     WHERE r.datetime BETWEEN ? AND ?
     """
-    if include_keyword:
-        base += " AND w.workout_name LIKE ?"
+    if keyword_condition:
+        base += f" AND {keyword_condition}"
 
     base += " ORDER BY r.datetime"
 
@@ -101,6 +108,82 @@ def _fetch(conn: sqlite3.Connection, sql: str, params: tuple = ()
     return rows, columns
 
 
+# (r.datetime, r.id) of a run: the order of every run list and the position of a keyset page in it.
+# idx_runs_datetime (unique, rowid = id as its last column) serves both directions without a sort or an OFFSET scan.
+Cursor = tuple[str, int]
+
+
+def _cursor_of(row) -> Cursor:
+    return row["datetime"], row["run_id"]
+
+
+def _where_joiner(base: str) -> str:
+    """ If base_query has WHERE -> append AND; otherwise start WHERE """
+    return " AND " if " WHERE " in base.upper() else " WHERE "
+
+
+def _has_rows(conn, base, base_params: tuple, op: str, cursor: Cursor) -> bool:
+    """ Whether base has a row before (op '<') or after (op '>') the cursor """
+    sql = f"{base}{_where_joiner(base)}(r.datetime, r.id) {op} (?, ?) LIMIT 1"
+    return conn.execute(sql, (*base_params, *cursor)).fetchone() is not None
+
+
+def date_cursor(start_utc) -> Cursor:
+    """ Cursor just before the first run at/after start_utc (datetime or string), for jumping to a date """
+    return _sqlite_dt(start_utc), 0
+
+
+def fetch_keyset_page(
+    conn,
+    base,
+    base_params: tuple = (),
+    *,
+    after: Cursor | None = None,
+    before: Cursor | None = None,
+    page_size: int = 15,
+):
+    """ One page of base in (r.datetime, r.id) order, sought through the index instead of skipping rows
+     a) after: the page starting after that cursor (neither: the first page)
+     b) before: the page ending before that cursor, a page cut short by the start becomes the first page
+     c) returns rows, columns, prev_cursor and next_cursor (None when nothing is before/after the page) """
+    if after is not None and before is not None:
+        raise ValueError("Give either after or before, not both")
+
+    joiner = _where_joiner(base)
+    limit = page_size + 1       # lookahead
+
+    if before is not None:
+        sql = f"{base}{joiner}(r.datetime, r.id) < (?, ?) ORDER BY r.datetime DESC, r.id DESC LIMIT ?"
+        rows, columns = _fetch(conn, sql, (*base_params, *before, limit))
+        if len(rows) < limit:
+            return fetch_keyset_page(conn, base, base_params, page_size=page_size)
+        rows = rows[:page_size][::-1]
+        has_prev = True
+        has_next = _has_rows(conn, base, base_params, ">", _cursor_of(rows[-1]))
+    else:
+        if after is None:
+            sql = f"{base} ORDER BY r.datetime, r.id LIMIT ?"
+            params = (*base_params, limit)
+        else:
+            sql = f"{base}{joiner}(r.datetime, r.id) > (?, ?) ORDER BY r.datetime, r.id LIMIT ?"
+            params = (*base_params, *after, limit)
+        rows, columns = _fetch(conn, sql, params)
+        has_next = len(rows) == limit
+        rows = rows[:page_size]
+        has_prev = after is not None and _has_rows(conn, base, base_params, "<",
+                                                   _cursor_of(rows[0]) if rows else after)
+
+    prev_cursor = (_cursor_of(rows[0]) if rows else after) if has_prev else None
+    next_cursor = _cursor_of(rows[-1]) if has_next else None
+    return rows, columns, prev_cursor, next_cursor
+
+
+def count_rows_before(conn, base, base_params: tuple, cursor: Cursor) -> int:
+    """ Number of rows of base before the cursor (position of a keyset page) """
+    return count_rows_for_query(conn, f"{base}{_where_joiner(base)}(r.datetime, r.id) < (?, ?)",
+                                (*base_params, *cursor))
+
+
 def fetch_page(
     conn,
     base,
@@ -110,12 +193,8 @@ def fetch_page(
 ):
     """ Takes a db connection a base query, base params, the last cursor and the page size
      a) gives option to return full table if no page size provided
-     b) adds WHERE, AND if needed
-     c) ads ORDER afterward
-     d) checks if it's the end of the query or not
-     e) returns rows, columns and cursor_next for the page """
-
-    #TODO: This function will be deprecated. Cursor-based pagination; currently used only by CLI. TUI uses offset-based pagination instead.
+     b) otherwise the keyset page after last_cursor
+     c) returns rows, columns and cursor_next for the page """
 
     # No pagination: return the full table, ignore cursor/lookahead
     if not page_size:  # 0 or None
@@ -123,37 +202,8 @@ def fetch_page(
         rows, columns = _fetch(conn, sql, base_params)
         return rows, columns, None
 
-    limit = page_size + 1       # lookahead
-
-    # If base_query has WHERE -> append AND; otherwise start WHERE
-    has_where = " WHERE " in base.upper()
-    joiner = " AND " if has_where else " WHERE "
-
-    if last_cursor is None:
-        sql = f"{base} ORDER BY r.datetime, r.id LIMIT ?"
-        params = (*base_params, limit)
-    else:
-        last_dt, last_id = last_cursor
-        sql = (
-            f"{base}{joiner}"
-            "((r.datetime > ?) OR (r.datetime = ? AND r.id > ?))"
-            "ORDER BY r.datetime, r.id LIMIT ?"
-        )
-        params = (*base_params, last_dt, last_dt, last_id, limit)
-
-    # params order: where params + cursor params + limit
-    rows, columns = _fetch(conn, sql, params)
-
-    # Lookahead handling
-    if len(rows) == limit:
-        rows_for_page = rows[:page_size]
-        last_displayed = rows_for_page[-1]
-
-        cursor_next = (last_displayed["datetime"], last_displayed["run_id"])
-        rows = rows_for_page
-    else:
-        cursor_next = None
-
+    rows, columns, _, cursor_next = fetch_keyset_page(conn, base, base_params, after=last_cursor,
+                                                      page_size=page_size)
     return rows, columns, cursor_next
 
 
@@ -174,8 +224,12 @@ def fetch_views_page(conn, base, page, base_params: tuple = (), page_size: int |
     return rows, columns
 
 
-def count_rows_for_query(conn, base_query:str, base_params:tuple = ()) -> int:
-    """ Return the number of rows matching the query """
-    sql = f"SELECT COUNT(*) FROM ({base_query})"
-    cur = conn.execute(sql, base_params)
-    return cur.fetchone()[0]
\ No newline at end of file
+def count_rows_for_query(conn, base_query:str, base_params:tuple = (), limit: int | None = None) -> int:
+    """ Return the number of rows matching the query, counting at most `limit` rows when given.
+     The unfiltered views query is answered by the maintained run counter, other counts are cached until
+     the data changes (see row_counts.py) """
+    if not base_params and " ".join(base_query.split()) == " ".join(views_query().split()):
+        count = listed_runs(conn)
+        if count is not None:
+            return count if limit is None else min(count, limit)
+    return cached_count(conn, base_query, base_params, limit=limit)
\ No newline at end of file
@@ -1,13 +1,25 @@
-from datetime import timedelta, datetime, time, date
+from datetime import timedelta, datetime, time, date, timezone
 from zoneinfo import ZoneInfo
 import pandas as pd
 from pandas.core.interchange.dataframe_protocol import DataFrame
 from stryder_core.date_utilities import as_local_date
 from stryder_core.queries import build_window_query_and_params
 from stryder_core.metrics import align_df_to_metric_keys
+from stryder_core.packed_metrics import load_packed_samples
+from stryder_core.run_rollups import load_daily_rollups, rollup_totals, rollups_ready
 
 SINGLE_RUN_SAMPLE_KEYS = {"power_sec", "ground", "lss", "cadence", "vo"}
 
+WEEKLY_COLUMNS = ["week_start", "week_end", "runs", "distance_km", "duration_sec", "avg_power", "avg_hr"]
+
+CUSTOM_COLUMNS = ["start_date", "end_date", "runs", "distance_km", "duration_sec", "avg_power", "avg_hr"]
+
+# report engines: answer from the daily/weekly rollups (day-aligned windows with built rollups, the SQL
+# engine otherwise), aggregate inside SQLite, or load the window's runs and group them in pandas
+ROLLUP_ENGINE = "rollup"
+SQL_ENGINE = "sql"
+PANDAS_ENGINE = "pandas"
+
 
 def weekly_report(
         conn,
@@ -15,11 +27,13 @@ def weekly_report(
         mode: str, *,
         weeks: int | None = None,
         end_date: datetime | None = None,
-        start_date: datetime | None = None
+        start_date: datetime | None = None,
+        engine: str = ROLLUP_ENGINE,
 ) -> tuple[str, pd.DataFrame]:
 
     """ One of a) weeks (optionally with end date
-               b) custom with start_date and end_date"""
+               b) custom with start_date and end_date
+        engine picks where the weekly buckets are aggregated, both give the same weekly_raw """
 
     # Validation
     have_weeks = weeks is not None
@@ -37,20 +51,55 @@ def weekly_report(
         start_date=start_date,
         )
 
+    tz = ZoneInfo(tz_name)
+    start_local = pd.Timestamp(start_utc, tz="UTC").tz_convert(tz)
+
+    if engine not in (ROLLUP_ENGINE, SQL_ENGINE, PANDAS_ENGINE):
+        raise ValueError(f"Unsupported engine: {engine}. Use '{ROLLUP_ENGINE}', '{SQL_ENGINE}' or '{PANDAS_ENGINE}'.")
+
+    days = _rollup_days(conn, start_utc, end_utc, tz_name) if engine == ROLLUP_ENGINE else None
+    if days is not None:
+        agg = _weekly_agg_rollups(days, start_utc, tz)
+    elif engine == PANDAS_ENGINE:
+        agg = _weekly_agg_pandas(conn, start_utc, end_utc, tz)
+    else:
+        agg = _weekly_agg_sql(conn, start_utc, end_utc, tz)
+
+    if agg is None:
+        return label, pd.DataFrame(columns=WEEKLY_COLUMNS)
+
+    agg["week_start"] = start_local + pd.to_timedelta(agg["week_idx"].astype(int) * 7, unit="D")
+    agg["week_end"] = agg["week_start"] + pd.to_timedelta(7, unit="D")
+
+    # RAW canonical names
+    weekly_raw = (
+        agg.rename(columns={
+            "Runs": "runs",
+            "km": "distance_km",
+            "sec": "duration_sec",
+            "pow": "avg_power",
+            "avg_hr": "avg_hr",
+        })
+        .sort_values("week_start")
+        [WEEKLY_COLUMNS]
+    )
+
+    return label, weekly_raw
+
+
+def _weekly_agg_pandas(conn, start_utc: str, end_utc: str, tz: ZoneInfo) -> pd.DataFrame | None:
+    """ Loads the window's runs and groups them in pandas, one row per week_idx (None when there are no runs) """
     # SQL fetch for the entire window
     query, params = build_window_query_and_params(start_utc, end_utc)
     df = pd.read_sql(query, conn, params=params)
 
     if df.empty:
-        cols = ["week_start", "week_end", "runs", "distance_km", "duration_sec", "avg_power", "avg_hr"]
-        return label, pd.DataFrame(columns=cols)
+        return None
 
     # guard to avoid duplicates
     if "run_id" in df.columns:
         df = df.drop_duplicates(subset=["run_id"], keep="first")
 
-    tz = ZoneInfo(tz_name)
-
     # Make DateTime tz-aware & convert to local
     dt = pd.to_datetime(df["datetime_utc"], utc=True, errors="coerce")
     df["dt_local"] = dt.dt.tz_convert(tz)
@@ -73,24 +122,100 @@ def weekly_report(
                   pow=("avg_power","mean"),
                   avg_hr=("avg_hr","mean"))
              .reset_index())
+    return agg
 
-    agg["week_start"] = start_local + pd.to_timedelta(agg["week_idx"].astype(int) * 7, unit="D")
-    agg["week_end"] = agg["week_start"] + pd.to_timedelta(7, unit="D")
 
-    # RAW canonical names
-    weekly_raw = (
-        agg.rename(columns={
-            "Runs": "runs",
-            "km": "distance_km",
-            "sec": "duration_sec",
-            "pow": "avg_power",
-            "avg_hr": "avg_hr",
-        })
-        .sort_values("week_start")
-        [["week_start", "week_end", "runs", "distance_km", "duration_sec", "avg_power", "avg_hr"]]
-    )
+def _rollup_window(start_utc: str, end_utc: str, tz: ZoneInfo) -> tuple[date, date] | None:
+    """ (first day, day after the last) of a window from local midnight to local midnight, None otherwise """
+    start_local = pd.Timestamp(start_utc, tz="UTC").tz_convert(tz)
+    end_local = pd.Timestamp(end_utc, tz="UTC").tz_convert(tz)
+    if start_local != start_local.normalize() or end_local != end_local.normalize():
+        return None
+    return start_local.date(), end_local.date()
+
+
+def _rollup_days(conn, start_utc: str, end_utc: str, tz_name: str) -> pd.DataFrame | None:
+    """ Daily rollup rows of the window, None when the window is not day-aligned or the rollups are not usable """
+    window = _rollup_window(start_utc, end_utc, ZoneInfo(tz_name))
+    if window is None or not rollups_ready(conn, tz_name):
+        return None
+    return load_daily_rollups(conn, tz_name, *window)
+
+
+def _rollup_mean(total, count):
+    """ Mean from a rollup (sum, count), NaN when nothing was counted """
+    return total / count if count else float("nan")
+
+
+def _weekly_agg_rollups(days: pd.DataFrame, start_utc: str, tz: ZoneInfo) -> pd.DataFrame | None:
+    """ Groups the window's daily rollups into the 7-day buckets of the other engines (same DST behaviour,
+        the bucket of a day only depends on its local midnight) """
+    if days.empty:
+        return None
+    start = datetime.fromisoformat(start_utc).replace(tzinfo=timezone.utc)
+    days["week_idx"] = [(datetime.fromisoformat(day).replace(tzinfo=tz) - start).days // 7 for day in days["day"]]
+
+    weeks = days[days["week_idx"] >= 0].groupby("week_idx").sum(numeric_only=True)
+    if weeks.empty:
+        return None
+    agg = pd.DataFrame({
+        "week_idx": weeks.index.astype("int64"),
+        "Runs": weeks["runs"].astype("int64").to_numpy(),
+        "km": weeks["distance_km"].astype(float).to_numpy(),
+        "sec": weeks["duration_sec"].astype("int64").to_numpy(),
+        "pow": [_rollup_mean(s, n) for s, n in zip(weeks["power_sum"], weeks["power_runs"])],
+        "avg_hr": [_rollup_mean(s, n) for s, n in zip(weeks["hr_sum"], weeks["hr_runs"])],
+    })
+    return agg
 
-    return label, weekly_raw
+
+def _week_buckets(start_utc: str, end_utc: str, tz: ZoneInfo) -> list[tuple[int, str, str]]:
+    """ (week_idx, first, after last UTC datetime) of the window's 7-day buckets, split the way the pandas engine
+        buckets: local midnight of the run minus the window start in absolute time, whole days floored
+        (so around a DST change a run can land in the bucket of the day before), // 7 """
+    fmt = "%Y-%m-%d %H:%M:%S"
+    start = datetime.fromisoformat(start_utc).replace(tzinfo=timezone.utc)
+    last_day = datetime.fromisoformat(end_utc).replace(tzinfo=timezone.utc).astimezone(tz).date()
+
+    buckets = []
+    day = start.astimezone(tz).date()
+    while day <= last_day:
+        midnight = datetime(day.year, day.month, day.day, tzinfo=tz)
+        week_idx = (midnight - start).days // 7
+        if week_idx >= 0 and (not buckets or buckets[-1][0] != week_idx):
+            buckets.append((week_idx, midnight.astimezone(timezone.utc).strftime(fmt)))
+        day += timedelta(days=1)
+
+    ends = [first for _, first in buckets[1:]] + ["9999-12-31"]
+    return [(week_idx, first, after) for (week_idx, first), after in zip(buckets, ends)]
+
+
+def _weekly_agg_sql(conn, start_utc: str, end_utc: str, tz: ZoneInfo) -> pd.DataFrame | None:
+    """ Aggregates the window's runs inside SQLite with the builtin aggregates, same frame as _weekly_agg_pandas
+        (sums can differ from pandas' compensated ones in the last bits) """
+    buckets = _week_buckets(start_utc, end_utc, tz)
+    if not buckets:
+        return None
+
+    window_query, params = build_window_query_and_params(start_utc, end_utc)
+    query = f"""
+        WITH buckets (week_idx, first_utc, after_utc) AS (VALUES {', '.join(['(?, ?, ?)'] * len(buckets))})
+        SELECT
+            b.week_idx,
+            COUNT(w.run_id)                                   AS Runs,
+            TOTAL(COALESCE(w.meters, 0) / 1000.0)             AS km,
+            SUM(CAST(COALESCE(w.duration_sec, 0) AS INTEGER)) AS sec,
+            AVG(w.avg_power)                                  AS pow,
+            AVG(w.avg_hr)                                     AS avg_hr
+        FROM ({window_query}) w
+        JOIN buckets b ON w.datetime_utc >= b.first_utc AND w.datetime_utc < b.after_utc
+        GROUP BY b.week_idx
+        ORDER BY b.week_idx
+    """
+    agg = pd.read_sql(query, conn, params=(*[v for bucket in buckets for v in bucket], *params))
+    if agg.empty:
+        return None
+    return agg.astype({"km": float, "pow": float, "avg_hr": float})
 
 
 def custom_dates_report(
@@ -99,8 +224,11 @@ def custom_dates_report(
         mode: str, *,
         end_date: datetime | None = None,
         start_date: datetime | None = None,
-        keyword: str | None = None
+        keyword: str | None = None,
+        engine: str = ROLLUP_ENGINE,
 ) -> tuple[str, DataFrame]:
+    """ One summary row for start_date..end_date, answered from the rollups (no keyword, engine=ROLLUP_ENGINE)
+        or from the window's runs """
 
     # Validation
     have_range = (start_date is not None) and (end_date is not None)
@@ -123,19 +251,34 @@ def custom_dates_report(
         start_date=start_date,
     )
 
+    if engine not in (ROLLUP_ENGINE, PANDAS_ENGINE):
+        raise ValueError(f"Unsupported engine: {engine}. Use '{ROLLUP_ENGINE}' or '{PANDAS_ENGINE}'.")
+
+    tz = ZoneInfo(tz_name)
+    window = _rollup_window(start_utc, end_utc, tz) if engine == ROLLUP_ENGINE and not keyword else None
+    if window is not None and rollups_ready(conn, tz_name):
+        totals = rollup_totals(conn, tz_name, *window)
+        if not totals["runs"]:
+            return label, pd.DataFrame(columns=CUSTOM_COLUMNS)
+        agg = pd.Series({
+            "runs": totals["runs"],
+            "distance_km": totals["distance_km"],
+            "duration_sec": totals["duration_sec"],
+            "avg_power": _rollup_mean(totals["power_sum"], totals["power_runs"]),
+            "avg_hr": _rollup_mean(totals["hr_sum"], totals["hr_runs"]),
+        })
+        return label, _custom_summary_frame(agg, start_utc, end_utc, tz)
+
     # get the query matched with its parameters
-    query, params = build_window_query_and_params(start_utc, end_utc, keyword)
+    query, params = build_window_query_and_params(start_utc, end_utc, keyword, conn)
     df = pd.read_sql(query, conn, params=params)
 
     if df.empty:
-        cols = ["start_date", "end_date", "runs", "distance_km", "duration_sec", "avg_power", "avg_hr"]
-        return label, pd.DataFrame(columns=cols)
+        return label, pd.DataFrame(columns=CUSTOM_COLUMNS)
     # guard to avoid duplicates
     if "run_id" in df.columns:
         df = df.drop_duplicates(subset=["run_id"], keep="first")
 
-    tz = ZoneInfo(tz_name)
-
     # Make DateTime tz-aware & convert to local
     dt = pd.to_datetime(df["datetime_utc"], utc=True, errors="coerce")
     df["dt_local"] = dt.dt.tz_convert(tz)
@@ -144,10 +287,6 @@ def custom_dates_report(
     df["km"] = (df["meters"].fillna(0) / 1000.0)
     df["duration_sec"] = df["duration_sec"].fillna(0).astype(int)
 
-    # Get start date and end date in local timezone
-    start_local = pd.Timestamp(start_utc, tz="UTC").tz_convert(tz)
-    end_local = pd.Timestamp(end_utc, tz="UTC").tz_convert(tz) - timedelta(seconds=1)
-
     # Aggregate per custom window
     agg = df.agg({
         "run_id": "count",
@@ -158,24 +297,29 @@ def custom_dates_report(
     })
 
     # RAW canonical names
-    summary = agg.rename({
+    agg = agg.rename({
             "run_id": "runs",
             "km": "distance_km",
             "duration_sec": "duration_sec",
             "avg_power": "avg_power",
             "avg_hr": "avg_hr",
-        }).to_frame().T
+        })
+    return label, _custom_summary_frame(agg, start_utc, end_utc, tz)
+
+
+def _custom_summary_frame(agg: pd.Series, start_utc: str, end_utc: str, tz: ZoneInfo) -> pd.DataFrame:
+    """ The one row custom_dates_report frame from the window totals """
+    # Get start date and end date in local timezone
+    start_local = pd.Timestamp(start_utc, tz="UTC").tz_convert(tz)
+    end_local = pd.Timestamp(end_utc, tz="UTC").tz_convert(tz) - timedelta(seconds=1)
+
+    summary = agg.to_frame().T
     # Add date columns
     summary["start_date"] = start_local.date()
     summary["end_date"] = end_local.date()
 
     # Reorder columns
-    summary = summary[[
-        "start_date", "end_date",
-        "runs", "distance_km", "duration_sec",
-        "avg_power", "avg_hr",
-    ]]
-    return label, summary
+    return summary[CUSTOM_COLUMNS]
 
 
 def get_report_bounds(
@@ -271,7 +415,9 @@ def get_single_run_query(conn, run_id: int, metrics: dict):
         WHERE m.run_id = ? 
         ORDER BY m.datetime ASC
     """
-    df_raw = pd.read_sql(query, conn, params=(run_id,), parse_dates=["dt"])
+    df_raw = load_packed_samples(conn, run_id)
+    if df_raw is None:
+        df_raw = pd.read_sql(query, conn, params=(run_id,), parse_dates=["dt"])
 
     # Ensure that dt is datetime object and not string
     df_raw["dt"] = pd.to_datetime(df_raw["dt"], errors="coerce")
@@ -286,6 +432,8 @@ def get_single_run_query(conn, run_id: int, metrics: dict):
     if "stryd_distance" in df.columns and "distance" in metrics:
         df = df.rename(columns={"stryd_distance": "distance_m"})
 
+    if df.empty:
+        return df       # unknown run or a run without samples
     if "elapsed_sec" not in df.columns:
         df["elapsed_sec"] = (df["dt"] - df["dt"].iloc[0]).dt.total_seconds()
     if "distance_m" in df.columns and "distance_km" not in df.columns:
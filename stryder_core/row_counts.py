@@ -0,0 +1,95 @@
+""" Row counts for the paginated run lists: the trigger-kept row_counts table (schema v6) holds the listed
+    run count and a data version, counts of other queries are cached per data version. """
+
+import hashlib
+import logging
+import sqlite3
+import threading
+from collections import OrderedDict
+
+CACHE_SIZE = 256
+
+_cache: OrderedDict = OrderedDict()
+_lock = threading.Lock()       # the Django threads share the cache
+
+
+def read_row_counts(conn) -> dict | None:
+    """ The row_counts values by name, None for a DB migrated before v6 """
+    try:
+        return dict(tuple(row) for row in conn.execute("SELECT name, value FROM row_counts"))
+    except sqlite3.OperationalError:
+        return None
+
+
+def data_version(conn) -> tuple[int, int] | None:
+    """ (instance, data_version) of the DB, it changes whenever a listed row changes. None before v6 """
+    counts = read_row_counts(conn)
+    if counts is None:
+        return None
+    return counts["instance"], counts["data_version"]
+
+
+def listed_runs(conn) -> int | None:
+    """ Maintained number of runs views_query lists, None when unknown """
+    counts = read_row_counts(conn)
+    return None if counts is None else counts["listed_runs"]
+
+
+def reset_listed_runs(conn) -> int:
+    """ Recounts listed_runs (writer only), returns it """
+    conn.execute("""
+        UPDATE row_counts SET value = (
+            SELECT COUNT(*) FROM runs r
+            JOIN workouts w ON r.workout_id = w.id
+            JOIN workout_types wt ON w.workout_type_id = wt.id
+        ) WHERE name = 'listed_runs'
+    """)
+    return listed_runs(conn)
+
+
+def refresh_listed_runs(conn) -> None:
+    """ Recounts listed_runs when a workout or type change left it unknown (writer only, commits) """
+    counts = read_row_counts(conn)
+    if counts is None or counts["listed_runs"] is not None:
+        return
+    with conn:
+        listed = reset_listed_runs(conn)
+    logging.info(f"[DB] Recounted {listed} listed runs")
+
+
+def query_fingerprint(sql: str) -> str:
+    """ Hash of the query text with whitespace normalized """
+    return hashlib.sha1(" ".join(sql.split()).encode()).hexdigest()
+
+
+def cached_count(conn, base_query: str, base_params: tuple = (), *, limit: int | None = None) -> int:
+    """ COUNT(*) of base_query (at most `limit` rows when given), served from the cache while the data is unchanged """
+    version = data_version(conn)
+    if version is None:
+        return _count(conn, base_query, base_params, limit)
+
+    key = (version, query_fingerprint(base_query), tuple(base_params), limit)
+    with _lock:
+        if key in _cache:
+            _cache.move_to_end(key)
+            return _cache[key]
+
+    count = _count(conn, base_query, base_params, limit)
+    # a commit between the two reads means the count may be of newer data than `version`
+    if data_version(conn) == version:
+        with _lock:
+            _cache[key] = count
+            while len(_cache) > CACHE_SIZE:
+                _cache.popitem(last=False)
+    return count
+
+
+def clear_count_cache() -> None:
+    with _lock:
+        _cache.clear()
+
+
+def _count(conn, base_query: str, base_params: tuple, limit: int | None) -> int:
+    if limit is None:
+        return conn.execute(f"SELECT COUNT(*) FROM ({base_query})", base_params).fetchone()[0]
+    return conn.execute(f"SELECT COUNT(*) FROM ({base_query} LIMIT ?)", (*base_params, limit)).fetchone()[0]
@@ -0,0 +1,137 @@
+""" Per-day and per-week run totals per timezone, built by refresh_rollups and kept by insert_full_run.
+    Reports answer day-aligned windows from them while rollup_zones says they still match the runs. """
+
+import logging
+import sqlite3
+from datetime import date, datetime, timedelta
+from zoneinfo import ZoneInfo
+
+import pandas as pd
+
+ROLLUP_COLUMNS = ("runs", "distance_km", "duration_sec", "power_sum", "power_runs", "hr_sum", "hr_runs")
+
+# every run a report can see (the report queries inner join workouts too)
+_RUNS_SOURCE = "runs r JOIN workouts w ON r.workout_id = w.id"
+
+# rollup table → SQL giving its key from the local day of the run (weeks start on Monday)
+_TABLE_KEYS = {
+    "daily_rollups": "day",
+    "weekly_rollups": "date(day, '-6 days', 'weekday 1')",
+}
+
+
+def _local_day_function(tz: ZoneInfo):
+    """ SQL function runs.datetime text (UTC) → 'YYYY-MM-DD' local date in tz, NULL when unreadable """
+    def local_day(datetime_utc):
+        try:
+            dt = datetime.fromisoformat(datetime_utc)
+        except (TypeError, ValueError):
+            return None
+        if dt.tzinfo is None:
+            dt = dt.replace(tzinfo=ZoneInfo("UTC"))
+        return dt.astimezone(tz).date().isoformat()
+
+    return local_day
+
+
+def _runs_fingerprint(conn) -> tuple[int, int]:
+    """ (run count, last run id) of the runs the reports see """
+    runs, last_id = conn.execute(f"SELECT COUNT(*), COALESCE(MAX(r.id), 0) FROM {_RUNS_SOURCE}").fetchone()
+    return int(runs), int(last_id)
+
+
+def _add_runs(conn, tz_name: str, where: str = "", params: tuple = ()) -> None:
+    """ Adds the runs matching `where` to the daily and weekly rows of tz_name """
+    conn.create_function("stryder_local_day", 1, _local_day_function(ZoneInfo(tz_name)), deterministic=True)
+    for table, key in _TABLE_KEYS.items():
+        key_column = "day" if table == "daily_rollups" else "week_start"
+        conn.execute(f"""
+            INSERT INTO {table} (tz, {key_column}, {', '.join(ROLLUP_COLUMNS)})
+            SELECT ?, {key}, COUNT(*), SUM(COALESCE(distance_m, 0) / 1000.0), SUM(COALESCE(duration_sec, 0)),
+                   TOTAL(avg_power), COUNT(avg_power), TOTAL(avg_hr), COUNT(avg_hr)
+            FROM (SELECT stryder_local_day(r.datetime) AS day, r.* FROM {_RUNS_SOURCE} {where})
+            WHERE day IS NOT NULL
+            GROUP BY 2
+            ON CONFLICT (tz, {key_column}) DO UPDATE SET
+                {', '.join(f'{c} = {c} + excluded.{c}' for c in ROLLUP_COLUMNS)}
+        """, (tz_name, *params))
+
+
+def build_rollups(conn, tz_name: str) -> None:
+    """ (Re)builds every daily and weekly row of tz_name from the runs. No commit, the caller owns the transaction """
+    ZoneInfo(tz_name)       # unknown timezone → ZoneInfoNotFoundError before anything is deleted
+    conn.execute("DELETE FROM daily_rollups WHERE tz = ?", (tz_name,))
+    conn.execute("DELETE FROM weekly_rollups WHERE tz = ?", (tz_name,))
+    _add_runs(conn, tz_name)
+    runs, last_id = _runs_fingerprint(conn)
+    conn.execute("INSERT OR REPLACE INTO rollup_zones (tz, runs, last_run_id) VALUES (?, ?, ?)",
+                 (tz_name, runs, last_id))
+
+
+def add_run_to_rollups(conn, run_id: int) -> None:
+    """ Adds a just inserted run to every built timezone. No commit, the caller owns the transaction """
+    for (tz_name,) in conn.execute("SELECT tz FROM rollup_zones").fetchall():
+        _add_runs(conn, tz_name, "WHERE r.id = ?", (run_id,))
+    conn.execute("UPDATE rollup_zones SET runs = runs + 1, last_run_id = MAX(last_run_id, ?)", (run_id,))
+
+
+def clear_rollups(conn) -> None:
+    """ Empties the rollups after every run is deleted, built timezones stay built (for no runs) """
+    conn.execute("DELETE FROM daily_rollups")
+    conn.execute("DELETE FROM weekly_rollups")
+    conn.execute("UPDATE rollup_zones SET runs = 0, last_run_id = 0")
+
+
+def rollups_ready(conn, tz_name: str) -> bool:
+    """ True when the rollups of tz_name match the runs, reports fall back to the runs otherwise. Never writes """
+    try:
+        row = conn.execute("SELECT runs, last_run_id FROM rollup_zones WHERE tz = ?", (tz_name,)).fetchone()
+        return row is not None and tuple(row) == _runs_fingerprint(conn)
+    except sqlite3.OperationalError as e:       # DB no writer has migrated yet
+        logging.debug(f"[DB] No rollups for {tz_name}: {e}")
+        return False
+
+
+def refresh_rollups(conn, tz_name: str) -> None:
+    """ Builds the rollups of the profile timezone when missing or stale (writer only, commits),
+        so reports and read-only viewers can use them """
+    try:
+        if rollups_ready(conn, tz_name):
+            return
+        with conn:
+            build_rollups(conn, tz_name)
+        logging.info(f"[DB] Built the {tz_name} rollups")
+    except Exception as e:
+        logging.warning(f"⚠️ Could not build the {tz_name} rollups: {e}")
+
+
+def load_daily_rollups(conn, tz_name: str, start_day: date, end_day: date) -> pd.DataFrame:
+    """ Daily rows of tz_name with start_day <= day < end_day, ordered by day """
+    return pd.read_sql(f"""
+        SELECT day, {', '.join(ROLLUP_COLUMNS)} FROM daily_rollups
+        WHERE tz = ? AND day >= ? AND day < ?
+        ORDER BY day
+    """, conn, params=(tz_name, start_day.isoformat(), end_day.isoformat()))
+
+
+def rollup_totals(conn, tz_name: str, start_day: date, end_day: date) -> dict:
+    """ Totals of the days start_day <= day < end_day: whole Monday weeks from weekly_rollups, the days
+        before the first and after the last of them from daily_rollups """
+    first_monday = start_day + timedelta(days=-start_day.weekday() % 7)
+    last_monday = end_day - timedelta(days=end_day.weekday())
+    if first_monday >= last_monday:
+        first_monday = last_monday = end_day
+
+    sums = ", ".join(f"SUM({c}) AS {c}" for c in ROLLUP_COLUMNS)
+    row = conn.execute(f"""
+        SELECT {sums} FROM (
+            SELECT {', '.join(ROLLUP_COLUMNS)} FROM weekly_rollups
+            WHERE tz = ? AND week_start >= ? AND week_start < ?
+            UNION ALL
+            SELECT {', '.join(ROLLUP_COLUMNS)} FROM daily_rollups
+            WHERE tz = ? AND ((day >= ? AND day < ?) OR (day >= ? AND day < ?))
+        )
+    """, (tz_name, first_monday.isoformat(), last_monday.isoformat(),
+          tz_name, start_day.isoformat(), first_monday.isoformat(),
+          last_monday.isoformat(), end_day.isoformat())).fetchone()
+    return {c: (0 if v is None else v) for c, v in zip(ROLLUP_COLUMNS, row)}
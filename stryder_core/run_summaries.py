@@ -0,0 +1,159 @@
+""" Materialized single run summaries: one run_summaries row per run with what compute_single_run_summary
+    gives for its samples, so detail pages only load the samples to draw the plot. """
+
+import argparse
+import logging
+import sqlite3
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+
+from stryder_core import packed_metrics
+from stryder_core.reports import compute_single_run_summary
+
+# compute_single_run_summary keys stored per run (run_id is the primary key)
+SUMMARY_KEYS = ("duration_sec", "distance_km", "avg_power", "ground_time", "stiffness", "cadence",
+                "vertical_oscillation")
+
+# start_dt of the row kept for a run without (readable) samples, so the backfill never reads it again
+NO_SAMPLES = ""
+
+
+def summarize_samples(run_id: int, samples: pd.DataFrame) -> dict | None:
+    """ Takes a run's stored samples (datetime text + metrics columns), returns the summary plus its first sample
+        datetime text, computed exactly as from the get_single_run_query frame. None for a run without samples """
+    if samples.empty:
+        return None
+    # same sample order as the ORDER BY m.datetime of get_single_run_query
+    samples = samples.sort_values("datetime", kind="stable")
+
+    def channel(name):
+        return samples[name].to_numpy(dtype=np.float64, na_value=np.nan)
+
+    df = pd.DataFrame({
+        "run_id": int(run_id),
+        "dt": pd.to_datetime(samples["datetime"], utc=True, errors="coerce").to_numpy(),
+        "distance_m": channel("stryd_distance"),
+        "power_sec": channel("power"),
+        "ground": channel("ground_time"),
+        "lss": channel("stiffness"),
+        "cadence": channel("cadence"),
+        "vo": channel("vertical_oscillation"),
+    })
+    summary = compute_single_run_summary(df)
+    summary["start_dt"] = samples["datetime"].iloc[0]
+    return summary
+
+
+def store_run_summary(conn, run_id: int, samples: pd.DataFrame, *, commit: bool = True) -> dict | None:
+    """ Computes and upserts the summary of a run, returns it (None when the run has no samples,
+        its row is then a NO_SAMPLES marker) """
+    summary = summarize_samples(run_id, samples)
+    if summary is None:
+        _store_no_samples(conn, run_id)
+    else:
+        columns = ("run_id", "start_dt", *SUMMARY_KEYS)
+        conn.execute(f"INSERT OR REPLACE INTO run_summaries ({', '.join(columns)}) "
+                     f"VALUES ({', '.join('?' * len(columns))})",
+                     tuple(summary[c] for c in columns))
+    if commit:
+        conn.commit()
+    return summary
+
+
+def _store_no_samples(conn, run_id: int) -> None:
+    conn.execute("INSERT OR REPLACE INTO run_summaries (run_id, start_dt, duration_sec) VALUES (?, ?, 0)",
+                 (run_id, NO_SAMPLES))
+
+
+def load_run_summary(conn, run_id: int) -> dict | None:
+    """ Stored summary of a run with its first sample datetime and workout name,
+        None if the run has none (not backfilled yet, no samples, or a DB no writer has migrated) """
+    try:
+        row = conn.execute(f"""
+            SELECT s.run_id, s.start_dt, {', '.join('s.' + k for k in SUMMARY_KEYS)}, w.workout_name
+            FROM run_summaries s
+            JOIN runs r ON s.run_id = r.id
+            JOIN workouts w ON r.workout_id = w.id
+            WHERE s.run_id = ? AND s.start_dt != ?
+        """, (run_id, NO_SAMPLES)).fetchone()
+    except sqlite3.OperationalError:
+        return None     # read-only connection to a DB no writer has migrated yet
+    if row is None:
+        return None
+
+    run_id, start_dt, *values, wt_name = tuple(row)
+    summary = {"run_id": run_id, "duration_sec": int(values[0])}
+    for key, value in zip(SUMMARY_KEYS[1:], values[1:]):
+        summary[key] = float("nan") if value is None else float(value)      # NaN is stored as NULL
+    summary["dt"] = pd.to_datetime(start_dt)
+    summary["wt_name"] = wt_name
+    return summary
+
+
+def _stored_samples(conn, run_id: int) -> pd.DataFrame:
+    """ Samples of a run as stored, from metrics_packed or metrics """
+    row = conn.execute(f"""
+        SELECT samples, start_epoch, elapsed, utc_offset, {', '.join(packed_metrics.CHANNELS)}
+        FROM metrics_packed WHERE run_id = ?
+    """, (run_id,)).fetchone()
+    if row is not None:
+        return packed_metrics.unpack_samples(row)
+    return pd.read_sql(f"SELECT datetime, {', '.join(packed_metrics.CHANNELS)} FROM metrics "
+                       f"WHERE run_id = ? ORDER BY id", conn, params=(run_id,))
+
+
+def backfill_run_summaries(conn, *, rebuild: bool = False, on_progress: Callable[[str], None] | None = None) -> int:
+    """ Fills run_summaries for runs stored without one (every run with rebuild=True), returns how many.
+        No commit, the caller owns the transaction """
+    where = "" if rebuild else "WHERE id NOT IN (SELECT run_id FROM run_summaries)"
+    run_ids = [r[0] for r in conn.execute(f"SELECT id FROM runs {where} ORDER BY id")]
+    if run_ids and on_progress:
+        on_progress(f"⏳ Summarizing {len(run_ids)} stored runs…")
+    filled = 0
+    for run_id in run_ids:
+        try:
+            summary = store_run_summary(conn, run_id, _stored_samples(conn, run_id), commit=False)
+        except (ValueError, TypeError) as e:       # unreadable samples, the detail page computes it as before
+            logging.warning(f"⚠️ No summary for run {run_id}: {e}")
+            _store_no_samples(conn, run_id)
+            continue
+        if summary is not None:
+            filled += 1
+    return filled
+
+
+def refresh_run_summaries(conn, on_progress: Callable[[str], None] | None = None) -> None:
+    """ Fills the summaries of runs stored without one (writer only, commits), e.g. after the v4 upgrade.
+        on_progress hears about it first when there is work to do """
+    try:
+        with conn:
+            filled = backfill_run_summaries(conn, on_progress=on_progress)
+        if filled:
+            logging.info(f"[DB] Stored the summary of {filled} runs")
+    except Exception as e:
+        logging.warning(f"⚠️ Could not fill the run summaries: {e}")
+
+
+def main():
+    """ python -m stryder_core.run_summaries [--rebuild] """
+    from stryder_core.config import DB_PATH
+    from stryder_core.db_schema import WRITER, connect_db
+
+    parser = argparse.ArgumentParser(description="Fill the run_summaries table for runs stored without one")
+    parser.add_argument("--db", default=DB_PATH, help="runs_data.db path")
+    parser.add_argument("--rebuild", action="store_true", help="recompute every run, not only the missing ones")
+    args = parser.parse_args()
+
+    conn = connect_db(args.db, WRITER)
+    try:
+        with conn:
+            filled = backfill_run_summaries(conn, rebuild=args.rebuild)
+    finally:
+        conn.close()
+    print(f"✅ Stored the summary of {filled} runs")
+
+
+if __name__ == "__main__":
+    main()
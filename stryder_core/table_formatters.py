@@ -1,49 +1,93 @@
+import numpy as np
 import pandas as pd
 from stryder_core import runtime_context
-from stryder_core.date_utilities import dt_to_string
+from stryder_core.date_utilities import to_utc_series
+from stryder_core.metrics import build_metrics
 from stryder_core.runtime_context import get_tzinfo
-from stryder_core.utils_formatting import fmt_hms, fmt_str_decimals, format_seconds
+from stryder_core.utils_formatting import fmt_distance_km_str, fmt_hms, fmt_str_decimals, format_seconds
+
+
+# Raw query columns of every list mode, in display order, with their header keys
+VIEW_COLUMNS = {
+    "for_views": (["run_id", "datetime", "wt_name", "distance_m", "duration_sec", "avg_power", "avg_hr", "wt_type"],
+                  ["id", "dt", "wt_name", "distance", "duration", "power_avg", "avg_hr", "wt_type"]),
+    "for_report": (["run_id", "datetime", "wt_name", "duration", "distance_m"],
+                   ["id", "dt", "wt_name", "duration", "distance"]),
+}
+
+# Raw run column -> metrics key whose formatter displays it
+RUN_COLUMN_METRICS = {"distance_m": "distance", "avg_power": "power_avg", "duration_sec": "duration",
+                      "duration": "duration"}
+
+MISSING = "–"       # shown for a missing distance/power, like format_runs_summary_for_ui does
+_TWO_DIGITS = np.array([f"{i:02}" for i in range(100)], dtype=object)
+
+
+def rows_to_columns(rows, columns=None) -> pd.DataFrame:
+    """ Query rows (sqlite3.Row or tuples with `columns`) as a DataFrame of the untouched values """
+    if columns is None:
+        columns = list(rows[0].keys()) if rows else []
+    return pd.DataFrame(list(rows), columns=columns, dtype=object)
+
+
+def format_run_columns(runs: pd.DataFrame, tz, dt_format: str = "%Y-%m-%d %H:%M:%S",
+                       metrics: dict | None = None) -> pd.DataFrame:
+    """ Display strings of the raw run columns present, a column at a time: datetime (stored UTC) -> local
+        dt_format, the RUN_COLUMN_METRICS columns with the formatter of their metric. Other columns are passed through """
+    metrics = metrics or build_metrics()
+    out = runs.copy()
+    if "datetime" in out.columns:
+        # strftime on naive wall times, it is several times faster than on tz-aware ones
+        out["datetime"] = to_utc_series(out["datetime"]).dt.tz_convert(tz).dt.tz_localize(None).dt.strftime(dt_format)
+    for col, key in RUN_COLUMN_METRICS.items():
+        if col in out.columns:
+            out[col] = column_formatter(metrics[key]["formatter"])(out[col])
+    return out
+
+
+def column_formatter(formatter):
+    """ Column version of a metrics formatter, vectorized for the ones in _COLUMN_FORMATTERS """
+    return _COLUMN_FORMATTERS.get(formatter, lambda values: values.map(formatter))
+
+
+def _km_column(meters: pd.Series) -> pd.Series:
+    """ fmt_distance_km_str of a column, MISSING where there is no value """
+    return _decimals_column(pd.to_numeric(meters, errors="coerce") / 1000)
+
+
+def _decimals_column(values: pd.Series) -> pd.Series:
+    """ fmt_str_decimals of a column, MISSING where there is no value """
+    values = pd.to_numeric(values, errors="coerce")
+    return values.map("{:.2f}".format).where(values.notna(), MISSING)
+
+
+def _hms_column(seconds: pd.Series) -> pd.Series:
+    """ fmt_hms of a column: rounded to the second, missing/negative as 0 """
+    sec = pd.to_numeric(seconds, errors="coerce").fillna(0).clip(lower=0).round().astype("int64").to_numpy()
+    h, rem = np.divmod(sec, 3600)
+    m, s = np.divmod(rem, 60)
+    hours = _TWO_DIGITS[np.minimum(h, 99)]
+    hours[h > 99] = h[h > 99].astype(str)
+    return pd.Series(hours + ":" + _TWO_DIGITS[m] + ":" + _TWO_DIGITS[s], index=seconds.index)
+
+
+_COLUMN_FORMATTERS = {fmt_distance_km_str: _km_column, fmt_str_decimals: _decimals_column, fmt_hms: _hms_column}
 
 
 def format_view_columns(rows, mode, metrics = None):
-    """Format runs (list of tuples) table for printing"""
+    """Format runs (list of tuples) table for printing, a column at a time with the metrics formatters"""
     from stryder_core.utils import get_keys
 
-    tz = get_tzinfo()
-    headers = None
-
-    formatted_rows= []
-    for row in rows:
-        # Header and data column order
-        if mode == "for_views":
-            headers = get_keys(["id", "dt", "wt_name", "distance", "duration", "power_avg", "avg_hr", "wt_type"])
-            dt_obj = metrics["dt"]["formatter"](row["datetime"])
-            display = [
-                row["run_id"],
-                dt_to_string(dt_obj, "ymd_hms", tz=tz),
-                row["wt_name"],
-                metrics["distance"]["formatter"](row["distance_m"]),
-                metrics["duration"]["formatter"](row["duration_sec"]),
-                metrics["power_avg"]["formatter"](row["avg_power"]),
-                row["avg_hr"],
-                row["wt_type"]
-            ]
-        elif mode == "for_report":
-            headers = get_keys(["id", "dt", "wt_name", "duration", "distance"])
-            dt_obj = metrics["dt"]["formatter"](row["datetime"])
-            display = [
-                row["run_id"],  # keep run_id here
-                dt_to_string(dt_obj, "ymd_hms", tz=tz),
-                row["wt_name"],
-                metrics["duration"]["formatter"](row["duration"]),
-                metrics["distance"]["formatter"](row["distance_m"]),
-            ]
-        else:
-            display = [row[k] for k in row.keys()]  # fallback
-
-        formatted_rows.append(display)
-
-    return headers, formatted_rows
+    if mode not in VIEW_COLUMNS:
+        return None, [[row[k] for k in row.keys()] for row in rows]  # fallback
+
+    columns, header_keys = VIEW_COLUMNS[mode]
+    headers = get_keys(header_keys)
+    if not rows:
+        return headers, []
+
+    display = format_run_columns(rows_to_columns(rows)[columns], get_tzinfo(), metrics=metrics)
+    return headers, display.to_numpy(dtype=object).tolist()
 
 
 def weekly_table_fmt(weekly_raw:pd.DataFrame, metrics:dict) -> pd.DataFrame:
@@ -96,24 +140,13 @@ def weekly_table_fmt(weekly_raw:pd.DataFrame, metrics:dict) -> pd.DataFrame:
     return out[cols]
 
 
-def format_row_for_ui(row_dict, metrics) -> dict:
-    """ Format dashboard run dict row for UI printing """
-    # Convert raw DB value -> datetime object using the same formatter as CLI
-    dt_obj = metrics["dt"]["formatter"](row_dict["datetime"])
-
-    # Get tzinfo from runtime_context (assuming you've already set it somewhere)
-    tzinfo = runtime_context.get_tzinfo()
-
-    return {
-        "run_id" : row_dict["run_id"],
-        "dt": dt_to_string(dt_obj, "ymd", tz=tzinfo),
-        "distance": metrics["distance"]["formatter"](row_dict["distance_m"]),
-        "duration": metrics["duration"]["formatter"](row_dict["duration_sec"]),
-        "avg_power": metrics["power_avg"]["formatter"](row_dict["avg_power"]),
-        "avg_hr": row_dict["avg_hr"],
-        "wt_name": row_dict["wt_name"],
-        "wt_type": row_dict["wt_type"],
-    }
+def format_rows_for_ui(rows, columns=None) -> list[dict]:
+    """ Format dashboard runs (rows of views_query) as dicts for UI printing """
+    if not rows:
+        return []
+    runs = format_run_columns(rows_to_columns(rows, columns), runtime_context.get_tzinfo(), dt_format="%Y-%m-%d")
+    runs = runs.rename(columns={"datetime": "dt", "distance_m": "distance", "duration_sec": "duration"})
+    return runs[["run_id", "dt", "distance", "duration", "avg_power", "avg_hr", "wt_name", "wt_type"]].to_dict("records")
 
 
 def format_runs_summary_for_ui(summary_row: dict) -> dict:
@@ -1,21 +1,17 @@
 from datetime import date, timedelta
-from stryder_core.metrics import build_metrics
-from stryder_core.queries import fetch_page, views_query
+import pandas as pd
+from stryder_core.downsampling import lttb_union_indices
+from stryder_core.queries import count_rows_for_query, fetch_page, fetch_views_page, views_query
 from stryder_core.reports import custom_dates_report, get_single_run_query, compute_single_run_summary
-from stryder_core.table_formatters import format_row_for_ui, format_runs_summary_for_ui
+from stryder_core.run_summaries import load_run_summary
+from stryder_core.table_formatters import format_rows_for_ui, format_runs_summary_for_ui
 from stryder_core.utils_formatting import fmt_hms
+from stryder_core.workout_search import keyword_filter
 
 
-def get_x_days_for_django(conn, days: int | None = None,
-                          end_date: date | None = None,
-                          start_date: date | None = None,
-                          keyword: str | None = None,
-                          ) -> tuple:
-    """Get runs and dates for either:
-       - last `days`, or
-       - explicit [start_date, end_date] range.
-    Returns (runs_for_ui, start_date, end_date).
-    """
+def _x_days_query(conn, days: int | None, end_date: date | None, start_date: date | None,
+                  keyword: str | None) -> tuple[str, tuple, date, date]:
+    """ Views query of the dashboard window, returns (query, params, end_date, start_date) """
     # days or dates should be inserted else error
     if days is not None:
         end_date = date.today()
@@ -31,20 +27,45 @@ def get_x_days_for_django(conn, days: int | None = None,
 
     if keyword:
         # Search by workout name, also by type name
-        conditions.append("(w.workout_name LIKE ? OR wt.name LIKE ?)")
-        params.append(f"%{keyword}%")
-        params.append(f"%{keyword}%")
+        keyword_condition, keyword_params = keyword_filter(conn, keyword)
+        conditions.append(keyword_condition)
+        params.extend(keyword_params)
 
     query += " WHERE " + " AND ".join(conditions)
+    return query, tuple(params), end_date, start_date
+
+
+def count_x_days_for_django(conn, days: int | None = None,
+                            end_date: date | None = None,
+                            start_date: date | None = None,
+                            keyword: str | None = None,
+                            ) -> int:
+    """ Number of runs get_x_days_for_django lists for the same window, without loading them """
+    query, params, _, _ = _x_days_query(conn, days, end_date, start_date, keyword)
+    return count_rows_for_query(conn, query, params)
 
-    rows, columns, _ = fetch_page(conn, query, tuple(params), page_size=0)
 
-    metrics = build_metrics("local")
+def get_x_days_for_django(conn, days: int | None = None,
+                          end_date: date | None = None,
+                          start_date: date | None = None,
+                          keyword: str | None = None,
+                          page: int = 1,
+                          page_size: int | None = None,
+                          ) -> tuple:
+    """Get runs and dates for either:
+       - last `days`, or
+       - explicit [start_date, end_date] range.
+    With page_size only that page of runs (1-based `page`) is fetched and formatted.
+    Returns (runs_for_ui, start_date, end_date).
+    """
+    query, params, end_date, start_date = _x_days_query(conn, days, end_date, start_date, keyword)
+
+    if page_size:
+        rows, columns = fetch_views_page(conn, query, page, params, page_size=page_size)
+    else:
+        rows, columns, _ = fetch_page(conn, query, params, page_size=0)
 
-    runs = []
-    for row in rows:
-        row_dict = dict(zip(columns, row))          # turn tuple → dict
-        runs.append(format_row_for_ui(row_dict, metrics))
+    runs = format_rows_for_ui(rows, columns)
 
     return runs, end_date, start_date
 
@@ -53,8 +74,10 @@ def get_dashboard_summary(conn, tz_name,
                           days: int | None =    None,
                           end_date: date | None = None,
                           start_date: date | None = None,
-                          keyword: str | None = None,) -> dict:
-    """Build ctx with 'runs' (formatted for UI) and 'summary' for dashboard."""
+                          keyword: str | None = None,
+                          page: int = 1,
+                          page_size: int | None = None,) -> dict:
+    """Build ctx with 'runs' (formatted for UI, only the `page` of page_size runs if given) and 'summary' for dashboard."""
 
     # if days is given, ignore start/end; otherwise use explicit range
     runs, end_date, start_date = get_x_days_for_django(
@@ -63,6 +86,8 @@ def get_dashboard_summary(conn, tz_name,
         end_date=end_date,
         start_date=start_date,
         keyword=keyword,
+        page=page,
+        page_size=page_size,
     )
 
     label, df_summary = custom_dates_report(
@@ -95,16 +120,21 @@ def get_dashboard_summary(conn, tz_name,
 
 
 def get_single_run_summary(conn, run_id, metrics) -> dict:
-    """ Build summary for single run. """
+    """ Build summary for single run, from its run_summaries row when it has one (df is None then),
+        otherwise from its samples. """
 
-    df_raw = get_single_run_query(conn, run_id, metrics)
+    s = load_run_summary(conn, run_id)
+    if s is not None:
+        df_raw, wt_name, dt = None, s["wt_name"], s["dt"]
+    else:
+        df_raw = get_single_run_query(conn, run_id, metrics)
 
-    if df_raw.empty:
-        return {"run_id": run_id, "summary": None, "wt_name": None, "df": None}
+        if df_raw.empty:
+            return {"run_id": run_id, "summary": None, "wt_name": None, "df": None}
 
-    s = compute_single_run_summary(df_raw)
-    wt_name = df_raw.iloc[0].get("wt_name") if "wt_name" in df_raw.columns else None
-    dt = df_raw.iloc[0].get("dt") if "dt" in df_raw.columns else None
+        s = compute_single_run_summary(df_raw)
+        wt_name = df_raw.iloc[0].get("wt_name") if "wt_name" in df_raw.columns else None
+        dt = df_raw.iloc[0].get("dt") if "dt" in df_raw.columns else None
 
     summary = {
         "run_id": s["run_id"],
@@ -123,5 +153,34 @@ def get_single_run_summary(conn, run_id, metrics) -> dict:
         "summary": summary,
         "dt": dt,
         "wt_name": wt_name,
-        "df": df_raw,  # optional if you want charts/table later
-    }
\ No newline at end of file
+        "df": df_raw,  # samples, only loaded when the run has no stored summary
+    }
+
+
+# decimals kept per series column in get_run_series (plenty for a plot, keeps the JSON small)
+SERIES_DECIMALS = {"elapsed_sec": 1, "distance_km": 3}
+SERIES_Y_DECIMALS = 2
+
+
+def get_run_series(conn, run_id, metrics, max_points: int) -> dict | None:
+    """ Columnar plot data of a run: every x axis and every plottable_single metric at the samples LTTB keeps
+        for any of the metrics (at most max_points each), NaN as None. None when the run has no samples """
+    df = get_single_run_query(conn, run_id, metrics)
+    if df.empty:
+        return None
+
+    y_keys = [k for k, meta in metrics.items() if meta.get("plottable_single") and k in df.columns]
+    elapsed = df["elapsed_sec"].to_numpy(dtype=float, na_value=float("nan"))
+    rows = df.iloc[lttb_union_indices(elapsed, [df[k].to_numpy(dtype=float, na_value=float("nan"))
+                                                for k in y_keys], max_points)]
+
+    def column(name, decimals):
+        values = pd.to_numeric(rows[name], errors="coerce").round(decimals)
+        return values.astype(object).where(values.notna(), None).tolist()
+
+    return {
+        "run_id": int(run_id),
+        "points": len(rows),
+        "x": {name: column(name, d) for name, d in SERIES_DECIMALS.items() if name in rows.columns},
+        "y": {key: column(key, SERIES_Y_DECIMALS) for key in y_keys},
+    }
@@ -0,0 +1,37 @@
+""" Keyword search over workout names and types through the workouts_fts FTS5 table (schema v7),
+    with a LIKE fallback when the table is missing. """
+
+import re
+
+FTS_TABLE = "workouts_fts"
+
+_WORD = re.compile(r"\w+")
+
+
+def has_workout_search(conn) -> bool:
+    """ True when the DB has the workouts_fts table """
+    row = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (FTS_TABLE,)).fetchone()
+    return row is not None
+
+
+def match_expression(keyword: str) -> str | None:
+    """ FTS5 query of the keyword: a prefix term per word, all required. None when it has no words """
+    words = _WORD.findall(keyword.lower())
+    if not words:
+        return None
+    return " ".join(f'"{word}"*' for word in words)
+
+
+def keyword_filter(conn, keyword: str, *, include_type: bool = True) -> tuple[str, tuple]:
+    """ WHERE condition (on workouts aliased w, and workout_types aliased wt with include_type)
+        and its params for the runs whose workout matches the keyword """
+    expression = match_expression(keyword)
+    if expression is not None and has_workout_search(conn):
+        if not include_type:
+            expression = f"workout_name : ({expression})"
+        return f"w.id IN (SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH ?)", (expression,)
+
+    like_term = f"%{keyword}%"
+    if include_type:
+        return "(w.workout_name LIKE ? OR wt.name LIKE ?)", (like_term, like_term)
+    return "w.workout_name LIKE ?", (like_term,)
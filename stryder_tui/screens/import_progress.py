@@ -1,3 +1,4 @@
+import threading
 from pathlib import Path
 from typing import Literal
 
@@ -7,11 +8,15 @@ from textual.containers import Container
 from textual.message import Message
 from textual.screen import Screen
 from textual.widgets import Header, Footer, RichLog, Button, Label
+from textual.worker import get_current_worker
 
 from stryder_core.config import DB_PATH
-from stryder_core.db_schema import connect_db
+from stryder_core.db_schema import READER, WRITER, connect_db
+from stryder_core.file_parsing import NO_MATCH
 from stryder_core.find_unparsed_runs import find_unparsed_files
-from stryder_core.import_runs import batch_process_stryd_folder, prepare_run_insert
+from stryder_core.import_runs import (batch_process_stryd_folder, default_import_workers, load_garmin_index,
+                                      prepare_run_insert, record_import_result)
+from stryder_core import import_ledger
 from stryder_core.pipeline import insert_full_run
 from stryder_tui.screens.confirm_dialog import ConfirmDialog
 from stryder_tui.screens.tz_prompt import TzPrompt
@@ -50,6 +55,9 @@ class ImportProgress(Screen):
         self.unparsed_skipped_count = 0
         self.run = {}
         self.review_mode = "none"
+        self.garmin_index = None
+        self.plan_answered = threading.Event()
+        self.plan_confirmed = False
 
     def compose(self) -> ComposeResult:
         yield Header()
@@ -78,7 +86,7 @@ class ImportProgress(Screen):
             self.worker = self.run_worker(self._run_unparsed, exclusive=True, thread=True)
 
     def _run_import(self) -> None:
-        conn = connect_db(self.db_path)
+        conn = connect_db(self.db_path, WRITER)
         try:
             summary = batch_process_stryd_folder(
                 self.stryd_path,
@@ -86,14 +94,41 @@ class ImportProgress(Screen):
                 conn,
                 self.tz,
                 on_progress=self._emit_progress,
-                should_cancel = lambda : self.should_cancel
+                should_cancel = lambda : self.should_cancel,
+                workers=default_import_workers(),
+                confirm_plan=self._confirm_plan,
             )
             self.post_message(ImportFinished(summary))
         finally:
             conn.close()
 
+    def _confirm_plan(self, plan) -> bool:
+        """ Called from the worker thread once the match plan is logged, waits for (p) Parse or (Esc) Cancel """
+        matched = int((plan["garmin_row"] != NO_MATCH).sum())
+        self.plan_answered.clear()
+        self.app.call_from_thread(self._show_plan_review, matched, len(plan))
+        worker = get_current_worker()
+        while not self.plan_answered.wait(0.2):
+            if worker.is_cancelled:
+                return False
+        return self.plan_confirmed
+
+    def _show_plan_review(self, matched: int, total: int) -> None:
+        self.review_mode = "plan"
+        self.query_one("#panel_header", Label).update("Review match plan")
+        self.query_one("#panel_file", Label).update(f"\n{matched} of {total} files matched with Garmin")
+        self.query_one("#panel_tz", Label).update(f"Timezone: {self.tz}")
+        self.query_one("#panel_keys", Label).update("\nKeys:\n(p) Parse the files (Esc) Cancel import")
+
+    def _answer_plan(self, confirmed: bool) -> None:
+        self.plan_confirmed = confirmed
+        self.review_mode = "none"
+        for label in ("#panel_header", "#panel_file", "#panel_tz", "#panel_keys"):
+            self.query_one(label, Label).update("")
+        self.plan_answered.set()
+
     def _run_unparsed(self) -> None:
-        conn = connect_db(self.db_path)
+        conn = connect_db(self.db_path, READER)
 
         result = find_unparsed_files(Path(self.stryd_path), conn,
                                      on_progress=self._emit_progress,
@@ -154,10 +189,12 @@ class ImportProgress(Screen):
         log = self.query_one("#log", RichLog)
 
         if choice == "parse":
-            conn = connect_db(self.db_path)
+            conn = connect_db(self.db_path, WRITER)
             try:
-                insert_full_run(self.run["stryd_df"], self.run["workout_name"], notes="", avg_power=self.run["avg_power"],
-                                avg_hr=None, total_m=self.run["total_m"], conn=conn)
+                _, run_id = insert_full_run(self.run["stryd_df"], self.run["workout_name"], notes="",
+                                            avg_power=self.run["avg_power"], avg_hr=None,
+                                            total_m=self.run["total_m"], conn=conn)
+                record_import_result(conn, file, self.run, status=import_ledger.IMPORTED, run_id=run_id)
                 self.unparsed_parsed_count += 1
                 log.write(f"! Parsed without Garmin match: {file.name}")
                 self._advance_to_next_file()
@@ -226,11 +263,12 @@ class ImportProgress(Screen):
         log = self.query_one("#log", RichLog)
 
         if self.run["status"] == "ok":
-            conn = connect_db(self.db_path)
+            conn = connect_db(self.db_path, WRITER)
             try:
-                insert_full_run(self.run["stryd_df"], self.run["workout_name"], notes="",
-                                avg_power=self.run["avg_power"], avg_hr=self.run["avg_hr"],
-                                total_m=self.run["total_m"], conn=conn)
+                _, run_id = insert_full_run(self.run["stryd_df"], self.run["workout_name"], notes="",
+                                            avg_power=self.run["avg_power"], avg_hr=self.run["avg_hr"],
+                                            total_m=self.run["total_m"], conn=conn)
+                record_import_result(conn, file, self.run, run_id=run_id)
             finally:
                 log.write(f"✔ Garmin match found: {file.name} - {self.run['total_m'] / 1000:.2f} km")
                 self.unparsed_parsed_count += 1
@@ -254,14 +292,24 @@ class ImportProgress(Screen):
 
         elif self.run["status"] == "already_exists":
             log.write(f"! Run already exists in DB.")
+            self._remember_file(file)
             self.unparsed_skipped_count += 1
             self._advance_to_next_file()
 
         elif self.run["status"] == "zero_data":
             log.write(f">> Run skipped due to zero Stryd speed/distance.")
+            self._remember_file(file)
             self.unparsed_skipped_count += 1
             self._advance_to_next_file()
 
+    def _remember_file(self, file) -> None:
+        """ Keeps the review outcome in the import ledger, the next scan won't open the file again """
+        conn = connect_db(self.db_path, WRITER)
+        try:
+            record_import_result(conn, file, self.run)
+        finally:
+            conn.close()
+
     def _handle_tz_response(self, tz:str) -> None:
         log = self.query_one("#log", RichLog)
         file = self.current_file
@@ -272,15 +320,22 @@ class ImportProgress(Screen):
             label.update(f"Please choose a valid timezone")
 
         else:
-            conn = connect_db(self.db_path)
+            conn = connect_db(self.db_path, READER)
             self.tz = tz     # store tz for later
             log.write(f"! Trying to match with Garmin with new timezone: {tz}")
-            self.run = prepare_run_insert(file, self.garmin_file, str(file), conn, self.tz)
+            self.run = prepare_run_insert(file, self.garmin_file, str(file), conn, self.tz,
+                                          garmin_index=self._get_garmin_index())
             log.write(f"! New run status after TZ change: {self.run['status']}")
             conn.close()
             self._handle_unparsed_status()
 
 
+    def _get_garmin_index(self):
+        """ Garmin csv is loaded and indexed once per review, timezone changes reuse it """
+        if self.garmin_index is None:
+            self.garmin_index = load_garmin_index(self.garmin_file, self.tz)
+        return self.garmin_index
+
     def _handle_unparsed_decision(self, choice: str):
         file = self.current_file
         if not file:
@@ -288,8 +343,9 @@ class ImportProgress(Screen):
         log = self.query_one("#log", RichLog)
 
         if choice == "parse":
-            conn = connect_db(self.db_path)
-            self.run = prepare_run_insert(file, self.garmin_file, str(file), conn, self.tz)
+            conn = connect_db(self.db_path, READER)
+            self.run = prepare_run_insert(file, self.garmin_file, str(file), conn, self.tz,
+                                          garmin_index=self._get_garmin_index())
             conn.close()
             self._handle_unparsed_status()
 
@@ -331,7 +387,8 @@ class ImportProgress(Screen):
             else:
                 log.write("✔ Import finished")
 
-            log.write(f"Parsed: {s['parsed']}  Skipped: {s['skipped']}  Total: {s['files_total']}")
+            log.write(f"Parsed: {s['parsed']}  Skipped: {s['skipped']} (unchanged: {s['unchanged']})  "
+                      f"Total: {s['files_total']}")
 
         elif self.mode == "unparsed":
             self.unparsed_files = s["unparsed_files"]
@@ -359,7 +416,9 @@ class ImportProgress(Screen):
     def action_parse_file(self) -> None:
         if self.import_done:
             return
-        if self.review_mode == "unparsed":
+        if self.review_mode == "plan":
+            self._answer_plan(True)
+        elif self.review_mode == "unparsed":
             self._handle_unparsed_decision(choice="parse")
         elif self.review_mode == "no_garmin":
             self._handle_no_garmin_decision(choice="parse")
@@ -382,6 +441,8 @@ class ImportProgress(Screen):
     def action_quit(self) -> None:
         if self.import_done:
             self.app.pop_screen()
+        elif self.review_mode == "plan":
+            self._answer_plan(False)
         elif self.review_mode != "none":
             self._handle_unparsed_decision(choice="exit")
         else:
@@ -3,7 +3,7 @@ from textual.screen import ModalScreen
 from textual.widgets import LoadingIndicator, Label
 
 from stryder_core.config import DB_PATH
-from stryder_core.db_schema import connect_db, wipe_all_data
+from stryder_core.db_schema import WRITER, connect_db, wipe_all_data
 
 
 class ResetDBProgress(ModalScreen):
@@ -25,7 +25,7 @@ class ResetDBProgress(ModalScreen):
         self.run_worker(self.reset_db, thread=True)
 
     def reset_db(self):
-        conn = connect_db(self.db_path)
+        conn = connect_db(self.db_path, WRITER)
         try:
             wipe_all_data(conn)
         finally:
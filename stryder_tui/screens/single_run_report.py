@@ -1,4 +1,3 @@
-import math
 import pandas as pd
 from textual import on
 from textual.containers import Container
@@ -10,12 +9,14 @@ from textual.widgets import Header, DataTable, Button, Footer, Label, RadioSet,
 from stryder_cli.visualizations import render_single_run_report
 from stryder_core.utils import configure_connection
 from stryder_core.config import DB_PATH
-from stryder_core.db_schema import connect_db
+from stryder_core.db_schema import READER, connect_db
+from stryder_core.downsampling import downsample_series
 from stryder_core.plot_core import X_AXIS_SPEC
 from stryder_core.reports import get_single_run_query
+from stryder_core.run_summaries import load_run_summary
 
 
-MAX_POINTS = 800            # max points for plot sampling without downsampling
+MAX_POINTS = 800            # plotted points, longer runs are LTTB-downsampled to this
 default_y_axis = "power_sec"
 default_x_axis = "elapsed_sec"
 
@@ -61,7 +62,7 @@ class SingleRunReport(Screen):
 
     def on_mount(self):
 
-        conn = connect_db(self.db_path)
+        conn = connect_db(self.db_path, READER)
         configure_connection(conn)
 
         self.load_single_run_summary(conn)
@@ -78,7 +79,7 @@ class SingleRunReport(Screen):
 
             self.samples = get_single_run_query(conn, self.run_id, self.metrics)
 
-            df_summary = render_single_run_report(self.samples)
+            df_summary = render_single_run_report(self.samples, load_run_summary(conn, self.run_id))
 
             if df_summary.empty:
                 page_label = self.query_one("#log", Label)
@@ -131,21 +132,16 @@ class SingleRunReport(Screen):
         else:
             raise ValueError(f"Unsupported x_meta={x_meta}. Use 'elapsed_sec' or 'distance_km'.")
 
-        # Downsampling according to length of the run
-        n = len(x)
-        stride = math.ceil(n / MAX_POINTS)
-
-        down_x = []
-        down_y = []
-        for i in range(0,len(x),stride):
-            down_x.append(x[i])
-            down_y.append(y_series[i])
+        # Downsampling according to length of the run, spikes are kept
+        x, y = downsample_series(x, y_series, MAX_POINTS)
+        down_x = x.tolist()
+        down_y = y.tolist()
 
         # Paint the plot
         plot_widget = self.query_one(PlotextPlot)
         plt = plot_widget.plt
         plt.clear_figure()
-        max_y = max(down_y)
+        max_y = max(down_y, default=0)
         upper = max_y * 1.1  # 10% headroom
         plt.ylim(0, upper)
         plt.plot(down_x, down_y, label=f"{y_label} over {x_label}")
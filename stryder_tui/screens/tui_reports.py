@@ -14,7 +14,7 @@ from stryder_core.reports import weekly_report
 from stryder_core.table_formatters import weekly_table_fmt
 from stryder_core.utils import configure_connection
 from stryder_core.config import DB_PATH
-from stryder_core.db_schema import connect_db
+from stryder_core.db_schema import READER, connect_db
 
 default_y_axis = "distance_km"
 default_x_axis = "week_start"
@@ -24,7 +24,7 @@ class RunReports(Screen):
 
     def __init__(self, metrics:dict, tz:str ) -> None:
         super().__init__()
-        self.conn = connect_db(DB_PATH)
+        self.conn = connect_db(DB_PATH, READER)
         self.metrics = metrics
         self.metrics_by_inner_key = {}
         self.tz = tz
@@ -8,12 +8,15 @@ from textual.widgets import Header, DataTable, Button, Footer, Label, Input
 
 from stryder_core.utils import configure_connection
 from stryder_core.config import DB_PATH
-from stryder_core.date_utilities import resolve_tz
-from stryder_core.db_schema import connect_db
-from stryder_core.queries import views_query, fetch_views_page, count_rows_for_query
+from stryder_core.date_utilities import resolve_tz, to_utc
+from stryder_core.db_schema import READER, connect_db
+from stryder_core.queries import views_query, count_rows_before, count_rows_for_query, date_cursor, fetch_keyset_page
 from stryder_core.table_formatters import format_view_columns
+from stryder_core.workout_search import keyword_filter
 from stryder_tui.screens.single_run_report import SingleRunReport
 
+COUNT_PAGES = 100       # filtered lists count this many pages at most, the label shows "/ 100+" past that
+
 
 class ViewRuns(Screen):
 
@@ -21,7 +24,7 @@ class ViewRuns(Screen):
 
     def __init__(self, metrics: dict, tz: str, mode="for_views") -> None:
         super().__init__()
-        self.conn = connect_db(DB_PATH)
+        self.conn = connect_db(DB_PATH, READER)
         self.metrics = metrics
         self.tz = tz
         self.mode = mode
@@ -32,9 +35,14 @@ class ViewRuns(Screen):
         self.start_date = ""
         self.end_date = datetime.now(resolve_tz(self.tz)).date()
 
-        self.page = 1
         self.page_size = 15
         self.total = 0
+        self.total_runs = 0
+        self.total_exact = True     # False when the filtered count stopped at COUNT_PAGES
+        self.position = 0           # runs before the shown page
+        self.page_len = 0
+        self.prev_cursor = None     # keyset cursors of the neighbouring pages, None at the ends
+        self.next_cursor = None
 
     def compose(self) -> ComposeResult:
         yield Header()
@@ -54,6 +62,11 @@ class ViewRuns(Screen):
                 id="keyword"
             )
             yield Button(label="Submit", id="submit")
+            yield Input(
+                placeholder="Jump to date YYYY-MM-DD...",
+                max_length=10,
+                id="jump_date"
+            )
 
         with Container(id="table_wrapper"):
             yield DataTable(id="run_view")
@@ -77,32 +90,40 @@ class ViewRuns(Screen):
 
         configure_connection(self.conn)
 
-        total_runs = count_rows_for_query(self.conn, self.base_query)
-        self.total = (total_runs + self.page_size - 1) // self.page_size
+        self._count_runs()
+        self.position = 0
+        self._paginate_runs(self.conn, self.base_query, self.mode, self.metrics, page_size=self.page_size)
 
-        self.page = 1
-        page_label = self.query_one("#page_label", Label)
-        page_label.update(f"Page: {self.page} / {self.total}")
 
-        self._paginate_runs(
-            self.conn, self.base_query, self.mode, self.metrics,
-            page=self.page, page_size=self.page_size
-        )
+    def _count_runs(self) -> None:
+        """ Unfiltered lists read the maintained run count, filters are counted up to COUNT_PAGES pages """
+        cap = None if not self.base_params else COUNT_PAGES * self.page_size
+        self.total_runs = count_rows_for_query(self.conn, self.base_query, self.base_params,
+                                               limit=None if cap is None else cap + 1)
+        self.total_exact = cap is None or self.total_runs <= cap
+        if not self.total_exact:
+            self.total_runs = cap
+        self.total = (self.total_runs + self.page_size - 1) // self.page_size
 
 
-    def _paginate_runs(self, conn, base_query, mode, metrics,
-                       page, base_params=(), page_size=15) -> None:
+    def _paginate_runs(self, conn, base_query, mode, metrics, base_params=(), page_size=15,
+                       after=None, before=None) -> None:
         """ The main function for pagination
-        a) take columns, rows and cursor sends them to be formatted
-        b) prints the table"""
+        a) fetches the keyset page after/before a cursor (the first page without one)
+        b) take columns, rows and cursor sends them to be formatted
+        c) prints the table"""
 
-        rows, columns = fetch_views_page(
+        rows, columns, self.prev_cursor, self.next_cursor = fetch_keyset_page(
             conn,
             base_query,
-            page=page,
-            base_params=base_params,
+            base_params,
+            after=after,
+            before=before,
             page_size=page_size
         )
+        if self.prev_cursor is None:        # a page cut short by the start comes back as the first page
+            self.position = 0
+        self.page_len = len(rows)
         headers, formatted_rows = format_view_columns(rows, mode, metrics)
 
         table = self.query_one("#run_view",DataTable)
@@ -122,31 +143,57 @@ class ViewRuns(Screen):
             table.focus()
             table.move_cursor(row=0, column=0)
 
+        page_label = self.query_one("#page_label", Label)
+        if self.total_exact:
+            page_label.update(f"Page: {min(self.position // page_size + 1, max(self.total, 1))} / {self.total}")
+        else:
+            page = self.position // page_size + 1
+            page_label.update(f"Page: {page} / {max(self.total, page)}+")
+
 
     def action_previous_page(self) -> None:
-        if self.page == 1:
+        if self.prev_cursor is None:
             return
 
-        self.page -= 1
+        self.position = max(0, self.position - self.page_size)
         self._paginate_runs(
             self.conn, self.base_query, self.mode, self.metrics,
-            page=self.page, base_params=self.base_params, page_size=self.page_size,
+            base_params=self.base_params, page_size=self.page_size, before=self.prev_cursor,
         )
-        page_label = self.query_one("#page_label", Label)
-        page_label.update(f"Page: {self.page} / {self.total}")
 
 
     def action_next_page(self) -> None:
-        if self.page == self.total:
+        if self.next_cursor is None:
             return
 
-        self.page += 1
+        self.position += self.page_len
         self._paginate_runs(
             self.conn, self.base_query, self.mode, self.metrics,
-            page=self.page, base_params=self.base_params, page_size=self.page_size,
+            base_params=self.base_params, page_size=self.page_size, after=self.next_cursor,
         )
-        page_label = self.query_one("#page_label", Label)
-        page_label.update(f"Page: {self.page} / {self.total}")
+
+
+    def action_jump_to_date(self) -> None:
+        """ Shows the page starting at the first run of the given (local) date, within the current filters """
+        log = self.query_one("#log_label", Label)
+        log.update("")
+        raw = self.query_one("#jump_date", Input).value.strip()
+        try:
+            day = datetime.strptime(raw, "%Y-%m-%d")
+        except ValueError:
+            log.update("!! Invalid date format. Please use YYYY-MM-DD (e.g., 2025-09-24).")
+            return
+
+        cursor = date_cursor(to_utc(day, in_tz=resolve_tz(self.tz)))
+        self.position = count_rows_before(self.conn, self.base_query, self.base_params, cursor)
+        self._paginate_runs(
+            self.conn, self.base_query, self.mode, self.metrics,
+            base_params=self.base_params, page_size=self.page_size, after=cursor,
+        )
+
+    @on(Input.Submitted, "#jump_date")
+    async def _on_jump_submitted(self, event: Input.Submitted) -> None:
+        await self.run_action("jump_to_date")
 
 
     def action_open_report(self) -> None:
@@ -222,21 +269,17 @@ class ViewRuns(Screen):
             where_clauses.append("r.datetime <= ?")
 
         if input_keyword:
-            self.keyword = f"%{input_keyword}%"
-            params.extend([self.keyword, self.keyword])
-            where_clauses.append("(w.workout_name LIKE ? OR wt.name LIKE ?)")
+            self.keyword = input_keyword
+            keyword_condition, keyword_params = keyword_filter(self.conn, input_keyword)
+            params.extend(keyword_params)
+            where_clauses.append(keyword_condition)
 
         self.base_query = views_query() + (" WHERE " + " AND ".join(where_clauses) if where_clauses else "")
         self.base_params = tuple(params)
 
-        total_runs = count_rows_for_query(self.conn, self.base_query, self.base_params)
-        self.total = (total_runs + self.page_size - 1) // self.page_size
-        self.page = 1
-        self._paginate_runs(self.conn, self.base_query, self.mode, self.metrics, self.page, self.base_params,
-                            self.page_size)
-
-        page_label = self.query_one("#page_label", Label)
-        page_label.update(f"Page: {self.page} / {self.total}")
+        self._count_runs()
+        self.position = 0
+        self._paginate_runs(self.conn, self.base_query, self.mode, self.metrics, self.base_params, self.page_size)
 
     @on(Button.Pressed, "#submit")
     async def _on_submit_pressed(self, event: Button.Pressed) -> None:
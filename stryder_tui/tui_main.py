@@ -7,9 +7,13 @@ from stryder_core.utils import configure_connection
 from stryder_cli.cli_utils import MenuItem
 from stryder_core.bootstrap import bootstrap_context_core, validate_path
 from stryder_core.config import DB_PATH
-from stryder_core.db_schema import connect_db, init_db
+from stryder_core.db_schema import WRITER, connect_db, init_db
 from stryder_core.profile_memory import blank_profile_config, check_boot_json, create_profile, get_active_garmin_csv, get_active_stryd_path, get_active_timezone, load_json, CONFIG_PATH, save_json, set_active_garmin_csv, set_active_profile, set_active_stryd_path, set_active_timezone
 from stryder_core.metrics import build_metrics
+from stryder_core.row_counts import refresh_listed_runs
+from stryder_core.run_rollups import refresh_rollups
+from stryder_core.run_summaries import refresh_run_summaries
+from stryder_core.runtime_context import get_tz_str
 
 
 from stryder_tui.screens.add_profile import AddProfile
@@ -27,7 +31,7 @@ class StryderTui(App):
     """ The main application """
 
     def on_mount(self):
-        self.conn = connect_db(DB_PATH)
+        self.conn = connect_db(DB_PATH, WRITER)
         self.data = load_json(CONFIG_PATH)
         self.startup_status = check_boot_json(self.data)
 
@@ -53,9 +57,22 @@ class StryderTui(App):
         """ Bootstrap actions after profile check is legit """
 
         bootstrap_context_core(self.data)
+        tz_str = get_tz_str()
+        # first start after an upgrade can take a while, the menus are usable meanwhile
+        self.run_worker(lambda: self._refresh_stored_data(tz_str), thread=True, group="startup")
         self.metrics = build_metrics("local")
         self.mode : Literal["import", "unparsed"] = "import"
 
+    def _refresh_stored_data(self, tz_str: str) -> None:
+        """ Worker thread: rollups, listed run count and run summaries of the stored runs, on its own connection """
+        conn = connect_db(DB_PATH, WRITER)
+        try:
+            refresh_rollups(conn, tz_str)       # so read-only viewers can answer from the rollups too
+            refresh_listed_runs(conn)
+            refresh_run_summaries(conn, on_progress=lambda msg: self.call_from_thread(self.notify, msg))
+        finally:
+            conn.close()
+
 
     def on_ready(self) -> None:
         if self.startup_mode == "normal":
@@ -1,14 +1,17 @@
 from functools import lru_cache
 import json
+import logging
+import os
 import sqlite3
+import threading
+
+from django.conf import settings
 
 from stryder_core.bootstrap import bootstrap_context_core
-from stryder_core.db_schema import connect_db
+from stryder_core.db_schema import READER, connect_db
 from stryder_core.metrics import build_metrics
 from stryder_core.profile_memory import load_json, CONFIG_PATH
 
-from stryder_web.stryder_web import settings
-
 
 class ProfileRequiredError(Exception):
     pass
@@ -56,21 +59,60 @@ def get_metrics():
     return build_metrics("local")
 
 
-def get_conn():
-    try:
-        conn = connect_db(settings.STRYDER_DB_PATH)
-        cur = conn.cursor()
+# One read-only connection per worker thread, reused across requests (callers don't close it).
+# It is reopened when the DB file is replaced or rewritten (TUI wipe / re-import, restored backup).
+_local = threading.local()
+
+
+def _db_file_identity(db_path):
+    """ (device, inode, mtime) of the DB file, changes when the file is replaced or rewritten """
+    st = os.stat(db_path)
+    return st.st_dev, st.st_ino, st.st_mtime_ns
+
 
-        cur.execute("""
+def _open_conn(db_path):
+    """ Opens a reader and checks once that the DB is initialized """
+    conn = connect_db(db_path, READER)
+    try:
+        row = conn.execute("""
             SELECT name 
             FROM sqlite_master 
             WHERE type='table' AND name='runs';
-        """)   
+        """).fetchone()
+    except sqlite3.OperationalError:
+        conn.close()
+        raise
+    if row is None:
+        conn.close()
+        raise MissingDatabaseError("Database exists but is not initialized")
+    return conn
 
-        if cur.fetchone() is None:
-            raise MissingDatabaseError("Database exists but is not initialized")
 
-        return conn
-    
+def get_conn():
+    """ Read-only connection of this thread, (re)opened on first use or when the DB file changed """
+    db_path = settings.STRYDER_DB_PATH
+    try:
+        identity = (str(db_path), _db_file_identity(db_path))
+        conn = getattr(_local, "conn", None)
+        if conn is not None and _local.identity == identity:
+            return conn
+
+        close_conn()
+        if conn is not None:
+            logging.info(f"[DB] {db_path} changed, reconnecting")
+        _local.conn = _open_conn(db_path)
+        _local.identity = identity
+        return _local.conn
+
     except(FileNotFoundError, sqlite3.OperationalError) as e:
-        raise MissingDatabaseError("Invalid or missing database") from e
\ No newline at end of file
+        close_conn()
+        raise MissingDatabaseError("Invalid or missing database") from e
+
+
+def close_conn():
+    """ Closes this thread's connection (the next get_conn opens a new one) """
+    conn = getattr(_local, "conn", None)
+    _local.conn = None
+    _local.identity = None
+    if conn is not None:
+        conn.close()
\ No newline at end of file
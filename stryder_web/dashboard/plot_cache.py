@@ -0,0 +1,109 @@
+""" Rendered run plot PNGs in an in-process LRU and optionally a directory shared by the gunicorn workers,
+    keyed by everything the picture depends on (data version included), so stale entries are never served. """
+
+from collections import OrderedDict
+import hashlib
+import logging
+import os
+from pathlib import Path
+import tempfile
+import threading
+import time
+
+# bump when the way run plots are drawn changes
+PLOT_VERSION = 2
+
+MEMORY_ENTRIES = 64
+DISK_ENTRIES = 2000
+
+
+def plot_cache_key(db_path, run_id: int, run_start: str, x: str, y: str, schema_version: int,
+                   data_version: tuple[int, int] | None) -> str:
+    """ Hex digest naming one rendered plot, also used as its ETag. data_version is row_counts.data_version """
+    parts = (str(db_path), run_id, run_start, x, y, schema_version, data_version, PLOT_VERSION)
+    return hashlib.sha256("|".join(map(str, parts)).encode()).hexdigest()[:32]
+
+
+class PlotCache:
+    """ LRU of key → (png bytes, rendered at epoch seconds), backed by `cache_dir` when given """
+
+    def __init__(self, cache_dir: str | Path | None = None, *, memory_entries: int = MEMORY_ENTRIES,
+                 disk_entries: int = DISK_ENTRIES):
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.memory_entries = memory_entries
+        self.disk_entries = disk_entries
+        self._entries: OrderedDict[str, tuple[bytes, float]] = OrderedDict()
+        self._lock = threading.Lock()
+        if self.cache_dir is not None:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.png"
+
+    def get(self, key: str) -> tuple[bytes, float] | None:
+        """ (png, rendered_at) of a cached plot, None on a miss. Disk hits are kept in memory too """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return entry
+
+        if self.cache_dir is None:
+            return None
+        path = self._path(key)
+        try:
+            png = path.read_bytes()
+            rendered_at = path.stat().st_mtime
+            os.utime(path, (time.time(), rendered_at))      # atime marks the use for the disk LRU
+        except OSError:
+            return None
+        self._remember(key, (png, rendered_at))
+        return png, rendered_at
+
+    def put(self, key: str, png: bytes) -> float:
+        """ Stores a freshly rendered plot, returns its rendered_at """
+        rendered_at = time.time()
+        self._remember(key, (png, rendered_at))
+        if self.cache_dir is not None:
+            try:
+                self._write(key, png, rendered_at)
+            except OSError as e:
+                logging.warning(f"⚠️ Plot cache write failed: {e}")
+        return rendered_at
+
+    def rendered_at(self, key: str) -> float | None:
+        """ When the cached plot was rendered, None if it is not cached """
+        entry = self.get(key)
+        return entry[1] if entry is not None else None
+
+    def _remember(self, key: str, entry: tuple[bytes, float]) -> None:
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.memory_entries:
+                self._entries.popitem(last=False)
+
+    def _write(self, key: str, png: bytes, rendered_at: float) -> None:
+        """ Atomic write (other workers may read the same file), then evicts the least recently used files """
+        fd, tmp = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(png)
+            os.utime(tmp, (rendered_at, rendered_at))
+            os.replace(tmp, self._path(key))
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+
+        files = list(self.cache_dir.glob("*.png"))
+        if len(files) <= self.disk_entries:
+            return
+        used = []
+        for path in files:
+            try:
+                used.append((path.stat().st_atime, path))
+            except OSError:         # evicted by another worker meanwhile
+                continue
+        used.sort()
+        for _, path in used[:len(used) - self.disk_entries]:
+            path.unlink(missing_ok=True)
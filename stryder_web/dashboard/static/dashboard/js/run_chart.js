@@ -0,0 +1,183 @@
+// Run detail chart: loads series.json once and redraws on every axis change, without reloading the page.
+// If the series can't be loaded the server-rendered PNG is shown instead.
+(function () {
+  "use strict";
+
+  const root = document.getElementById("run-chart");
+  const form = document.querySelector(".axis-form");
+  if (!root || !form) return;
+
+  const canvas = document.getElementById("run-chart-canvas");
+  const title = document.getElementById("run-chart-title");
+  const WIDTH = 900;
+  const HEIGHT = 450;
+  const PAD = { left: 60, right: 20, top: 15, bottom: 45 };
+
+  function checked(name) {
+    const input = form.querySelector(`input[name="${name}"]:checked`);
+    return input ? input.value : null;
+  }
+
+  function showPng() {
+    const img = document.createElement("img");
+    img.alt = "Run plot";
+    img.className = "graph_img";
+    img.src = `${root.dataset.plotUrl}?y=${encodeURIComponent(checked("y"))}&x=${encodeURIComponent(checked("x"))}`;
+    root.appendChild(img);
+  }
+
+  function niceStep(span, ticks) {
+    const raw = span / ticks;
+    const magnitude = Math.pow(10, Math.floor(Math.log10(raw)));
+    const norm = raw / magnitude;
+    return (norm < 1.5 ? 1 : norm < 3 ? 2 : norm < 7 ? 5 : 10) * magnitude;
+  }
+
+  // same as utils_formatting.fmt_hm
+  function fmtHm(seconds) {
+    const total = Math.max(0, Math.round(seconds));
+    const h = Math.floor(total / 3600);
+    const m = Math.floor((total % 3600) / 60);
+    return `${String(h).padStart(2, "0")}:${String(m).padStart(2, "0")}`;
+  }
+
+  // x ticks like plot_single_series: 15/5 minutes for time, whole kilometres for distance
+  function xTicks(xKey, min, max) {
+    if (xKey === "elapsed_sec") {
+      return { step: max - min >= 3600 ? 900 : 300, format: fmtHm };
+    }
+    return { step: Math.max(1, niceStep(max - min, 10)), format: (v) => String(Math.round(v * 10) / 10) };
+  }
+
+  function range(values) {
+    let min = Infinity;
+    let max = -Infinity;
+    for (const v of values) {
+      if (v < min) min = v;
+      if (v > max) max = v;
+    }
+    if (min === max) {
+      min -= 1;
+      max += 1;
+    }
+    return [min, max];
+  }
+
+  function draw(series, xKey, yKey) {
+    const xs = series.x[xKey];
+    const ys = series.y[yKey];
+    const px = [];
+    const py = [];
+    for (let i = 0; i < xs.length; i++) {
+      if (xs[i] !== null && ys[i] !== null) {
+        px.push(xs[i]);
+        py.push(ys[i]);
+      }
+    }
+
+    const ratio = window.devicePixelRatio || 1;
+    canvas.width = WIDTH * ratio;
+    canvas.height = HEIGHT * ratio;
+    const ctx = canvas.getContext("2d");
+    ctx.setTransform(ratio, 0, 0, ratio, 0, 0);
+    ctx.clearRect(0, 0, WIDTH, HEIGHT);
+    if (!px.length) return;
+
+    const [xMin, xMax] = range(px);
+    let [yMin, yMax] = range(py);
+    const yPad = (yMax - yMin) * 0.05;
+    yMin -= yPad;
+    yMax += yPad;
+
+    const plotW = WIDTH - PAD.left - PAD.right;
+    const plotH = HEIGHT - PAD.top - PAD.bottom;
+    const sx = (v) => PAD.left + ((v - xMin) / (xMax - xMin)) * plotW;
+    const sy = (v) => PAD.top + plotH - ((v - yMin) / (yMax - yMin)) * plotH;
+
+    // grid + tick labels
+    ctx.font = "12px sans-serif";
+    ctx.fillStyle = "#444";
+    ctx.strokeStyle = "rgba(0, 0, 0, 0.1)";
+    ctx.lineWidth = 1;
+
+    const xt = xTicks(xKey, xMin, xMax);
+    ctx.textAlign = "center";
+    ctx.textBaseline = "top";
+    for (let v = Math.ceil(xMin / xt.step) * xt.step; v <= xMax; v += xt.step) {
+      ctx.beginPath();
+      ctx.moveTo(sx(v), PAD.top);
+      ctx.lineTo(sx(v), PAD.top + plotH);
+      ctx.stroke();
+      ctx.fillText(xt.format(v), sx(v), PAD.top + plotH + 6);
+    }
+
+    const yStep = niceStep(yMax - yMin, 6);
+    ctx.textAlign = "right";
+    ctx.textBaseline = "middle";
+    for (let v = Math.ceil(yMin / yStep) * yStep; v <= yMax; v += yStep) {
+      ctx.beginPath();
+      ctx.moveTo(PAD.left, sy(v));
+      ctx.lineTo(PAD.left + plotW, sy(v));
+      ctx.stroke();
+      ctx.fillText(String(Math.round(v * 100) / 100), PAD.left - 6, sy(v));
+    }
+
+    const xAxis = series.x_axes[xKey];
+    const yAxis = series.y_axes[yKey];
+    ctx.textAlign = "center";
+    ctx.textBaseline = "bottom";
+    ctx.fillText(xAxis.label, PAD.left + plotW / 2, HEIGHT - 2);
+    ctx.save();
+    ctx.translate(14, PAD.top + plotH / 2);
+    ctx.rotate(-Math.PI / 2);
+    ctx.textBaseline = "middle";
+    ctx.fillText(yAxis.label, 0, 0);
+    ctx.restore();
+
+    ctx.strokeRect(PAD.left, PAD.top, plotW, plotH);
+
+    // the series
+    ctx.strokeStyle = "#1f77b4";
+    ctx.lineWidth = 1.5;
+    ctx.beginPath();
+    ctx.moveTo(sx(px[0]), sy(py[0]));
+    for (let i = 1; i < px.length; i++) ctx.lineTo(sx(px[i]), sy(py[i]));
+    ctx.stroke();
+
+    // same title as dashboard_detail builds
+    title.textContent = `${yAxis.label} (${yAxis.unit}) over ${xAxis.label} ${xAxis.unit}`;
+  }
+
+  function redraw(series) {
+    let yKey = checked("y");
+    let xKey = checked("x");
+    if (!(yKey in series.y)) yKey = Object.keys(series.y)[0];
+    if (!(xKey in series.x)) xKey = Object.keys(series.x)[0];
+    draw(series, xKey, yKey);
+
+    // keep the choice on reload / back
+    const params = new URLSearchParams(window.location.search);
+    params.set("y", yKey);
+    params.set("x", xKey);
+    window.history.replaceState(null, "", `?${params}`);
+  }
+
+  fetch(root.dataset.seriesUrl, { headers: { Accept: "application/json" } })
+    .then((response) => {
+      if (!response.ok) throw new Error(`series.json: HTTP ${response.status}`);
+      return response.json();
+    })
+    .then((series) => {
+      // switch axes here instead of submitting the form
+      for (const input of form.querySelectorAll("input[type=radio]")) {
+        input.onchange = null;
+        input.addEventListener("change", () => redraw(series));
+      }
+      canvas.hidden = false;
+      redraw(series);
+    })
+    .catch((error) => {
+      console.warn(error);
+      showPng();
+    });
+})();
@@ -5,4 +5,5 @@ urlpatterns = [
     path("", views.dashboard_list, name="dashboard_list"),
     path("runs/<int:run_id>/", views.dashboard_detail, name="dashboard_detail"),
     path("runs/<int:run_id>/plot/", views.run_plot, name="run_plot"),
+    path("runs/<int:run_id>/series.json", views.run_series, name="run_series"),
 ]
\ No newline at end of file
@@ -1,17 +1,24 @@
-from datetime import timedelta
+from datetime import datetime, timedelta, timezone as dt_timezone
 from io import BytesIO
 
+from django.conf import settings
 from django.core.paginator import Paginator
-from django.http import HttpResponse
+from django.http import HttpResponse, JsonResponse
 from django.shortcuts import render
+from django.utils.cache import patch_cache_control
 from django.utils.dateparse import parse_date
+from django.utils.http import http_date
 from django.utils import timezone
+from django.views.decorators.gzip import gzip_page
+from django.views.decorators.http import condition
 
 from stryder_core.plot_core import plot_single_series, X_AXIS_SPEC
 from stryder_core.reports import get_single_run_query
-from stryder_core.usecases import get_dashboard_summary, get_single_run_summary
+from stryder_core.row_counts import data_version
+from stryder_core.usecases import count_x_days_for_django, get_dashboard_summary, get_run_series, get_single_run_summary
 
 from stryder_web.dashboard.core_services import MissingDatabaseError, ProfileRequiredError, get_bootstrap, get_core_config, get_metrics, get_conn
+from stryder_web.dashboard.plot_cache import PlotCache, plot_cache_key
 
 import matplotlib
 
@@ -20,6 +27,13 @@ matplotlib.use("Agg")
 from matplotlib import pyplot as plt
 
 
+DASHBOARD_PAGE_SIZE = 15
+PLOT_MAX_POINTS = 2000      # run plots are LTTB-downsampled to this many points
+SERIES_MAX_POINTS = 1000    # series.json keeps at most this many points per metric
+
+PLOT_CACHE = PlotCache(settings.STRYDER_PLOT_CACHE_DIR)
+
+
 # Create your views here.
 def dashboard_list(request):
     try:
@@ -67,17 +81,18 @@ def dashboard_list(request):
         start_dt, end_dt = end_dt, start_dt
         start_raw, end_raw = start_dt.isoformat(), end_dt.isoformat()
 
-    # 3) create summary table from core using the inserted dates
-    try:
-        ctx = get_dashboard_summary(conn, tz_str, end_date=end_dt,
-        start_date=start_dt, keyword=key if key else None)
-    finally:
-        conn.close()
+    # 3) count the runs so the paginator can resolve the page, then fetch and format only that page
+    total_runs = count_x_days_for_django(conn, end_date=end_dt, start_date=start_dt,
+                                         keyword=key if key else None)
+    paginator = Paginator(range(total_runs), DASHBOARD_PAGE_SIZE)
+    page_obj = paginator.get_page(request.GET.get("page"))
 
-    # 4) Set the paginator and page size
-    paginator = Paginator(ctx["runs"], 15)
-    page_number = request.GET.get("page")
-    page_obj = paginator.get_page(page_number)
+    ctx = get_dashboard_summary(conn, tz_str, end_date=end_dt,
+    start_date=start_dt, keyword=key if key else None,
+    page=page_obj.number, page_size=DASHBOARD_PAGE_SIZE)
+
+    # 4) The page shows the runs core formatted for it
+    page_obj.object_list = ctx["runs"]
 
     # 5) Build ctx for use in filtering
     ctx["page_obj"] = page_obj
@@ -136,11 +151,7 @@ def dashboard_detail(request, run_id):
     graph_title = f"{y_label} ({y_unit}) over {x_label} {x_unit}"
 
     conn = get_conn()
-
-    try:
-        ctx = get_single_run_summary(conn, run_id, metrics)
-    finally:
-        conn.close()
+    ctx = get_single_run_summary(conn, run_id, metrics)
 
     context = {
         "run_id": ctx["run_id"],
@@ -157,18 +168,61 @@ def dashboard_detail(request, run_id):
     return render(request, "dashboard/dashboard_detail.html", context)
 
 
+def _run_cache_key(run_id, x, y):
+    """ Cache key (and ETag) of a rendering of the run, None for an unknown run """
+    conn = get_conn()
+    row = conn.execute("SELECT datetime FROM runs WHERE id = ?", (run_id,)).fetchone()
+    schema_version = conn.execute("PRAGMA user_version").fetchone()[0]
+    if row is None:
+        return None
+    return plot_cache_key(settings.STRYDER_DB_PATH, run_id, row[0], x, y, schema_version, data_version(conn))
+
+
+def _run_plot_key(request, run_id):
+    """ Plot cache key (and ETag) of the requested plot, None for an unknown run or axis. Computed once per request """
+    if not hasattr(request, "_run_plot_key"):
+        request._run_plot_key = None
+        x = request.GET.get("x", "elapsed_sec")
+        y = request.GET.get("y", "power")
+        if x in X_AXIS_SPEC and y in get_metrics():
+            request._run_plot_key = _run_cache_key(run_id, x, y)
+    return request._run_plot_key
+
+
+def _run_plot_last_modified(request, run_id):
+    key = _run_plot_key(request, run_id)
+    rendered_at = PLOT_CACHE.rendered_at(key) if key else None
+    return datetime.fromtimestamp(int(rendered_at), dt_timezone.utc) if rendered_at else None
+
+
+@condition(etag_func=_run_plot_key, last_modified_func=_run_plot_last_modified)
 def run_plot(request, run_id):
     get_bootstrap()
     metrics = get_metrics()
 
-    conn = get_conn()
-    try:
-        df_raw = get_single_run_query(conn, run_id, metrics)
-    finally:
-        conn.close()
+    key = _run_plot_key(request, run_id)
+    cached = PLOT_CACHE.get(key) if key else None
+    if cached is None:
+        png = _render_run_plot(request, run_id, metrics)
+        if png is None:
+            return HttpResponse(status=404)
+        rendered_at = PLOT_CACHE.put(key, png) if key else None
+    else:
+        png, rendered_at = cached
+
+    response = HttpResponse(png, content_type="image/png")
+    if rendered_at:
+        response.headers["Last-Modified"] = http_date(rendered_at)
+    patch_cache_control(response, no_cache=True)    # browsers/nginx may keep it, revalidating with the ETag
+    return response
+
+
+def _render_run_plot(request, run_id, metrics) -> bytes | None:
+    """ Draws the requested plot of the run as PNG bytes, None when the run has no samples """
+    df_raw = get_single_run_query(get_conn(), run_id, metrics)
 
     if df_raw.empty:
-        return HttpResponse(status=404)
+        return None
 
     selected_y = request.GET.get("y", "power")
     y_label = metrics[selected_y]["label"]
@@ -184,7 +238,8 @@ def run_plot(request, run_id):
         y_col=selected_y,
         ax=ax,
         y_label=y_label,
-        x_label=x_label
+        x_label=x_label,
+        max_points=PLOT_MAX_POINTS,
     )
 
     buf = BytesIO()
@@ -192,4 +247,28 @@ def run_plot(request, run_id):
     plt.close(fig)
     buf.seek(0)
 
-    return HttpResponse(buf.getvalue(), content_type="image/png")
+    return buf.getvalue()
+
+
+def _run_series_etag(request, run_id):
+    return _run_cache_key(run_id, "series", SERIES_MAX_POINTS)
+
+
+@gzip_page
+@condition(etag_func=_run_series_etag)
+def run_series(request, run_id):
+    """ Decimated columns of every x axis and plottable metric of the run, for the client-side chart """
+    get_bootstrap()
+    metrics = get_metrics()
+
+    series = get_run_series(get_conn(), run_id, metrics, SERIES_MAX_POINTS)
+
+    if series is None:
+        return HttpResponse(status=404)
+
+    series["x_axes"] = {key: {"label": meta["label"], "unit": meta["unit"]} for key, meta in X_AXIS_SPEC.items()}
+    series["y_axes"] = {key: {"label": metrics[key]["label"], "unit": metrics[key]["unit"]} for key in series["y"]}
+
+    response = JsonResponse(series, json_dumps_params={"separators": (",", ":")})
+    patch_cache_control(response, no_cache=True)
+    return response
@@ -9,6 +9,7 @@ https://docs.djangoproject.com/en/5.2/topics/settings/
 For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
+import os
 from pathlib import Path
 
 from stryder_core.config import DB_PATH
@@ -80,6 +81,9 @@ WSGI_APPLICATION = 'stryder_web.stryder_web.wsgi.application'
 
 STRYDER_DB_PATH = DB_PATH
 
+# Optional directory for rendered run plots shared by the workers (in-process cache only when unset)
+STRYDER_PLOT_CACHE_DIR = os.environ.get("STRYDER_PLOT_CACHE_DIR") or None
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
@@ -0,0 +1,64 @@
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "stryder_web.stryder_web.settings")
+
+from django.test import override_settings
+
+from stryder_core.db_schema import connect_db, init_db
+from stryder_web.dashboard.core_services import MissingDatabaseError, close_conn, get_conn
+
+
+class TestWebConnection(unittest.TestCase):
+    """ One reused read-only connection per thread, reopened when the DB file changes """
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.tmp, "runs.db")
+        conn = connect_db(self.db_path)
+        init_db(conn)
+        conn.close()
+        overridden = override_settings(STRYDER_DB_PATH=self.db_path)
+        overridden.enable()
+        self.addCleanup(overridden.disable)
+        self.addCleanup(shutil.rmtree, self.tmp)
+        self.addCleanup(close_conn)
+
+    def test_reused_within_thread(self):
+        conn = get_conn()
+        self.assertIs(get_conn(), conn)
+        self.assertEqual(conn.execute("SELECT COUNT(*) FROM runs").fetchone()[0], 0)
+
+    def test_reopened_when_file_replaced(self):
+        conn = get_conn()
+        copy = os.path.join(self.tmp, "copy.db")
+        shutil.copyfile(self.db_path, copy)
+        os.replace(copy, self.db_path)
+        self.assertIsNot(get_conn(), conn)
+
+    def test_separate_connection_per_thread(self):
+        conn = get_conn()
+        other = []
+        thread = threading.Thread(target=lambda: (other.append(get_conn()), close_conn()))
+        thread.start()
+        thread.join()
+        self.assertIsNot(other[0], conn)
+
+    def test_missing_database(self):
+        os.remove(self.db_path)
+        with self.assertRaises(MissingDatabaseError):
+            get_conn()
+
+    def test_uninitialized_database(self):
+        empty = os.path.join(self.tmp, "empty.db")
+        connect_db(empty).close()
+        with override_settings(STRYDER_DB_PATH=empty):
+            with self.assertRaises(MissingDatabaseError):
+                get_conn()
+
+
+if __name__ == "__main__":
+    unittest.main()
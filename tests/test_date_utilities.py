@@ -0,0 +1,49 @@
+from datetime import date, datetime, timezone
+import unittest
+from zoneinfo import ZoneInfo
+
+import pandas as pd
+
+from stryder_core.date_utilities import to_utc, to_utc_series
+
+ATHENS = ZoneInfo("Europe/Athens")
+
+
+class TestToUtcSeries(unittest.TestCase):
+    """ The vectorized conversion agrees with to_utc value by value """
+
+    def assert_matches_scalar(self, values, in_tz=None):
+        got = to_utc_series(values, in_tz=in_tz)
+        self.assertEqual(str(got.dtype), "datetime64[ns, UTC]")
+        for value, utc in zip(values, got):
+            self.assertEqual(utc, pd.Timestamp(to_utc(value, in_tz=in_tz)), value)
+
+    def test_strings(self):
+        self.assert_matches_scalar([
+            "2026-01-01 10:00:00", "2026-01-01T10:00:00.250000", "2026-01-01",
+            "2026-02-07 06:30:39+00:00", "2026-02-07 06:30:39-03:30", "2026-02-07T06:30:39+0530",
+            "2026-02-07T06:30:39Z", "1700000000", "1700000000123", "1700000000.5",
+        ], in_tz=ATHENS)
+
+    def test_dst_edges(self):
+        # 03:30 happens twice on 25 Oct (first, +03:00 one taken) and never on 29 Mar (+02:00 kept)
+        values = ["2026-10-25 03:30:00", "2026-03-29 03:30:00"]
+        self.assert_matches_scalar(values, in_tz=ATHENS)
+        self.assert_matches_scalar(pd.to_datetime(pd.Series(values)), in_tz=ATHENS)
+        self.assertEqual(list(to_utc_series(values, in_tz=ATHENS)),
+                         [pd.Timestamp("2026-10-25 00:30", tz="UTC"), pd.Timestamp("2026-03-29 01:30", tz="UTC")])
+
+    def test_objects_and_numbers(self):
+        self.assert_matches_scalar([datetime(2026, 10, 25, 3, 30), datetime(2026, 1, 1, tzinfo=timezone.utc),
+                                    pd.Timestamp("2026-03-29 03:30"), date(2026, 5, 5)], in_tz=ATHENS)
+        self.assert_matches_scalar([1_700_000_000, 1_700_000_000_123, 1_700_000_000.5])
+
+    def test_missing_and_invalid_become_nat(self):
+        got = to_utc_series(pd.Series(["2026-01-01 10:00:00", None, "not a date"], index=[5, 5, 7]))
+        self.assertEqual(list(got.index), [5, 5, 7])
+        self.assertEqual(got.iloc[0], pd.Timestamp("2026-01-01 10:00", tz="UTC"))
+        self.assertTrue(got.iloc[1:].isna().all())
+
+
+if __name__ == "__main__":
+    unittest.main()
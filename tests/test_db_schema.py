@@ -0,0 +1,205 @@
+from pathlib import Path
+import sqlite3
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+
+from stryder_core.db_schema import READER, connect_db, init_db, insert_metrics, insert_run
+from stryder_core.migrations import latest_schema_version
+
+
+def legacy_insert_metrics(run_id, df, conn):
+    """ The row-by-row implementation insert_metrics replaced, kept as the parity reference """
+    rows = []
+    for i, row in df.iterrows():
+        ts = row.get('ts_local')
+        if pd.isna(ts) or not hasattr(ts, 'isoformat'):
+            continue
+        rows.append((
+            run_id,
+            ts.isoformat(sep=' ', timespec='seconds'),
+            row.get('power_sec'),
+            row.get('str_dist_m'),
+            row.get('ground'),
+            row.get('stiffness'),
+            row.get('cadence'),
+            row.get('vo')
+        ))
+    conn.executemany('''
+        INSERT INTO metrics (
+            run_id, datetime, power, stryd_distance,
+            ground_time, stiffness, cadence, vertical_oscillation
+        )
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    ''', rows)
+    conn.commit()
+
+
+class TestInsertMetricsParity(unittest.TestCase):
+    """ Vectorized insert_metrics must store byte-identical rows to the legacy loop """
+
+    def _stored(self, insert, df):
+        conn = connect_db(":memory:")
+        init_db(conn)
+        run_id = conn.execute("INSERT INTO runs (datetime, duration_sec) VALUES ('2026-01-01 00:00:00+00:00', 0)").lastrowid
+        insert(run_id, df, conn)
+        rows = conn.execute("""
+            SELECT run_id, quote(datetime), quote(power), quote(stryd_distance), quote(ground_time),
+                   quote(stiffness), quote(cadence), quote(vertical_oscillation)
+            FROM metrics ORDER BY id
+        """).fetchall()
+        conn.close()
+        return rows
+
+    def _assert_parity(self, df):
+        expected = self._stored(legacy_insert_metrics, df)
+        self.assertEqual(self._stored(insert_metrics, df), expected)
+        return expected
+
+    def _samples(self, ts):
+        n = len(ts)
+        rng = np.random.default_rng(42)
+        return pd.DataFrame({
+            "ts_local": ts,
+            "power_sec": rng.random(n) * 4,
+            "str_dist_m": np.cumsum(rng.random(n) * 3),
+            "ground": rng.integers(200, 300, n).astype(float),
+            "stiffness": rng.random(n) * 12,
+            "cadence": rng.integers(150, 190, n).astype(float),
+            "vo": rng.random(n) * 10,
+        })
+
+    def test_local_timezone_samples(self):
+        ts = pd.Series(pd.date_range("2026-02-07 08:30:39", periods=500, freq="s", tz="Europe/Athens"))
+        rows = self._assert_parity(self._samples(ts))
+        self.assertEqual(rows[0][1], "'2026-02-07 08:30:39+02:00'")
+
+    def test_dst_change_inside_run(self):
+        # Europe/Athens jumps from +02:00 to +03:00 at 01:00 UTC
+        utc = pd.date_range("2026-03-29 00:59:58", periods=5, freq="s", tz="UTC")
+        ts = pd.Series(utc.tz_convert("Europe/Athens"))
+        rows = self._assert_parity(self._samples(ts))
+        self.assertEqual(rows[-1][1], "'2026-03-29 04:00:02+03:00'")
+
+    def test_utc_naive_and_subsecond_timestamps(self):
+        for ts in (
+            pd.Series(pd.date_range("2026-01-01", periods=20, freq="1500ms", tz="UTC")),
+            pd.Series(pd.date_range("2026-01-01", periods=20, freq="1500ms")),
+            pd.Series(pd.date_range("2026-01-01", periods=20, freq="s", tz="America/St_Johns")),
+        ):
+            self._assert_parity(self._samples(ts))
+
+    def test_nan_values_and_missing_timestamps(self):
+        ts = pd.Series(pd.date_range("2026-01-01", periods=10, freq="s", tz="Europe/Athens"))
+        df = self._samples(ts)
+        df.loc[2, "ts_local"] = pd.NaT
+        df.loc[3, "power_sec"] = np.nan
+        df.loc[4, ["ground", "vo"]] = np.nan
+        rows = self._assert_parity(df)
+        self.assertEqual(len(rows), 9)
+        self.assertEqual(rows[2][2], "NULL")
+
+    def test_missing_columns_stored_as_null(self):
+        ts = pd.Series(pd.date_range("2026-01-01", periods=5, freq="s", tz="Europe/Athens"))
+        df = self._samples(ts).drop(columns=["stiffness", "vo"])
+        rows = self._assert_parity(df)
+        self.assertTrue(all(r[5] == "NULL" and r[7] == "NULL" for r in rows))
+
+
+class TestSchemaUpgrade(unittest.TestCase):
+    """ Existing databases get the lookup indexes, duplicate runs are cleaned up first """
+
+    LEGACY_TABLES = """
+        CREATE TABLE workout_types (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL UNIQUE);
+        CREATE TABLE workouts (id INTEGER PRIMARY KEY AUTOINCREMENT, workout_name TEXT NOT NULL, notes TEXT,
+            workout_type_id INTEGER, FOREIGN KEY (workout_type_id) REFERENCES workout_types(id));
+        CREATE TABLE runs (id INTEGER PRIMARY KEY AUTOINCREMENT, workout_id INTEGER, datetime TEXT NOT NULL,
+            avg_power REAL, duration_sec INTEGER NOT NULL, distance_m REAL, avg_hr INTEGER,
+            FOREIGN KEY (workout_id) REFERENCES workouts(id));
+        CREATE TABLE metrics (id INTEGER PRIMARY KEY AUTOINCREMENT, run_id INTEGER, datetime TEXT NOT NULL,
+            power REAL, stryd_distance REAL, ground_time REAL, stiffness REAL, cadence REAL,
+            vertical_oscillation REAL, FOREIGN KEY (run_id) REFERENCES runs(id));
+    """
+
+    def setUp(self):
+        self.conn = connect_db(":memory:")
+        self.conn.executescript(self.LEGACY_TABLES)
+        self.conn.executescript("""
+            INSERT INTO workout_types (name) VALUES ('Easy Run');
+            INSERT INTO workouts (workout_name, workout_type_id) VALUES ('EZ', 1), ('EZ again', 1), ('Long', 1);
+            INSERT INTO runs (workout_id, datetime, duration_sec) VALUES
+                (1, '2026-01-01 06:00:00+00:00', 60),
+                (2, '2026-01-01 06:00:00+00:00', 60),
+                (3, '2026-01-02 06:00:00+00:00', 60);
+            INSERT INTO metrics (run_id, datetime) VALUES (1, 'a'), (2, 'b'), (2, 'c'), (3, 'd');
+        """)
+        self.conn.commit()
+
+    def tearDown(self):
+        self.conn.close()
+
+    def _indexes(self):
+        return {row[0] for row in self.conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'index' AND name LIKE 'idx_%'")}
+
+    def test_upgrade_removes_duplicates_and_adds_indexes(self):
+        init_db(self.conn)
+
+        self.assertEqual(self.conn.execute("PRAGMA user_version").fetchone()[0], latest_schema_version())
+        self.assertEqual(self.conn.execute("SELECT id FROM runs ORDER BY id").fetchall(), [(1,), (3,)])
+        self.assertEqual(self.conn.execute("SELECT run_id FROM metrics ORDER BY id").fetchall(), [(1,), (3,)])
+        self.assertEqual(self.conn.execute("SELECT id FROM workouts ORDER BY id").fetchall(), [(1,), (3,)])
+        self.assertTrue({"idx_runs_datetime", "idx_metrics_run_datetime",
+                         "idx_workouts_workout_type_id"} <= self._indexes())
+
+    def test_upgrade_is_idempotent(self):
+        init_db(self.conn)
+        init_db(self.conn)
+        self.assertEqual(self.conn.execute("SELECT COUNT(*) FROM runs").fetchone()[0], 2)
+
+    def test_duplicate_insert_returns_existing_run(self):
+        init_db(self.conn)
+        run_id = insert_run(1, "2026-01-02 06:00:00+00:00", 2.5, 60, None, 1000.0, self.conn)
+        self.assertEqual(run_id, 3)
+        self.assertEqual(self.conn.execute("SELECT COUNT(*) FROM runs").fetchone()[0], 2)
+
+
+class TestConnectionProfiles(unittest.TestCase):
+    """ Writer runs in WAL, readers are read-only and see the last commit while a write is open """
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db_path = Path(self.tmp.name) / "runs_data.db"
+        self.writer = connect_db(self.db_path)
+        init_db(self.writer)
+        self.writer.execute("INSERT INTO runs (datetime, duration_sec) VALUES ('2026-01-01 06:00:00+00:00', 60)")
+        self.writer.commit()
+
+    def tearDown(self):
+        self.writer.close()
+        self.tmp.cleanup()
+
+    def test_writer_uses_wal(self):
+        self.assertEqual(self.writer.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+        self.assertEqual(self.writer.execute("PRAGMA synchronous").fetchone()[0], 1)    # NORMAL
+
+    def test_reader_cannot_write(self):
+        reader = connect_db(self.db_path, READER)
+        with self.assertRaises(sqlite3.OperationalError):
+            reader.execute("DELETE FROM runs")
+        reader.close()
+
+    def test_reader_not_blocked_by_open_write(self):
+        self.writer.execute("BEGIN IMMEDIATE")
+        self.writer.execute("INSERT INTO runs (datetime, duration_sec) VALUES ('2026-01-02 06:00:00+00:00', 60)")
+
+        reader = connect_db(self.db_path, READER)
+        self.assertEqual(reader.execute("SELECT COUNT(*) FROM runs").fetchone()[0], 1)
+        self.writer.commit()
+        self.assertEqual(reader.execute("SELECT COUNT(*) FROM runs").fetchone()[0], 2)
+        reader.close()
+
+    def test_reader_on_missing_file_raises(self):
+        with self.assertRaises(sqlite3.OperationalError):
+            connect_db(Path(self.tmp.name) / "missing.db", READER)
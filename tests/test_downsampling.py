@@ -0,0 +1,50 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from stryder_core.downsampling import downsample_series, lttb_indices, lttb_union_indices
+
+
+class TestLttb(unittest.TestCase):
+    """ LTTB keeps the ends and the spikes within the point budget """
+
+    def test_keeps_spikes(self):
+        rng = np.random.default_rng(0)
+        n = 36_000
+        y = rng.normal(250, 10, n)
+        y[12_345], y[23_456] = 900, 20
+        kept = lttb_indices(np.arange(n), y, 500)
+
+        self.assertEqual(len(kept), 500)
+        self.assertEqual((kept[0], kept[-1]), (0, n - 1))
+        self.assertTrue(np.all(np.diff(kept) > 0))
+        self.assertIn(12_345, kept)
+        self.assertIn(23_456, kept)
+
+    def test_short_series_untouched(self):
+        np.testing.assert_array_equal(lttb_indices([0, 1, 2], [5, 6, 7], 800), [0, 1, 2])
+
+    def test_downsample_series_drops_missing(self):
+        x = pd.Series(pd.date_range("2024-01-01", periods=6, freq="s", tz="UTC"))
+        y = pd.Series([1.0, np.nan, 3.0, 4.0, None, 6.0])
+        full_x, full_y = downsample_series(x, y, None)
+        self.assertEqual(full_y.tolist(), [1.0, 3.0, 4.0, 6.0])
+
+        down_x, down_y = downsample_series(x, y, 3)
+        self.assertEqual(len(down_y), 3)
+        self.assertEqual((down_x.iloc[0], down_x.iloc[-1]), (x.iloc[0], x.iloc[-1]))
+
+    def test_union_keeps_every_series_spikes(self):
+        n = 10_000
+        x = np.arange(n, dtype=float)
+        power = np.full(n, 250.0)
+        power[1_000] = 900
+        cadence = np.full(n, 170.0)
+        cadence[7_000] = 60
+        cadence[:50] = np.nan
+        kept = lttb_union_indices(x, [power, cadence], 100)
+
+        self.assertLessEqual(len(kept), 200)
+        self.assertTrue({1_000, 7_000, 0, 50, n - 1} <= set(kept.tolist()))
+        self.assertTrue(np.all(np.diff(kept) > 0))
@@ -1,8 +1,16 @@
+from pathlib import Path
+import tempfile
 import unittest
 import pandas as pd
 
 from stryder_core.config import COMMON_TIMEZONES
-from stryder_core.file_parsing import get_matched_garmin_row
+from stryder_core.db_schema import WRITER, connect_db, init_db
+from stryder_core.file_parsing import (NO_MATCH, GarminIndex, build_match_plan, get_matched_garmin_row,
+                                       load_stryd_csv, read_first_timestamp)
+from stryder_core.pipeline import insert_full_run, process_csv_pipeline
+from stryder_core.utils import loadcsv_2df
+
+DEMO_DIR = Path(__file__).resolve().parent.parent / "assets" / "demo_run_files"
 
 
 class TestGetMatchedGarminRow(unittest.TestCase):
@@ -39,4 +47,157 @@ class TestGetMatchedGarminRow(unittest.TestCase):
         self.assertEqual(str(matched_row['date']), "2026-01-01 00:00:30")
 
     def _create_df(self, col_name, values):
-        return pd.DataFrame({col_name: values})
\ No newline at end of file
+        return pd.DataFrame({col_name: values})
+
+
+class TestGarminIndex(unittest.TestCase):
+    """ The prepared index answers like the per-file scan did """
+
+    def setUp(self):
+        self.garmin_df = pd.DataFrame({
+            "Date": ["2026-01-01 10:00:30", "2026-01-01 09:59:30", "2026-10-25 03:30:00", "2026-03-29 03:30:00"],
+            "Title": ["after", "before", "ambiguous", "gap"],
+        })
+
+    def _match(self, garmin, ts_local, tz="Europe/Athens"):
+        return get_matched_garmin_row(pd.DataFrame({"ts_local": [ts_local]}), garmin, timezone_str=tz)
+
+    def test_equal_distance_returns_first_csv_row(self):
+        index = GarminIndex(self.garmin_df, "Europe/Athens")
+        self.assertEqual(self._match(index, "2026-01-01 10:00:00")["wt_name"], "after")
+
+    def test_dst_edges_match_scalar_conversion(self):
+        index = GarminIndex(self.garmin_df, "Europe/Athens")
+        # 03:30 happens twice on 25 Oct, to_utc takes the first (+03:00) one
+        self.assertEqual(self._match(index, "2026-10-25 00:30:00+00:00")["wt_name"], "ambiguous")
+        # 03:30 does not exist on 29 Mar, to_utc keeps the +02:00 offset
+        self.assertEqual(self._match(index, "2026-03-29 01:30:00+00:00")["wt_name"], "gap")
+
+    def test_unparseable_dates_never_match(self):
+        garmin_df = pd.DataFrame({"Date": ["not a date", "2026-01-01 10:00:00"], "Title": ["bad", "good"]})
+        index = GarminIndex(garmin_df, "UTC")
+        self.assertEqual(self._match(index, "2026-01-01 10:00:00", tz="UTC")["wt_name"], "good")
+
+    def test_timezone_change_rebuilds_once(self):
+        index = GarminIndex(self.garmin_df, "UTC")
+        self.assertIsNone(self._match(index, "2026-01-01 08:00:00+00:00", tz="UTC"))
+        self.assertEqual(self._match(index, "2026-01-01 08:00:00+00:00")["wt_name"], "after")
+        self.assertIs(index.with_timezone("Europe/Athens"), index.with_timezone("Europe/Athens"))
+
+
+class TestBuildMatchPlan(unittest.TestCase):
+    """ The up-front plan picks the same Garmin activity the per-file pipeline picks """
+
+    def test_plan_matches_pipeline(self):
+        tz = "Europe/Athens"
+        stryd_files = sorted((DEMO_DIR / "stryd").glob("*.csv"))
+        index = GarminIndex(loadcsv_2df(DEMO_DIR / "garmin" / "activities.csv"), tz)
+
+        plan = build_match_plan(stryd_files, index, tz)
+
+        self.assertEqual(len(plan), len(stryd_files))
+        for row in plan.itertuples():
+            stryd_df = process_csv_pipeline(loadcsv_2df(row.file), index, tz)[0]
+            expected = stryd_df["wt_name"].iloc[0]
+            self.assertIsNone(row.error)
+            self.assertEqual(row.wt_name if row.garmin_row != NO_MATCH else "Unknown", expected)
+
+    def test_unreadable_file_reported(self):
+        index = GarminIndex(pd.DataFrame({"Date": ["2026-01-01 10:00:00"], "Title": ["EZ"]}), "UTC")
+        plan = build_match_plan([DEMO_DIR / "missing.csv"], index, "UTC")
+        self.assertEqual(plan.loc[0, "garmin_row"], NO_MATCH)
+        self.assertIsNotNone(plan.loc[0, "error"])
+
+
+class TestReadFirstTimestamp(unittest.TestCase):
+    """ The header/first lines probe returns the earliest sample, unordered files fall back to a full scan """
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.demo_file = DEMO_DIR / "stryd" / "5121693342662656.csv"
+        self.samples = pd.read_csv(self.demo_file)
+        self.expected = pd.to_datetime(self.samples["Timestamp"], unit="s", utc=True).min()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _write(self, df):
+        path = Path(self.tmp.name) / "stryd.csv"
+        df.to_csv(path, index=False)
+        return path
+
+    def test_ordered_file(self):
+        self.assertEqual(read_first_timestamp(self.demo_file), self.expected)
+
+    def test_unordered_and_blank_values_fall_back(self):
+        self.assertEqual(read_first_timestamp(self._write(self.samples.iloc[::-1])), self.expected)
+
+        blanks = self.samples.copy()
+        blanks.loc[0, "Timestamp"] = None
+        self.assertEqual(read_first_timestamp(self._write(blanks)),
+                         pd.to_datetime(blanks["Timestamp"], unit="s", utc=True).min())
+
+    def test_missing_column_raises(self):
+        with self.assertRaises(ValueError):
+            read_first_timestamp(self._write(self.samples.drop(columns="Timestamp")))
+        with self.assertRaises(ValueError):
+            read_first_timestamp(self._write(self.samples.iloc[:0]))
+
+
+class TestLoadStrydCsv(unittest.TestCase):
+    """ The typed, pruned and chunked loads give the run the untyped full read gives """
+
+    def setUp(self):
+        self.files = sorted((DEMO_DIR / "stryd").glob("*.csv"))
+        self.garmin = GarminIndex(loadcsv_2df(DEMO_DIR / "garmin" / "activities.csv"), "Europe/Athens")
+
+    def _pipeline(self, raw):
+        return process_csv_pipeline(raw, self.garmin, "Europe/Athens")
+
+    def _stored_metrics(self, stryd_df):
+        conn = connect_db(":memory:", WRITER)
+        init_db(conn)
+        insert_full_run(stryd_df, "Easy Run", notes="", avg_power=None, avg_hr=None, total_m=None, conn=conn)
+        rows = conn.execute("SELECT * FROM metrics ORDER BY id").fetchall()
+        conn.close()
+        return rows
+
+    def test_only_used_columns_loaded(self):
+        df = load_stryd_csv(self.files[0])
+        self.assertNotIn("Stryd Distance (meters)", df.columns)
+        self.assertEqual(df["Power (w/kg)"].dtype, "float64")
+        self.assertEqual(df["Cadence (spm)"].dtype, "Int16")
+
+    def test_typed_and_chunked_match_full_read(self):
+        for file in self.files:
+            with self.subTest(file=file.name):
+                expected = self._pipeline(loadcsv_2df(file))
+                for raw in (load_stryd_csv(file), load_stryd_csv(file, chunksize=500)):
+                    result = self._pipeline(raw)
+                    self.assertEqual(result[1:], expected[1:])
+                    pd.testing.assert_series_equal(result[0]["str_dist_m"], expected[0]["str_dist_m"])
+                    self.assertEqual(self._stored_metrics(result[0]), self._stored_metrics(expected[0]))
+
+    def test_text_in_numeric_column_falls_back(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "stryd.csv"
+            samples = pd.read_csv(self.files[0])
+            samples["Cadence (spm)"] = samples["Cadence (spm)"].astype(object)
+            samples.loc[0, "Cadence (spm)"] = "n/a"
+            samples.to_csv(path, index=False)
+            self.assertEqual(len(load_stryd_csv(path)), len(samples))
+
+    def test_bad_values_in_later_chunks(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "stryd.csv"
+            samples = pd.read_csv(self.files[0])
+            samples["Ground Time (ms)"] = samples["Ground Time (ms)"].astype(object)
+            samples.loc[700, "Ground Time (ms)"] = 250.5      # fraction in the 2nd chunk
+            samples.loc[1200, "Ground Time (ms)"] = "n/a"      # text in the 3rd chunk
+            samples.to_csv(path, index=False)
+
+            chunks = list(load_stryd_csv(path, chunksize=500))
+        loaded = pd.concat(chunks, ignore_index=True)
+        self.assertEqual(len(loaded), len(samples))
+        self.assertEqual(loaded["Ground Time (ms)"].iloc[700], 250.5)
+        pd.testing.assert_series_equal(loaded["Timestamp"], samples["Timestamp"].astype("float64"))
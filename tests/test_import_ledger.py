@@ -0,0 +1,82 @@
+from pathlib import Path
+import os
+import shutil
+import tempfile
+import unittest
+
+from stryder_core import import_ledger
+from stryder_core.db_schema import connect_db, init_db, wipe_all_data
+from stryder_core.find_unparsed_runs import find_unparsed_files
+from stryder_core.import_runs import batch_process_stryd_folder
+
+DEMO_DIR = Path(__file__).resolve().parent.parent / "assets" / "demo_run_files"
+DEMO_FILES = ["5121693342662656.csv", "5611897476251648.csv"]
+
+
+class TestImportLedger(unittest.TestCase):
+    """ Rescans only stat the folder, changed files and unsettled statuses are looked at again """
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.stryd_dir = Path(self.tmp.name)
+        for name in DEMO_FILES:
+            shutil.copy(DEMO_DIR / "stryd" / name, self.stryd_dir / name)
+        self.garmin_csv = DEMO_DIR / "garmin" / "activities.csv"
+        self.conn = connect_db(":memory:")
+        init_db(self.conn)
+
+    def tearDown(self):
+        self.conn.close()
+        self.tmp.cleanup()
+
+    def _import(self):
+        return batch_process_stryd_folder(self.stryd_dir, self.garmin_csv, self.conn, "Europe/Athens")
+
+    def _ledger(self):
+        return {Path(row[0]).name: row[1:] for row in self.conn.execute(
+            "SELECT path, status, run_id FROM import_ledger")}
+
+    def test_second_import_only_stats_files(self):
+        self.assertEqual(self._import()["parsed"], 2)
+        ledger = self._ledger()
+        self.assertEqual({status for status, _ in ledger.values()}, {import_ledger.IMPORTED})
+        run_ids = {run_id for _, run_id in ledger.values()}
+        self.assertEqual(run_ids, {row[0] for row in self.conn.execute("SELECT id FROM runs")})
+
+        summary = self._import()
+        self.assertEqual((summary["parsed"], summary["skipped"], summary["unchanged"]), (0, 2, 2))
+
+    def test_touched_file_with_same_content_stays_settled(self):
+        self._import()
+        path = self.stryd_dir / DEMO_FILES[0]
+        os.utime(path, ns=(0, 1_000_000_000))
+
+        self.assertEqual(self._import()["unchanged"], 2)
+        mtime_ns, = self.conn.execute("SELECT mtime_ns FROM import_ledger WHERE path = ?",
+                                      (import_ledger.ledger_key(path),)).fetchone()
+        self.assertEqual(mtime_ns, 1_000_000_000)
+
+    def test_changed_file_is_parsed_again(self):
+        self._import()
+        with open(self.stryd_dir / DEMO_FILES[0], "a") as f:
+            f.write("\n")
+
+        summary = self._import()
+        self.assertEqual(summary["unchanged"], 1)
+        self.assertEqual(self._ledger()[DEMO_FILES[0]][0], import_ledger.IMPORTED)     # already_exists
+
+    def test_zero_data_file_skipped_forever(self):
+        zero = self.stryd_dir / "zero.csv"
+        zero.write_text("Timestamp,Stryd Speed (m/s),Power (w/kg)\n1770749502,0,0\n1770749503,0,0\n")
+        self._import()
+        self.assertEqual(self._ledger()["zero.csv"][0], import_ledger.ZERO_DATA)
+
+        self.assertEqual(self._import()["unchanged"], 3)
+        result = find_unparsed_files(self.stryd_dir, self.conn)
+        self.assertEqual((result["unparsed_files"], result["zero_data_files"]), ([], 1))
+
+    def test_wipe_clears_ledger(self):
+        self._import()
+        wipe_all_data(self.conn)
+        self.assertEqual(self._ledger(), {})
+        self.assertEqual(self._import()["parsed"], 2)
@@ -0,0 +1,88 @@
+from pathlib import Path
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import pandas as pd
+
+from stryder_core.db_schema import connect_db, init_db
+from stryder_core.import_runs import batch_process_stryd_folder, parse_run_from_dfs
+
+DEMO_DIR = Path(__file__).resolve().parent.parent / "assets" / "demo_run_files"
+DEMO_FILES = ["5121693342662656.csv", "5611897476251648.csv", "6304541764386816.csv"]
+
+
+class TestBatchProcessStrydFolder(unittest.TestCase):
+    """ Parallel batch import must store exactly what the sequential import stores """
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.stryd_dir = Path(self.tmp.name)
+        for name in DEMO_FILES:
+            shutil.copy(DEMO_DIR / "stryd" / name, self.stryd_dir / name)
+        self.garmin_csv = DEMO_DIR / "garmin" / "activities.csv"
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _import(self, **kwargs):
+        conn = connect_db(":memory:")
+        init_db(conn)
+        messages = []
+        summary = batch_process_stryd_folder(self.stryd_dir, self.garmin_csv, conn, "Europe/Athens",
+                                             on_progress=messages.append, **kwargs)
+        runs = conn.execute("SELECT * FROM runs ORDER BY id").fetchall()
+        metrics = conn.execute("SELECT * FROM metrics ORDER BY id").fetchall()
+        conn.close()
+        return summary, messages, runs, metrics
+
+    def test_parallel_matches_sequential(self):
+        seq_summary, seq_messages, seq_runs, seq_metrics = self._import()
+        par_summary, par_messages, par_runs, par_metrics = self._import(workers=2)
+
+        self.assertEqual(seq_summary, par_summary)
+        self.assertEqual(seq_summary["parsed"], len(DEMO_FILES))
+        self.assertEqual(seq_messages, par_messages)
+        self.assertEqual(seq_runs, par_runs)
+        self.assertEqual(seq_metrics, par_metrics)
+
+    def test_parallel_cancel_stops_early(self):
+        processed = []
+
+        def on_progress(msg):
+            if msg.startswith("-- Processing"):
+                processed.append(msg)
+
+        conn = connect_db(":memory:")
+        init_db(conn)
+        summary = batch_process_stryd_folder(self.stryd_dir, self.garmin_csv, conn, "Europe/Athens",
+                                             on_progress=on_progress,
+                                             should_cancel=lambda: len(processed) >= 1,
+                                             workers=2)
+        conn.close()
+
+        self.assertTrue(summary["canceled"])
+        self.assertEqual(len(processed), 1)
+        self.assertEqual(summary["parsed"] + summary["skipped"], 1)
+
+    def test_declined_plan_parses_nothing(self):
+        plans = []
+        summary, messages, runs, _ = self._import(confirm_plan=lambda plan: plans.append(plan) and False)
+        self.assertEqual(len(plans[0]), len(DEMO_FILES))
+        self.assertTrue(summary["canceled"])
+        self.assertEqual((summary["parsed"], runs), (0, []))
+        self.assertFalse(any(msg.startswith("-- Processing") for msg in messages))
+
+        summary, _, runs, _ = self._import(confirm_plan=lambda plan: True)
+        self.assertEqual((summary["parsed"], len(runs)), (len(DEMO_FILES), len(DEMO_FILES)))
+
+    def test_empty_pipeline_output_is_a_file_error(self):
+        empty = (pd.DataFrame(columns=["ts_local", "wt_name"]), None, None, None, None, None)
+        with mock.patch("stryder_core.import_runs.process_csv_pipeline", return_value=empty):
+            result = parse_run_from_dfs(pd.DataFrame(), None, "empty.csv", "Europe/Athens")
+            self.assertEqual(result["status"], "error")
+
+            summary, _, runs, _ = self._import()       # sequential batch keeps going and commits
+        self.assertEqual((summary["parsed"], summary["skipped"]), (0, len(DEMO_FILES)))
+        self.assertEqual(runs, [])
@@ -0,0 +1,79 @@
+from pathlib import Path
+import sqlite3
+import tempfile
+import unittest
+
+from stryder_core.db_schema import connect_db, init_db
+from stryder_core.migrations import SchemaVersionError, get_schema_version, latest_schema_version, upgrade_schema
+
+
+def _create_notes(conn):
+    conn.execute("CREATE TABLE notes (id INTEGER PRIMARY KEY, body TEXT)")
+
+def _seed_notes(conn):
+    conn.execute("INSERT INTO notes (body) VALUES ('first')")
+
+def _broken_step(conn):
+    conn.execute("INSERT INTO notes (body) VALUES ('half applied')")
+    raise RuntimeError("boom")
+
+
+class TestUpgradeSchema(unittest.TestCase):
+    """ Migration steps run in order, once, and a failing step rolls back """
+
+    def setUp(self):
+        self.conn = sqlite3.connect(":memory:")
+
+    def tearDown(self):
+        self.conn.close()
+
+    def test_steps_applied_in_order_once(self):
+        steps = [(1, _create_notes), (2, _seed_notes)]
+        self.assertEqual(upgrade_schema(self.conn, steps), 2)
+        self.assertEqual(upgrade_schema(self.conn, steps), 2)
+        self.assertEqual(self.conn.execute("SELECT body FROM notes").fetchall(), [("first",)])
+        self.assertEqual(get_schema_version(self.conn), 2)
+
+    def test_failing_step_keeps_previous_version(self):
+        with self.assertRaises(RuntimeError):
+            upgrade_schema(self.conn, [(1, _create_notes), (2, _broken_step)])
+
+        self.assertEqual(get_schema_version(self.conn), 1)
+        self.assertEqual(self.conn.execute("SELECT COUNT(*) FROM notes").fetchone()[0], 0)
+
+    def test_newer_database_is_refused(self):
+        self.conn.execute("PRAGMA user_version = 99")
+        with self.assertRaises(SchemaVersionError):
+            upgrade_schema(self.conn, [(1, _create_notes)])
+
+
+class TestConnectDbUpgrade(unittest.TestCase):
+    """ Opening an existing DB brings it to the current schema, a fresh file is left to init_db """
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db_path = Path(self.tmp.name) / "runs_data.db"
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_existing_db_upgraded_on_connect(self):
+        conn = connect_db(self.db_path)
+        init_db(conn)
+        conn.execute("DROP INDEX idx_runs_datetime")
+        conn.execute("PRAGMA user_version = 0")
+        conn.commit()
+        conn.close()
+
+        conn = connect_db(self.db_path)
+        self.assertEqual(get_schema_version(conn), latest_schema_version())
+        self.assertIsNotNone(conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'idx_runs_datetime'").fetchone())
+        conn.close()
+
+    def test_fresh_db_untouched_until_init(self):
+        conn = connect_db(self.db_path)
+        self.assertEqual(get_schema_version(conn), 0)
+        init_db(conn)
+        self.assertEqual(get_schema_version(conn), latest_schema_version())
+        conn.close()
@@ -0,0 +1,136 @@
+from pathlib import Path
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+from stryder_core import packed_metrics
+from stryder_core.db_schema import connect_db, init_db, wipe_all_data
+from stryder_core.import_runs import batch_process_stryd_folder
+from stryder_core.metrics import build_metrics
+from stryder_core.pipeline import insert_full_run
+from stryder_core.reports import get_single_run_query
+
+DEMO_DIR = Path(__file__).resolve().parent.parent / "assets" / "demo_run_files"
+PACKED_ENV = {packed_metrics.STORAGE_ENV: packed_metrics.PACKED}
+
+
+class TestPackArray(unittest.TestCase):
+
+    def test_round_trip_picks_narrowest_exact_dtype(self):
+        cases = {
+            "<i2": [180.0, 182.0],
+            "<i4": [0.0, 40_000.0],
+            "<f4": [9.87, 0.7, np.nan],
+            "<f8": [1.2567567567567568, 3.0],
+        }
+        for dtype, values in cases.items():
+            with self.subTest(dtype=dtype):
+                blob = packed_metrics.pack_array(values)
+                self.assertEqual(blob[:3].decode(), dtype)
+                np.testing.assert_array_equal(packed_metrics.unpack_array(blob), np.array(values))
+
+    def test_null_integers_not_packed_as_int(self):
+        blob = packed_metrics.pack_array([180.0, np.nan], compress=False)
+        self.assertEqual(blob[:3].decode(), "<f4")
+
+    def test_table_has_a_column_per_channel(self):
+        conn = connect_db(":memory:")
+        init_db(conn)       # the v3 migration spells the columns out
+        columns = [row[1] for row in conn.execute("PRAGMA table_info(metrics_packed)")]
+        conn.close()
+        self.assertEqual(tuple(columns[-len(packed_metrics.CHANNELS):]), packed_metrics.CHANNELS)
+
+    def test_unknown_storage_rejected(self):
+        with mock.patch.dict(os.environ, {packed_metrics.STORAGE_ENV: "parquet"}):
+            with self.assertRaises(ValueError):
+                packed_metrics.metrics_storage()
+
+
+class TestPackedStorage(unittest.TestCase):
+    """ Packed runs load into the same frame get_single_run_query builds from metrics rows """
+
+    def setUp(self):
+        self.metrics = build_metrics("local")
+        self.rows_conn = connect_db(":memory:")
+        init_db(self.rows_conn)
+        self.packed_conn = connect_db(":memory:")
+        init_db(self.packed_conn)
+
+    def tearDown(self):
+        self.rows_conn.close()
+        self.packed_conn.close()
+
+    def _import_demo(self, conn):
+        batch_process_stryd_folder(DEMO_DIR / "stryd", DEMO_DIR / "garmin" / "activities.csv", conn,
+                                   "Europe/Athens")
+
+    def _assert_same_runs(self):
+        run_ids = [r[0] for r in self.rows_conn.execute("SELECT id FROM runs ORDER BY id")]
+        self.assertTrue(run_ids)
+        for run_id in run_ids:
+            expected = get_single_run_query(self.rows_conn, run_id, self.metrics)
+            got = get_single_run_query(self.packed_conn, run_id, self.metrics)
+            pd.testing.assert_frame_equal(got.drop(columns="id"), expected.drop(columns="id"))
+
+    def test_demo_runs_load_identically(self):
+        self._import_demo(self.rows_conn)
+        with mock.patch.dict(os.environ, PACKED_ENV):
+            self._import_demo(self.packed_conn)
+
+        self.assertEqual(self.packed_conn.execute("SELECT COUNT(*) FROM metrics").fetchone()[0], 0)
+        self._assert_same_runs()
+
+    def test_dst_change_mid_run(self):
+        # Europe/Athens goes 03:00 → 04:00 at 01:00 UTC on 29 Mar 2026
+        ts = pd.date_range("2026-03-29 00:55:00", periods=600, freq="s", tz="UTC").tz_convert("Europe/Athens")
+        df = pd.DataFrame({"ts_local": ts, "power_sec": np.linspace(2.0, 3.0, 600),
+                           "str_dist_m": np.arange(600) * 2.5, "cadence": 170.0})
+        for conn, env in ((self.rows_conn, {}), (self.packed_conn, PACKED_ENV)):
+            with mock.patch.dict(os.environ, env):
+                insert_full_run(df, "Easy Run", notes="", avg_power=None, avg_hr=None, total_m=None, conn=conn)
+        self._assert_same_runs()
+
+    def test_convert_both_ways(self):
+        self._import_demo(self.rows_conn)
+        expected = self.rows_conn.execute(
+            "SELECT run_id, datetime, power, stiffness, cadence FROM metrics ORDER BY id").fetchall()
+
+        packed_metrics.convert_metrics_storage(self.rows_conn, packed_metrics.PACKED)
+        self.assertEqual(self.rows_conn.execute("SELECT COUNT(*) FROM metrics").fetchone()[0], 0)
+        packed_metrics.convert_metrics_storage(self.rows_conn, packed_metrics.ROWS)
+
+        got = self.rows_conn.execute(
+            "SELECT run_id, datetime, power, stiffness, cadence FROM metrics ORDER BY id").fetchall()
+        self.assertEqual(got, expected)
+        self.assertEqual(self.rows_conn.execute("SELECT COUNT(*) FROM metrics_packed").fetchone()[0], 0)
+
+    def test_convert_command(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            db_path = Path(tmp) / "runs_data.db"
+            conn = connect_db(db_path)
+            init_db(conn)
+            self._import_demo(conn)
+            conn.close()
+
+            argv = ["packed_metrics", "--db", str(db_path)]
+            with mock.patch.dict(os.environ, PACKED_ENV), mock.patch.object(sys, "argv", argv), \
+                    mock.patch("builtins.print"):
+                packed_metrics.main()
+
+            conn = connect_db(db_path)
+            counts = conn.execute("SELECT (SELECT COUNT(*) FROM metrics), (SELECT COUNT(*) FROM metrics_packed), "
+                                  "(SELECT COUNT(*) FROM runs)").fetchone()
+            conn.close()
+        self.assertEqual(counts[0], 0)
+        self.assertEqual(counts[1], counts[2])
+
+    def test_wipe_clears_packed_runs(self):
+        with mock.patch.dict(os.environ, PACKED_ENV):
+            self._import_demo(self.packed_conn)
+        wipe_all_data(self.packed_conn)
+        self.assertEqual(self.packed_conn.execute("SELECT COUNT(*) FROM metrics_packed").fetchone()[0], 0)
@@ -0,0 +1,95 @@
+import unittest
+from unittest import mock
+import pandas as pd
+
+from stryder_core.db_schema import connect_db, init_db
+from stryder_core.pipeline import BulkRunWriter, insert_full_run
+
+
+def _stryd_df(start: str, seconds: int = 3):
+    ts = pd.date_range(start, periods=seconds, freq="s", tz="Europe/Athens")
+    return pd.DataFrame({
+        "ts_local": ts,
+        "power_sec": [2.5] * seconds,
+        "str_dist_m": [float(i) for i in range(seconds)],
+        "ground": [250.0] * seconds,
+        "stiffness": [10.0] * seconds,
+        "cadence": [180.0] * seconds,
+        "vo": [8.0] * seconds,
+    })
+
+
+class TestBulkRunWriter(unittest.TestCase):
+    """ Runs are grouped in one transaction and a bad run is rolled back alone """
+
+    def setUp(self):
+        self.conn = connect_db(":memory:")
+        init_db(self.conn)
+
+    def tearDown(self):
+        self.conn.close()
+
+    def _count(self, table):
+        return self.conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+    def test_bad_run_rolled_back_alone(self):
+        with BulkRunWriter(self.conn, commit_every=10) as writer:
+            writer.add_run(_stryd_df("2026-01-01 08:00:00"), "EZ", "", 2.5, 140, 2.0)
+            with self.assertRaises(TypeError):
+                # text timestamps → duration fails after the workout row was written
+                bad_df = pd.DataFrame({"ts_local": ["2026-01-03 08:00:00", "2026-01-03 08:00:05"]})
+                writer.add_run(bad_df, "EZ", "", 1.0, None, 0.0)
+            writer.add_run(_stryd_df("2026-01-02 08:00:00"), "Long run", "", 2.5, 140, 2.0)
+
+        self.assertFalse(self.conn.in_transaction)
+        self.assertEqual(self._count("runs"), 2)
+        self.assertEqual(self._count("workouts"), 2)
+        self.assertEqual(self._count("metrics"), 6)
+
+    def test_commits_every_interval(self):
+        writer = BulkRunWriter(self.conn, commit_every=2)
+        writer.add_run(_stryd_df("2026-01-01 08:00:00"), "EZ", "", 2.5, 140, 2.0)
+        self.assertTrue(self.conn.in_transaction)
+        writer.add_run(_stryd_df("2026-01-02 08:00:00"), "EZ", "", 2.5, 140, 2.0)
+        self.assertFalse(self.conn.in_transaction)
+        self.assertEqual(writer.pending, 0)
+
+    def test_existing_run_not_inserted_again(self):
+        with BulkRunWriter(self.conn) as writer:
+            first = writer.add_run(_stryd_df("2026-01-01 08:00:00"), "EZ", "", 2.5, 140, 2.0)
+            again = writer.add_run(_stryd_df("2026-01-01 08:00:00"), "EZ", "", 2.5, 140, 2.0)
+
+        self.assertIsNotNone(first[1])
+        self.assertEqual(again, (None, None))
+        self.assertEqual(self._count("workouts"), 1)
+        self.assertEqual(self._count("metrics"), 3)
+
+
+class TestInsertFullRun(unittest.TestCase):
+    """ A single committed insert stores the run with its summary and rollups, or nothing """
+
+    def setUp(self):
+        self.conn = connect_db(":memory:")
+        init_db(self.conn)
+        self.conn.execute("INSERT INTO rollup_zones (tz, runs, last_run_id) VALUES ('UTC', 0, 0)")
+        self.conn.commit()
+
+    def tearDown(self):
+        self.conn.close()
+
+    def _count(self, table):
+        return self.conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+    def test_failing_summary_rolls_the_run_back(self):
+        stryd_df = _stryd_df("2026-01-01 08:00:00")
+        with mock.patch("stryder_core.pipeline.store_run_summary", side_effect=ValueError("boom")):
+            with self.assertRaises(ValueError):
+                insert_full_run(stryd_df, "EZ", "", 2.5, 140, 2.0, self.conn)
+
+        self.assertFalse(self.conn.in_transaction)
+        for table in ("runs", "workouts", "metrics", "daily_rollups"):
+            self.assertEqual(self._count(table), 0, table)
+
+        _, run_id = insert_full_run(stryd_df, "EZ", "", 2.5, 140, 2.0, self.conn)
+        self.assertFalse(self.conn.in_transaction)
+        self.assertEqual((self._count("runs"), self._count("run_summaries"), self._count("daily_rollups")), (1, 1, 1))
@@ -0,0 +1,43 @@
+import os
+import tempfile
+import unittest
+
+from stryder_web.dashboard.plot_cache import PlotCache, plot_cache_key
+
+
+class TestPlotCache(unittest.TestCase):
+    """ In-process LRU with an optional directory shared between workers """
+
+    def test_memory_lru(self):
+        cache = PlotCache(memory_entries=2)
+        cache.put("a", b"A")
+        cache.put("b", b"B")
+        self.assertEqual(cache.get("a")[0], b"A")     # a is now the most recently used
+        cache.put("c", b"C")
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a")[0], b"A")
+        self.assertIsNone(cache.rendered_at("b"))
+
+    def test_shared_directory(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            first = PlotCache(tmp, disk_entries=2)
+            rendered_at = first.put("a", b"A")
+            second = PlotCache(tmp)
+            png, second_rendered_at = second.get("a")
+            self.assertEqual(png, b"A")
+            self.assertAlmostEqual(second_rendered_at, rendered_at, places=3)
+
+            os.utime(os.path.join(tmp, "a.png"), (1, 1))      # least recently used on disk
+            first.put("b", b"B")
+            first.put("c", b"C")
+            self.assertEqual(sorted(os.listdir(tmp)), ["b.png", "c.png"])
+
+    def test_key_changes_with_run(self):
+        run = ("runs.db", 3, "2026-02-07 06:30:39+00:00")
+        key = plot_cache_key(*run, "elapsed_sec", "power_sec", 5, (7, 40))
+        self.assertEqual(key, plot_cache_key(*run, "elapsed_sec", "power_sec", 5, (7, 40)))
+        self.assertNotEqual(key, plot_cache_key("runs.db", 3, "2026-03-01 07:00:00+00:00", "elapsed_sec",
+                                                "power_sec", 5, (7, 40)))
+        self.assertNotEqual(key, plot_cache_key(*run, "elapsed_sec", "cadence", 5, (7, 40)))
+        # a wipe and re-import reuses the id and start time, the data version moved on
+        self.assertNotEqual(key, plot_cache_key(*run, "elapsed_sec", "power_sec", 5, (7, 95)))
@@ -0,0 +1,81 @@
+from datetime import datetime, timedelta, timezone
+import unittest
+
+from stryder_core.db_schema import connect_db, get_or_create_workout_type, init_db, insert_run, insert_workout
+from stryder_core.queries import (count_rows_before, date_cursor, fetch_keyset_page, fetch_page, for_report_query,
+                                  views_query)
+from stryder_core.utils import configure_connection
+
+
+class TestKeysetPages(unittest.TestCase):
+    """ Keyset pages walk the (datetime, id) order both ways and can start at a date """
+
+    @classmethod
+    def setUpClass(cls):
+        cls.conn = connect_db(":memory:")
+        configure_connection(cls.conn)
+        init_db(cls.conn)
+        type_id = get_or_create_workout_type("Easy Run", cls.conn)
+        for i in range(40):
+            workout_id = insert_workout(f"Easy Run {i}", "", type_id, cls.conn, commit=False)
+            insert_run(workout_id, datetime(2024, 1, 1, 7, tzinfo=timezone.utc) + timedelta(hours=11 * i), 200.0, 3000,
+                       140, 8000.0, cls.conn, commit=False)
+        cls.conn.commit()
+        cls.all_ids = [row["run_id"] for row in fetch_page(cls.conn, views_query(), page_size=0)[0]]
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.conn.close()
+
+    def _ids(self, rows):
+        return [row["run_id"] for row in rows]
+
+    def test_forward_and_backward_walks(self):
+        pages, after = [], None
+        while True:
+            rows, _, prev_cursor, next_cursor = fetch_keyset_page(self.conn, views_query(), after=after, page_size=15)
+            self.assertEqual(prev_cursor is None, after is None)
+            pages.append(self._ids(rows))
+            if next_cursor is None:
+                break
+            after = next_cursor
+        self.assertEqual([len(p) for p in pages], [15, 15, 10])
+        self.assertEqual(sum(pages, []), self.all_ids)
+
+        rows, _, prev_cursor, next_cursor = fetch_keyset_page(self.conn, views_query(), before=prev_cursor,
+                                                              page_size=15)
+        self.assertEqual(self._ids(rows), pages[1])
+        self.assertIsNotNone(next_cursor)
+
+    def test_short_page_at_start_becomes_first_page(self):
+        rows, _, prev_cursor, _ = fetch_keyset_page(self.conn, views_query(), before=date_cursor("2024-01-03"),
+                                                    page_size=15)
+        self.assertIsNone(prev_cursor)
+        self.assertEqual(self._ids(rows), self.all_ids[:15])
+
+    def test_jump_to_date(self):
+        cursor = date_cursor(datetime(2024, 1, 6, tzinfo=timezone.utc))
+        rows, _, prev_cursor, _ = fetch_keyset_page(self.conn, views_query(), after=cursor, page_size=5)
+        self.assertEqual(rows[0]["datetime"], "2024-01-06 08:00:00+00:00")
+        self.assertEqual(self._ids(rows), self.all_ids[11:16])
+        self.assertIsNotNone(prev_cursor)
+        self.assertEqual(count_rows_before(self.conn, views_query(), (), cursor), 11)
+
+    def test_filtered_query(self):
+        base = for_report_query() + " WHERE w.workout_name LIKE ?"
+        rows, _, _, next_cursor = fetch_keyset_page(self.conn, base, ("%Run 3%",), page_size=5)
+        self.assertEqual(len(rows), 5)
+        rows, _, _, next_cursor = fetch_keyset_page(self.conn, base, ("%Run 3%",), after=next_cursor, page_size=5)
+        self.assertEqual((len(rows), next_cursor), (5, (rows[-1]["datetime"], rows[-1]["run_id"])))
+
+    def test_pages_use_the_datetime_index(self):
+        for order in ("r.datetime, r.id", "r.datetime DESC, r.id DESC"):
+            plan = " ".join(row[3] for row in self.conn.execute(
+                f"EXPLAIN QUERY PLAN {views_query()} WHERE (r.datetime, r.id) > (?, ?) ORDER BY {order} LIMIT 16",
+                ("2024-01-06", 0)))
+            self.assertIn("idx_runs_datetime", plan)
+            self.assertNotIn("TEMP B-TREE", plan)
+
+
+if __name__ == "__main__":
+    unittest.main()
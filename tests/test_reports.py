@@ -0,0 +1,77 @@
+from datetime import datetime
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from stryder_core.db_schema import connect_db, init_db, insert_run, insert_workout
+from stryder_core.reports import PANDAS_ENGINE, ROLLUP_ENGINE, SQL_ENGINE, custom_dates_report, weekly_report
+
+
+class TestWeeklyReportEngines(unittest.TestCase):
+    """ The SQL and rollup engines give the weekly_raw frame of the pandas engine
+        (SQLite sums and the per-day rollup totals are not compensated, so their floats match to rounding) """
+
+    @classmethod
+    def setUpClass(cls):
+        cls.conn = connect_db(":memory:")
+        init_db(cls.conn)
+        rng = np.random.default_rng(7)
+        workout_id = insert_workout("Easy Run", "", None, cls.conn)
+        # ~3 years of runs at any hour, so some fall right around local midnight and DST changes
+        starts = pd.Timestamp("2023-01-01", tz="UTC") + pd.to_timedelta(
+            np.sort(rng.choice(3 * 365 * 24 * 60, size=900, replace=False)), unit="min")
+        for i, start in enumerate(starts):
+            insert_run(workout_id, start.to_pydatetime(),
+                       None if i % 11 == 0 else float(rng.uniform(180, 320)),
+                       int(rng.integers(900, 9000)),
+                       None if i % 5 == 0 else int(rng.integers(120, 175)),
+                       None if i % 17 == 0 else float(rng.uniform(2000, 30000)),
+                       cls.conn, commit=False)
+        cls.conn.commit()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.conn.close()
+
+    def _assert_same(self, tz, **window):
+        label_pd, expected = weekly_report(self.conn, tz, engine=PANDAS_ENGINE, **window)
+        label_sql, got = weekly_report(self.conn, tz, engine=SQL_ENGINE, **window)
+        self.assertEqual(label_sql, label_pd)
+        pd.testing.assert_frame_equal(got, expected, check_exact=False, rtol=1e-12)
+        _, from_rollups = weekly_report(self.conn, tz, engine=ROLLUP_ENGINE, **window)
+        pd.testing.assert_frame_equal(from_rollups, expected, check_exact=False, rtol=1e-12)
+        return got
+
+    def test_multi_year_windows(self):
+        for tz in ("Europe/Athens", "America/New_York", "Australia/Sydney", "UTC"):
+            with self.subTest(tz=tz):
+                got = self._assert_same(tz, mode="rolling", start_date=datetime(2023, 1, 1),
+                                        end_date=datetime(2025, 12, 31))
+                self.assertGreater(len(got), 150)
+
+    def test_calendar_weeks(self):
+        self._assert_same("Europe/Athens", mode="calendar", weeks=12, end_date=datetime(2024, 4, 10))
+
+    def test_empty_window(self):
+        _, got = weekly_report(self.conn, "UTC", mode="rolling", start_date=datetime(2030, 1, 1),
+                               end_date=datetime(2030, 2, 1))
+        self.assertTrue(got.empty)
+        self.assertEqual(list(got.columns), ["week_start", "week_end", "runs", "distance_km", "duration_sec",
+                                             "avg_power", "avg_hr"])
+
+    def test_unknown_engine(self):
+        with self.assertRaises(ValueError):
+            weekly_report(self.conn, "UTC", mode="rolling", weeks=1, engine="duckdb")
+
+    def test_custom_dates_from_rollups(self):
+        for tz in ("Europe/Athens", "America/New_York"):
+            for start, end in ((datetime(2023, 1, 1), datetime(2025, 12, 31)),      # whole weeks + edge days
+                               (datetime(2024, 3, 27), datetime(2024, 4, 2)),       # within two weeks
+                               (datetime(2024, 3, 31), datetime(2024, 3, 31))):     # one (DST) day
+                with self.subTest(tz=tz, start=start, end=end):
+                    label_pd, expected = custom_dates_report(self.conn, tz, "rolling", start_date=start,
+                                                             end_date=end, engine=PANDAS_ENGINE)
+                    label, got = custom_dates_report(self.conn, tz, "rolling", start_date=start, end_date=end)
+                    self.assertEqual(label, label_pd)
+                    pd.testing.assert_frame_equal(got, expected, check_exact=False, rtol=1e-12)
@@ -0,0 +1,116 @@
+from datetime import datetime, timedelta, timezone
+import unittest
+
+from stryder_core.db_schema import (connect_db, get_or_create_workout_type, init_db, insert_run, insert_workout,
+                                    wipe_all_data)
+from stryder_core.migrations import latest_schema_version, upgrade_schema
+from stryder_core.queries import count_rows_for_query, views_query
+from stryder_core.row_counts import cached_count, clear_count_cache, data_version, listed_runs, refresh_listed_runs
+
+
+def _add_runs(conn, count, start=0):
+    type_id = get_or_create_workout_type("Easy Run", conn)
+    for i in range(start, start + count):
+        workout_id = insert_workout(f"Easy Run {i}", "", type_id, conn, commit=False)
+        insert_run(workout_id, datetime(2024, 1, 1, 7, tzinfo=timezone.utc) + timedelta(hours=11 * i), 200.0, 3000,
+                   140, 8000.0, conn, commit=False)
+    conn.commit()
+
+
+def _exact(conn):
+    return conn.execute(f"SELECT COUNT(*) FROM ({views_query()})").fetchone()[0]
+
+
+class TestRowCounts(unittest.TestCase):
+    """ Counts kept by the triggers and the count cache follow inserts, updates and wipes """
+
+    def setUp(self):
+        clear_count_cache()
+        self.conn = connect_db(":memory:")
+        init_db(self.conn)
+        _add_runs(self.conn, 30)
+        self.counted = []
+        self.conn.set_trace_callback(lambda sql: self.counted.append(sql) if "COUNT(*) FROM (" in sql else None)
+
+    def tearDown(self):
+        self.conn.close()
+
+    def test_listed_runs_follow_inserts_and_wipe(self):
+        self.assertEqual(listed_runs(self.conn), 30)
+        _add_runs(self.conn, 5, start=30)
+        self.assertEqual(listed_runs(self.conn), 35)
+        self.conn.execute("DELETE FROM runs WHERE id = (SELECT MIN(id) FROM runs)")
+        self.assertEqual(listed_runs(self.conn), _exact(self.conn))
+
+        self.counted.clear()
+        self.assertEqual(count_rows_for_query(self.conn, views_query()), 34)
+        self.assertEqual(self.counted, [])      # answered by the counter
+
+        wipe_all_data(self.conn)
+        self.assertEqual(listed_runs(self.conn), 0)
+
+    def test_type_change_falls_back_to_counting(self):
+        self.conn.execute("UPDATE workouts SET workout_type_id = NULL WHERE id IN (SELECT id FROM workouts LIMIT 3)")
+        self.assertIsNone(listed_runs(self.conn))
+        self.assertEqual(count_rows_for_query(self.conn, views_query()), 27)
+
+        refresh_listed_runs(self.conn)      # writer startup recounts it
+        self.assertEqual(listed_runs(self.conn), 27)
+
+    def test_wipe_resets_unknown_count(self):
+        self.conn.execute("UPDATE workouts SET workout_type_id = NULL WHERE id IN (SELECT id FROM workouts LIMIT 3)")
+        wipe_all_data(self.conn)
+        self.assertEqual(listed_runs(self.conn), 0)
+        _add_runs(self.conn, 2)
+        self.assertEqual(listed_runs(self.conn), 2)
+
+    def test_filtered_counts_cached_until_data_changes(self):
+        query = views_query() + " WHERE w.workout_name LIKE ?"
+        params = ("%Run 1%",)
+        self.assertEqual(count_rows_for_query(self.conn, query, params), 11)   # 1, 10..19
+        self.assertEqual(count_rows_for_query(self.conn, query, params), 11)
+        self.assertEqual(len(self.counted), 1)
+
+        version = data_version(self.conn)
+        _add_runs(self.conn, 1, start=100)
+        self.assertNotEqual(data_version(self.conn), version)
+        self.assertEqual(count_rows_for_query(self.conn, query, params), 12)
+        self.assertEqual(len(self.counted), 2)
+
+        self.conn.execute("UPDATE workouts SET workout_name = 'Long Run' WHERE workout_name = 'Easy Run 100'")
+        self.assertEqual(count_rows_for_query(self.conn, query, params), 11)
+
+    def test_limit_stops_counting(self):
+        query = views_query() + " WHERE r.avg_power > ?"
+        self.assertEqual(count_rows_for_query(self.conn, query, (0,), limit=16), 16)
+        self.assertEqual(count_rows_for_query(self.conn, query, (0,)), 30)
+        self.assertEqual(count_rows_for_query(self.conn, views_query(), limit=16), 16)
+
+    def test_databases_do_not_share_counts(self):
+        other = connect_db(":memory:")
+        init_db(other)
+        _add_runs(other, 4)
+        query = views_query() + " WHERE r.avg_power > ?"
+        self.assertEqual(cached_count(self.conn, query, (0,)), 30)
+        self.assertEqual(cached_count(other, query, (0,)), 4)
+        other.close()
+
+
+class TestRowCountsMigration(unittest.TestCase):
+
+    def test_existing_runs_counted(self):
+        conn = connect_db(":memory:")
+        init_db(conn)
+        # back to a v5 DB with runs stored before the counter existed
+        for (name,) in conn.execute("SELECT name FROM sqlite_master WHERE type = 'trigger' AND name LIKE '%_count_%'"
+                                    ).fetchall():
+            conn.execute(f"DROP TRIGGER {name}")
+        conn.execute("DROP TABLE row_counts")
+        conn.execute("PRAGMA user_version = 5")
+        _add_runs(conn, 12)
+        self.assertIsNone(data_version(conn))
+        self.assertEqual(count_rows_for_query(conn, views_query()), 12)
+
+        self.assertEqual(upgrade_schema(conn), latest_schema_version())
+        self.assertEqual(listed_runs(conn), 12)
+        conn.close()
@@ -0,0 +1,106 @@
+from datetime import datetime
+from pathlib import Path
+import os
+import tempfile
+import unittest
+
+import pandas as pd
+
+from stryder_core.db_schema import READER, connect_db, init_db, insert_run, wipe_all_data
+from stryder_core.import_runs import batch_process_stryd_folder
+from stryder_core.reports import PANDAS_ENGINE, weekly_report
+from stryder_core.run_rollups import build_rollups, refresh_rollups, rollups_ready
+
+DEMO_DIR = Path(__file__).resolve().parent.parent / "assets" / "demo_run_files"
+TZ = "Europe/Athens"
+
+
+class TestRunRollups(unittest.TestCase):
+    """ Rollups kept by insert_full_run and wipe_all_data are the ones a rebuild gives """
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmp.name, "runs.db")
+        self.conn = connect_db(self.db_path)
+        init_db(self.conn)
+
+    def tearDown(self):
+        self.conn.close()
+        self.tmp.cleanup()
+
+    def _rows(self):
+        return [self.conn.execute(f"SELECT * FROM {table} ORDER BY 1, 2").fetchall()
+                for table in ("daily_rollups", "weekly_rollups")]
+
+    def _import_demo(self):
+        batch_process_stryd_folder(DEMO_DIR / "stryd", DEMO_DIR / "garmin" / "activities.csv", self.conn, TZ)
+
+    def _refreshed(self, tz_name):
+        refresh_rollups(self.conn, tz_name)
+        return rollups_ready(self.conn, tz_name)
+
+    def test_incremental_matches_rebuild(self):
+        self.assertTrue(self._refreshed(TZ))        # built (empty) before the import
+        self.assertTrue(self._refreshed("UTC"))
+        self._import_demo()
+        self.assertGreater(self.conn.execute("SELECT SUM(runs) FROM daily_rollups").fetchone()[0], 0)
+
+        incremental = self._rows()
+        with self.conn:
+            build_rollups(self.conn, TZ)
+            build_rollups(self.conn, "UTC")
+        self.assertEqual(self._rows(), incremental)
+        self.assertTrue(rollups_ready(self.conn, TZ))
+
+    def test_wipe_empties_rollups(self):
+        self._import_demo()
+        self.assertTrue(self._refreshed(TZ))
+        wipe_all_data(self.conn)
+        self.assertEqual(self._rows(), [[], []])
+        self.assertTrue(rollups_ready(self.conn, TZ))
+
+    def test_run_inserted_elsewhere_is_stale(self):
+        self._import_demo()
+        self.assertTrue(self._refreshed(TZ))
+        workout_id = self.conn.execute("SELECT MIN(id) FROM workouts").fetchone()[0]
+        insert_run(workout_id, datetime(2030, 1, 1, 7), 250.0, 3600, 150, 10000.0, self.conn)
+
+        reader = connect_db(self.db_path, READER)
+        try:
+            self.assertFalse(rollups_ready(reader, TZ))
+        finally:
+            reader.close()
+        self.assertFalse(rollups_ready(self.conn, TZ))         # checking never builds
+        self.assertTrue(self._refreshed(TZ))                   # refresh_rollups does
+        self.assertEqual(self.conn.execute("SELECT SUM(runs) FROM daily_rollups WHERE tz = ?", (TZ,)).fetchone()[0],
+                         self.conn.execute("SELECT COUNT(*) FROM runs").fetchone()[0])
+
+    def test_reader_reports_without_rollups(self):
+        self._import_demo()
+        self.conn.execute("DELETE FROM rollup_zones")
+        self.conn.commit()
+
+        reader = connect_db(self.db_path, READER)
+        try:
+            window = dict(mode="rolling", start_date=datetime(2025, 1, 1), end_date=datetime(2026, 12, 31))
+            _, got = weekly_report(reader, TZ, **window)
+            _, expected = weekly_report(reader, TZ, engine=PANDAS_ENGINE, **window)
+        finally:
+            reader.close()
+        self.assertFalse(got.empty)
+        pd.testing.assert_frame_equal(got, expected)
+
+    def test_report_leaves_callers_transaction_open(self):
+        self._import_demo()
+        refresh_rollups(self.conn, TZ)
+        workout_id = self.conn.execute("SELECT MIN(id) FROM workouts").fetchone()[0]
+        insert_run(workout_id, datetime(2030, 1, 1, 7), 250.0, 3600, 150, 10000.0, self.conn, commit=False)
+        self.assertTrue(self.conn.in_transaction)
+
+        window = dict(mode="rolling", start_date=datetime(2025, 1, 1), end_date=datetime(2030, 12, 31))
+        _, got = weekly_report(self.conn, TZ, **window)
+        self.assertTrue(self.conn.in_transaction)       # stale rollups → raw path, nothing committed
+        _, expected = weekly_report(self.conn, TZ, engine=PANDAS_ENGINE, **window)
+        pd.testing.assert_frame_equal(got, expected)
+        self.conn.rollback()
+        self.assertEqual(self.conn.execute("SELECT COUNT(*) FROM runs WHERE datetime LIKE '2030%'").fetchone()[0], 0)
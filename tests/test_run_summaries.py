@@ -0,0 +1,94 @@
+from datetime import datetime, timezone
+from pathlib import Path
+import math
+import os
+import unittest
+from unittest import mock
+
+from stryder_core import packed_metrics, run_summaries
+from stryder_core.db_schema import connect_db, init_db, insert_run, insert_workout
+from stryder_core.import_runs import batch_process_stryd_folder
+from stryder_core.metrics import build_metrics
+from stryder_core.reports import compute_single_run_summary, get_single_run_query
+from stryder_core.run_summaries import SUMMARY_KEYS, backfill_run_summaries, load_run_summary, refresh_run_summaries
+from stryder_core.usecases import get_single_run_summary
+
+DEMO_DIR = Path(__file__).resolve().parent.parent / "assets" / "demo_run_files"
+
+
+class TestRunSummaries(unittest.TestCase):
+    """ The stored summary is the one compute_single_run_summary gives from the run's samples """
+
+    def setUp(self):
+        self.metrics = build_metrics("local")
+        self.conn = connect_db(":memory:")
+        init_db(self.conn)
+
+    def tearDown(self):
+        self.conn.close()
+
+    def _import_demo(self):
+        batch_process_stryd_folder(DEMO_DIR / "stryd", DEMO_DIR / "garmin" / "activities.csv", self.conn,
+                                   "Europe/Athens")
+        return [r[0] for r in self.conn.execute("SELECT id FROM runs ORDER BY id")]
+
+    def _assert_matches_samples(self, run_ids):
+        self.assertTrue(run_ids)
+        for run_id in run_ids:
+            df = get_single_run_query(self.conn, run_id, self.metrics)
+            expected = compute_single_run_summary(df)
+            stored = load_run_summary(self.conn, run_id)
+            for key in ("run_id", *SUMMARY_KEYS):
+                if isinstance(expected[key], float) and math.isnan(expected[key]):
+                    self.assertTrue(math.isnan(stored[key]), key)
+                else:
+                    self.assertEqual(stored[key], expected[key], key)
+            self.assertEqual(stored["dt"], df["dt"].iloc[0])
+            self.assertEqual(stored["wt_name"], df["wt_name"].iloc[0])
+
+    def test_filled_at_import(self):
+        self._assert_matches_samples(self._import_demo())
+
+    def test_filled_at_import_packed(self):
+        with mock.patch.dict(os.environ, {packed_metrics.STORAGE_ENV: packed_metrics.PACKED}):
+            run_ids = self._import_demo()
+        self._assert_matches_samples(run_ids)
+
+    def test_backfill(self):
+        run_ids = self._import_demo()
+        self.conn.execute("DELETE FROM run_summaries WHERE run_id IN (?, ?)", run_ids[:2])
+
+        self.assertEqual(backfill_run_summaries(self.conn), 2)
+        self.assertEqual(backfill_run_summaries(self.conn), 0)
+        self.assertEqual(backfill_run_summaries(self.conn, rebuild=True), len(run_ids))
+        self._assert_matches_samples(run_ids)
+
+    def test_run_without_samples_read_once(self):
+        workout_id = insert_workout("Treadmill", "", None, self.conn)
+        run_id = insert_run(workout_id, datetime(2024, 1, 1, 7, tzinfo=timezone.utc), 200.0, 1800, 140, 5000.0,
+                            self.conn)
+        with mock.patch.object(run_summaries, "_stored_samples", wraps=run_summaries._stored_samples) as read:
+            self.assertEqual(backfill_run_summaries(self.conn), 0)
+            self.assertEqual(backfill_run_summaries(self.conn), 0)
+        self.assertEqual(read.call_count, 1)
+        self.assertIsNone(load_run_summary(self.conn, run_id))
+
+    def test_refreshed_by_writer_after_upgrade(self):
+        run_ids = self._import_demo()
+        self.conn.execute("DELETE FROM run_summaries")      # as a v3 DB upgraded to v4 leaves it
+        self.conn.commit()
+
+        refresh_run_summaries(self.conn)
+        self.assertEqual(self.conn.execute("SELECT COUNT(*) FROM run_summaries").fetchone()[0], len(run_ids))
+        self._assert_matches_samples(run_ids)
+
+    def test_detail_summary_skips_samples(self):
+        run_id = self._import_demo()[0]
+        fast = get_single_run_summary(self.conn, run_id, self.metrics)
+        self.conn.execute("DELETE FROM run_summaries")
+        slow = get_single_run_summary(self.conn, run_id, self.metrics)
+
+        self.assertIsNone(fast["df"])
+        self.assertIsNotNone(slow["df"])
+        self.assertEqual(fast["summary"], slow["summary"])
+        self.assertEqual((fast["dt"], fast["wt_name"]), (slow["dt"], slow["wt_name"]))
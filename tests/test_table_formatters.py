@@ -0,0 +1,72 @@
+import sqlite3
+import unittest
+from zoneinfo import ZoneInfo
+
+import pandas as pd
+
+from stryder_core.date_utilities import dt_to_string, to_utc
+from stryder_core.metrics import build_metrics
+from stryder_core.runtime_context import set_context
+from stryder_core.table_formatters import MISSING, format_rows_for_ui, format_run_columns, format_view_columns
+from stryder_core.utils_formatting import fmt_distance_km_str, fmt_hms, fmt_str_decimals
+
+ATHENS = ZoneInfo("Europe/Athens")
+
+
+class TestColumnFormatting(unittest.TestCase):
+    """ Column at a time formatting gives the strings the per-value formatters give """
+
+    @classmethod
+    def setUpClass(cls):
+        set_context(tz_str="Europe/Athens", tzinfo=ATHENS)
+        cls.conn = sqlite3.connect(":memory:")
+        cls.conn.row_factory = sqlite3.Row
+        cls.conn.execute("CREATE TABLE v (run_id, datetime, wt_name, distance_m, duration_sec, avg_power, avg_hr, wt_type)")
+        cls.conn.executemany("INSERT INTO v VALUES (?, ?, ?, ?, ?, ?, ?, ?)", [
+            (1, "2026-02-07 06:30:39+00:00", "EZ", 10234.5, 3600, 3.125, 150, "Easy Run"),
+            (2, "2026-10-25 00:30:00+00:00", "Long", 21097.0, 7322.5, 2.675, None, "Long Run"),
+            (3, "2026-03-29 01:30:00+00:00", "TT", 5000.0, 1199.5, 4.0051, 171, "Testing"),
+            (4, "2026-06-01 20:00:00+00:00", "Ultra", 100000.0, 400000, 2.5, 140, "Other"),
+        ])
+        cls.rows = cls.conn.execute("SELECT * FROM v ORDER BY run_id").fetchall()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.conn.close()
+
+    def test_view_columns_match_scalar_formatters(self):
+        headers, rows = format_view_columns(self.rows, "for_views")
+        self.assertEqual(headers[:3], ["Run ID", "Datetime", "Workout Name"])
+        expected = [[row["run_id"],
+                     dt_to_string(to_utc(row["datetime"]), "ymd_hms", tz=ATHENS),
+                     row["wt_name"],
+                     fmt_distance_km_str(row["distance_m"]),
+                     fmt_hms(row["duration_sec"]),
+                     fmt_str_decimals(row["avg_power"]),
+                     row["avg_hr"],
+                     row["wt_type"]] for row in self.rows]
+        self.assertEqual(rows, expected)
+        self.assertEqual(rows[3][4], "111:06:40")
+
+    def test_formatters_come_from_metrics(self):
+        metrics = build_metrics()
+        metrics["distance"] = {**metrics["distance"], "formatter": lambda meters: f"{meters:.0f} m"}
+        _, rows = format_view_columns(self.rows, "for_views", metrics)
+        self.assertEqual([row[3] for row in rows], ["10234 m", "21097 m", "5000 m", "100000 m"])
+        self.assertEqual(rows[0][4:6], ["01:00:00", "3.12"])
+
+    def test_rows_for_ui(self):
+        runs = format_rows_for_ui(self.rows)
+        self.assertEqual(runs[0], {"run_id": 1, "dt": "2026-02-07", "distance": "10.23", "duration": "01:00:00",
+                                   "avg_power": "3.12", "avg_hr": 150, "wt_name": "EZ", "wt_type": "Easy Run"})
+        self.assertIsNone(runs[1]["avg_hr"])
+        self.assertEqual(format_rows_for_ui([]), [])
+
+    def test_missing_values(self):
+        out = format_run_columns(pd.DataFrame({"distance_m": [None], "avg_power": [None], "duration_sec": [None]},
+                                              dtype=object), ATHENS)
+        self.assertEqual(out.iloc[0].tolist(), [MISSING, MISSING, "00:00:00"])
+
+
+if __name__ == "__main__":
+    unittest.main()
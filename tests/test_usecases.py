@@ -0,0 +1,84 @@
+from datetime import date, datetime, timedelta
+from pathlib import Path
+import unittest
+from zoneinfo import ZoneInfo
+
+from stryder_core.db_schema import connect_db, get_or_create_workout_type, init_db, insert_run, insert_workout
+from stryder_core.import_runs import batch_process_stryd_folder
+from stryder_core.metrics import build_metrics
+from stryder_core.runtime_context import set_context
+from stryder_core.usecases import count_x_days_for_django, get_dashboard_summary, get_run_series, get_x_days_for_django
+
+DEMO_DIR = Path(__file__).resolve().parent.parent / "assets" / "demo_run_files"
+
+
+class TestDashboardPages(unittest.TestCase):
+    """ Paged dashboard runs are the slices of the full list """
+
+    @classmethod
+    def setUpClass(cls):
+        set_context(tz_str="UTC", tzinfo=ZoneInfo("UTC"))     # format_rows_for_ui shows local times
+        cls.conn = connect_db(":memory:")
+        init_db(cls.conn)
+        type_id = get_or_create_workout_type("Easy Run", cls.conn)
+        for i in range(40):
+            workout_id = insert_workout(f"Easy Run {i}", "", type_id, cls.conn, commit=False)
+            insert_run(workout_id, datetime(2024, 1, 1, 7) + timedelta(hours=11 * i), 200.0 + i, 3000 + i, 140,
+                       8000.0 + i, cls.conn, commit=False)
+        cls.conn.commit()
+        cls.window = dict(start_date=date(2024, 1, 1), end_date=date(2024, 3, 1))
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.conn.close()
+
+    def test_pages_match_full_list(self):
+        runs, _, _ = get_x_days_for_django(self.conn, **self.window)
+        self.assertEqual(count_x_days_for_django(self.conn, **self.window), len(runs))
+
+        pages = [get_x_days_for_django(self.conn, page=p, page_size=15, **self.window)[0] for p in (1, 2, 3)]
+        self.assertEqual([len(p) for p in pages], [15, 15, 10])
+        self.assertEqual([run for page in pages for run in page], runs)
+
+    def test_keyword_count(self):
+        self.assertEqual(count_x_days_for_django(self.conn, keyword="Run 3", **self.window), 11)   # 3, 30..39
+
+    def test_summary_covers_whole_window(self):
+        full = get_dashboard_summary(self.conn, "UTC", **self.window)
+        paged = get_dashboard_summary(self.conn, "UTC", page=2, page_size=15, **self.window)
+        self.assertEqual(paged["summary"], full["summary"])
+        self.assertEqual(paged["runs"], full["runs"][15:30])
+
+
+class TestRunSeries(unittest.TestCase):
+    """ Columnar decimated series of a run for the client-side chart """
+
+    @classmethod
+    def setUpClass(cls):
+        set_context(tz_str="Europe/Athens", tzinfo=ZoneInfo("Europe/Athens"))
+        cls.metrics = build_metrics("local")
+        cls.conn = connect_db(":memory:")
+        init_db(cls.conn)
+        batch_process_stryd_folder(DEMO_DIR / "stryd", DEMO_DIR / "garmin" / "activities.csv", cls.conn,
+                                   "Europe/Athens")
+        cls.run_id = cls.conn.execute("SELECT MIN(id) FROM runs").fetchone()[0]
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.conn.close()
+
+    def test_columns(self):
+        series = get_run_series(self.conn, self.run_id, self.metrics, 200)
+        plottable = [k for k, meta in self.metrics.items() if meta.get("plottable_single")]
+
+        self.assertEqual(list(series["x"]), ["elapsed_sec", "distance_km"])
+        self.assertEqual(sorted(series["y"]), sorted(plottable))
+        self.assertLessEqual(series["points"], 200 * len(plottable))
+        for values in (*series["x"].values(), *series["y"].values()):
+            self.assertEqual(len(values), series["points"])
+        elapsed = series["x"]["elapsed_sec"]
+        self.assertEqual(elapsed, sorted(elapsed))
+        self.assertEqual(elapsed[0], 0)
+
+    def test_unknown_run(self):
+        self.assertIsNone(get_run_series(self.conn, 9999, self.metrics, 200))
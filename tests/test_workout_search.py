@@ -0,0 +1,105 @@
+from datetime import datetime, timedelta, timezone
+import unittest
+
+from stryder_core.db_schema import (connect_db, get_or_create_workout_type, init_db, insert_run, insert_workout,
+                                    wipe_all_data)
+from stryder_core.migrations import latest_schema_version, upgrade_schema
+from stryder_core.queries import build_window_query_and_params, count_rows_for_query, views_query
+from stryder_core.workout_search import has_workout_search, keyword_filter, match_expression
+
+START = datetime(2024, 1, 1, 7, tzinfo=timezone.utc)
+
+WORKOUTS = [("Easy Run 10k", "Easy Run"), ("Easy Run 5k", "Easy Run"), ("HM Power Tempo", "Tempo"),
+            ("Long Run 25k", "Long Run"), ("Hill repeats", "Intervals"), ("Track 10x400", "Intervals")]
+
+
+def _add_workouts(conn, workouts):
+    for i, (name, type_name) in enumerate(workouts):
+        type_id = get_or_create_workout_type(type_name, conn, commit=False)
+        workout_id = insert_workout(name, "", type_id, conn, commit=False)
+        insert_run(workout_id, START + timedelta(days=i), 200.0, 3000, 140, 8000.0, conn, commit=False)
+    conn.commit()
+
+
+def _names(conn, keyword, include_type=True):
+    condition, params = keyword_filter(conn, keyword, include_type=include_type)
+    rows = conn.execute(f"{views_query()} WHERE {condition} ORDER BY r.datetime", params).fetchall()
+    return [row[2] for row in rows]
+
+
+class TestMatchExpression(unittest.TestCase):
+
+    def test_prefix_term_per_word(self):
+        self.assertEqual(match_expression("Easy  run"), '"easy"* "run"*')
+        self.assertEqual(match_expression('10k "tempo"'), '"10k"* "tempo"*')
+
+    def test_no_words(self):
+        self.assertIsNone(match_expression(" -- "))
+
+
+class TestWorkoutSearch(unittest.TestCase):
+    """ Keyword filters use the FTS index kept in sync by the triggers """
+
+    def setUp(self):
+        self.conn = connect_db(":memory:")
+        init_db(self.conn)
+        _add_workouts(self.conn, WORKOUTS)
+
+    def tearDown(self):
+        self.conn.close()
+
+    def test_prefix_and_multi_word(self):
+        self.assertTrue(has_workout_search(self.conn))
+        self.assertEqual(_names(self.conn, "ea"), ["Easy Run 10k", "Easy Run 5k"])
+        self.assertEqual(_names(self.conn, "run 10"), ["Easy Run 10k"])
+        self.assertEqual(_names(self.conn, "25k long"), ["Long Run 25k"])
+        self.assertEqual(_names(self.conn, "interval"), ["Hill repeats", "Track 10x400"])    # by type
+        self.assertEqual(_names(self.conn, "interval", include_type=False), [])
+
+    def test_follows_renames_and_deletes(self):
+        self.conn.execute("UPDATE workouts SET workout_name = 'Recovery jog' WHERE workout_name = 'Easy Run 5k'")
+        self.conn.execute("UPDATE workout_types SET name = 'Threshold' WHERE name = 'Tempo'")
+        self.assertEqual(_names(self.conn, "recov"), ["Recovery jog"])
+        self.assertEqual(_names(self.conn, "thresh"), ["HM Power Tempo"])
+
+        hill_id = self.conn.execute("SELECT id FROM workouts WHERE workout_name = 'Hill repeats'").fetchone()[0]
+        self.conn.execute("DELETE FROM runs WHERE workout_id = ?", (hill_id,))
+        self.conn.execute("DELETE FROM workouts WHERE id = ?", (hill_id,))
+        self.assertEqual(_names(self.conn, "intervals"), ["Track 10x400"])
+
+        wipe_all_data(self.conn)
+        self.assertEqual(self.conn.execute("SELECT COUNT(*) FROM workouts_fts").fetchone()[0], 0)
+
+    def test_window_and_count_filters(self):
+        query, params = build_window_query_and_params(START, START + timedelta(days=10), "run", self.conn)
+        self.assertEqual([row[6] for row in self.conn.execute(query, params)],
+                         ["Easy Run 10k", "Easy Run 5k", "Long Run 25k"])
+
+        condition, params = keyword_filter(self.conn, "easy")
+        self.assertEqual(count_rows_for_query(self.conn, f"{views_query()} WHERE {condition}", params), 2)
+
+    def test_like_fallback(self):
+        self.assertEqual(keyword_filter(self.conn, "--"), ("(w.workout_name LIKE ? OR wt.name LIKE ?)",
+                                                             ("%--%", "%--%")))
+        self.conn.execute("DROP TABLE workouts_fts")
+        self.assertFalse(has_workout_search(self.conn))
+        self.assertEqual(_names(self.conn, "asy run"), ["Easy Run 10k", "Easy Run 5k"])
+
+
+class TestWorkoutSearchMigration(unittest.TestCase):
+
+    def test_existing_workouts_indexed(self):
+        conn = connect_db(":memory:")
+        init_db(conn)
+        # back to a v6 DB with workouts stored before the index existed
+        for (name,) in conn.execute("SELECT name FROM sqlite_master WHERE type = 'trigger' AND name LIKE '%_fts_%'"
+                                    ).fetchall():
+            conn.execute(f"DROP TRIGGER {name}")
+        conn.execute("DROP TABLE workouts_fts")
+        conn.execute("PRAGMA user_version = 6")
+        _add_workouts(conn, WORKOUTS)
+
+        self.assertEqual(upgrade_schema(conn), latest_schema_version())
+        self.assertEqual(_names(conn, "track"), ["Track 10x400"])
+        self.assertEqual(conn.execute("SELECT COUNT(*) FROM workouts_fts").fetchone()[0], len(WORKOUTS))
+        conn.close()